@@ -1,42 +1,75 @@
 #!/usr/bin/env python3
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-from pathlib import Path
+import ta
+from signal_log import get_log_backend
+from kline_archive import KlineArchive, interval_ms, interval_freq, to_ms
+from backtest_engine import (signals_from_log, run_long_only, rsi_signals,
+                             combined_signals, candle_ema, run_portfolio)
+from watchlist import load_watchlist
 
-LOG_PATH = Path(__file__).with_name("signals_log.csv")
+CANDLE_FREQ = "5min"           # a bot gyertya mérete (trading_bot.HISTORY_INTERVAL)
+WARMUP_CANDLES = 300           # kline módban ennyi gyertyát töltünk a start elé (indikátor bemelegítés)
 
 
-def backtest(symbol="BTCUSDC", start_balance=1000.0, fee=0.001, signal_type="combined"):
+def load_log(symbols=None, start=None, end=None, backend: str = None) -> pd.DataFrame:
     """
-    Egyszerű long-only backtest:
-    - BUY jelzésnél mindent megveszünk
-    - SELL jelzésnél mindent eladunk
-    - fee: egyirányú jutalék (pl. 0.001 = 0.1%)
+    Log beolvasása a backendről (parquet: csak a kért szimbólum / nap partíciók,
+    csv: a régi signals_log.csv). start / end: dátum szűrés (end kizárólagos).
+    """
+    return get_log_backend(backend).read(symbols=symbols, start=start, end=end)
 
-    signal_type:
-      - 'combined' -> RSI+EMA logból (signal oszlop), vagy ha nincs, akkor helyben számoljuk
-      - 'rsi'      -> csak RSI alapján számoljuk BUY/SELL/WAIT-et (nem kell külön oszlop)
-    Régi / hibás sorokat átugorjuk.
+
+def kline_frame(symbol: str, interval: str = "5m", start=None, end=None,
+                archive: KlineArchive = None):
+    """
+    Backtest bemenet a helyi gyertya archívumból (offline): gyertyánként
+    timestamp (open_time), price (close), ema9, ema21, rsi - ugyanúgy számolva,
+    mint a bot. A start elé WARMUP_CANDLES gyertyát is betöltünk.
     """
+    archive = archive or KlineArchive()
+    load_from = None
+    if start is not None:
+        load_from = pd.Timestamp(to_ms(start) - WARMUP_CANDLES * interval_ms(interval), unit="ms")
+    data = archive.load(symbol, interval, load_from, end)
+    if len(data) == 0:
+        return None
 
-    if not LOG_PATH.exists():
-        print(f"Hiba: nem találom a log fájlt: {LOG_PATH}")
-        return
+    close = pd.Series(np.asarray(data["close"], dtype=float))
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime(np.asarray(data["open_time"]), unit="ms"),
+        "symbol": symbol,
+        "price": close,
+        "ema9": close.ewm(span=9).mean(),
+        "ema21": close.ewm(span=21).mean(),
+        "rsi": ta.momentum.RSIIndicator(close).rsi(),
+    })
+    df = df.dropna(subset=["rsi"])
+    if start is not None:
+        df = df[df["timestamp"] >= pd.Timestamp(start)]
+    return df.reset_index(drop=True)
 
-    # Vegyes / hibás sorok átugrása
-    try:
-        df = pd.read_csv(LOG_PATH, on_bad_lines="skip")
-    except TypeError:
-        df = pd.read_csv(LOG_PATH, error_bad_lines=False, warn_bad_lines=True)
 
-    if "symbol" not in df.columns:
-        print("Hiba: a log nem tartalmaz 'symbol' oszlopot.")
-        return
+def _load_source(symbol, signal_type, source, interval, start, end, log_backend):
+    if source == "klines":
+        df = kline_frame(symbol, interval, start, end)
+        if df is None or df.empty:
+            print(f"Nincs archivált {interval} gyertya a(z) {symbol} szimbólumra. Letöltés:")
+            print(f"  python kline_archive.py --symbol {symbol} --interval {interval} --start 2024-01-01")
+            return None
+        return df
+    return prepare_log(load_log([symbol], start, end, log_backend), symbol, signal_type)
 
-    df = df[df["symbol"] == symbol].copy()
-    if df.empty:
-        print(f"Nincs adat a(z) {symbol} szimbólumra.")
-        return
 
+def clean_log(df: pd.DataFrame, signal_type: str = "combined"):
+    """
+    Log sorok tisztítása: numerikus oszlopok, hibás sorok eldobása, idő
+    szerinti rendezés. Hiba esetén kiírja az okát és None-t ad.
+    """
     # Kötelező numerikus oszlopok
     required_num = ["timestamp", "price", "rsi"]
     for col in ["ema9", "ema21"]:
@@ -46,7 +79,7 @@ def backtest(symbol="BTCUSDC", start_balance=1000.0, fee=0.001, signal_type="com
     missing = [c for c in required_num if c not in df.columns]
     if missing:
         print("Hiányzó oszlopok a logban:", missing)
-        return
+        return None
 
     df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
     df["price"] = pd.to_numeric(df["price"], errors="coerce")
@@ -60,94 +93,70 @@ def backtest(symbol="BTCUSDC", start_balance=1000.0, fee=0.001, signal_type="com
     df = df.dropna(subset=["timestamp", "price", "rsi"])
     if df.empty:
         print("Minden sor hibás / hiányos volt a logban, nincs mit backtestelni.")
-        return
+        return None
 
     df.sort_values("timestamp", inplace=True)
+    return df
 
-    position = 0.0
-    balance = start_balance
-    entry_price = None
-    trades = []
-
-    for _, row in df.iterrows():
-        price = float(row["price"])
-        rsi = float(row["rsi"])
-        ts = row["timestamp"]
-
-        # --- Jel kiszámítása / kiválasztása ---
-        if signal_type == "rsi":
-            # RSI-only stratégia: <30 BUY, >70 SELL
-            if rsi < 30:
-                sig = "BUY"
-            elif rsi > 70:
-                sig = "SELL"
-            else:
-                sig = "WAIT"
-
-        elif signal_type == "combined":
-            # 1) Ha van 'signal' oszlop, használjuk (amit a bot írt)
-            if "signal" in df.columns and not pd.isna(row.get("signal", None)):
-                sig = str(row["signal"]).upper()
-            else:
-                # 2) Ha nincs 'signal', számoljuk RSI+EMA alapján
-                ema9 = float(row["ema9"]) if not pd.isna(row.get("ema9", None)) else None
-                ema21 = float(row["ema21"]) if not pd.isna(row.get("ema21", None)) else None
-                if ema9 is None or ema21 is None:
-                    sig = "WAIT"
-                else:
-                    if rsi < 30 and ema9 > ema21:
-                        sig = "BUY"
-                    elif rsi > 70 and ema9 < ema21:
-                        sig = "SELL"
-                    else:
-                        sig = "WAIT"
-        else:
-            sig = "WAIT"
-
-        # --- Pozíciókezelés ---
-        if sig == "BUY" and position == 0.0:
-            qty = balance * (1 - fee) / price
-            position = qty
-            entry_price = price
-            balance = 0.0
-            trades.append({
-                "type": "BUY",
-                "time": ts,
-                "price": price,
-                "qty": qty
-            })
-
-        elif sig == "SELL" and position > 0.0:
-            gross = position * price
-            net = gross * (1 - fee)
-            trade_pnl = net - (entry_price * position)
-
-            trades.append({
-                "type": "SELL",
-                "time": ts,
-                "price": price,
-                "qty": position,
-                "pnl": trade_pnl
-            })
-
-            balance = net
-            position = 0.0
-            entry_price = None
-
-    # Záró equity (ha maradt pozíció, utolsó áron értékeljük)
-    last_price = float(df.iloc[-1]["price"])
-    if position > 0.0:
-        equity = balance + position * last_price
-    else:
-        equity = balance
 
-    closed_trades = [t for t in trades if t["type"] == "SELL"]
-    num_trades = len(closed_trades)
-    win_trades = sum(1 for t in closed_trades if t["pnl"] > 0)
-    lose_trades = sum(1 for t in closed_trades if t["pnl"] <= 0)
-    total_pnl = equity - start_balance
-    total_pnl_pct = (equity / start_balance - 1) * 100 if start_balance > 0 else 0
-    winrate = (win_trades / num_trades * 100) if num_trades > 0 else 0
+def prepare_log(df: pd.DataFrame, symbol: str, signal_type: str = "combined"):
+    """Egy szimbólum log sorai tisztítva (lásd clean_log), vagy None."""
+    if "symbol" not in df.columns:
+        print("Hiba: a log nem tartalmaz 'symbol' oszlopot.")
+        return None
+
+    df = df[df["symbol"] == symbol].copy()
+    if df.empty:
+        print(f"Nincs adat a(z) {symbol} szimbólumra.")
+        return None
+
+    return clean_log(df, signal_type)
+
+
+def backtest(symbol="BTCUSDC", start_balance=1000.0, fee=0.001, signal_type="combined",
+             start=None, end=None, log_backend: str = None,
+             source: str = "log", interval: str = "5m"):
+    """
+    Egyszerű long-only backtest:
+    - BUY jelzésnél mindent megveszünk
+    - SELL jelzésnél mindent eladunk
+    - fee: egyirányú jutalék (pl. 0.001 = 0.1%)
+
+    signal_type:
+      - 'combined' -> RSI+EMA logból (signal oszlop), vagy ha nincs, akkor helyben számoljuk
+      - 'rsi'      -> csak RSI alapján számoljuk BUY/SELL/WAIT-et (nem kell külön oszlop)
+    start / end: csak ebben az időszakban (end kizárólagos).
+    source: 'log' (jelzés log) vagy 'klines' (helyi gyertya archívum, `interval` méretű gyertyák)
+    Régi / hibás sorokat átugorjuk.
+    """
+
+    df = _load_source(symbol, signal_type, source, interval, start, end, log_backend)
+    if df is None:
+        return
+
+    result = run_backtest(df, start_balance=start_balance, fee=fee, signal_type=signal_type)
+    times = df["timestamp"].to_numpy()
+
+    print_result(result, symbol, signal_type, times)
+    return result
+
+
+def run_backtest(df: pd.DataFrame, start_balance=1000.0, fee=0.001, signal_type="combined",
+                 rsi_low=30, rsi_high=70):
+    """Vektorizált futás egy előkészített (tisztított, idő szerint rendezett) log DataFrame-en."""
+    sig = signals_from_log(df, signal_type, rsi_low, rsi_high)
+    return run_long_only(df["price"].to_numpy(dtype=float), sig, start_balance, fee)
+
+
+def print_result(result, symbol, signal_type, times):
+    start_balance = result.start_balance
+    equity = result.final_equity
+    num_trades = result.num_trades
+    win_trades = result.win_trades
+    lose_trades = result.lose_trades
+    total_pnl = result.total_pnl
+    total_pnl_pct = result.total_pnl_pct
+    winrate = result.winrate
 
     print("===== BACKTEST EREDMÉNY =====")
     print(f"Szimbólum:           {symbol}")
@@ -162,24 +171,254 @@ def backtest(symbol="BTCUSDC", start_balance=1000.0, fee=0.001, signal_type="com
     print()
     if num_trades > 0:
         print("Első 5 lezárt kötés:")
-        for t in closed_trades[:5]:
-            print(f" - {t['time']}  SELL @ {t['price']:.2f}, pnl: {t['pnl']:.2f} USDC")
+        for k in range(min(5, num_trades)):
+            t = pd.Timestamp(times[result.sell_idx[k]])
+            print(f" - {t}  SELL @ {result.sell_price[k]:.2f}, pnl: {result.pnl[k]:.2f} USDC")
+
+
+# ---- Portfólió ----
+
+def portfolio_backtest(symbols=None, start_balance=1000.0, fee=0.001, signal_type="combined",
+                       start=None, end=None, log_backend: str = None,
+                       source: str = "log", interval: str = "5m",
+                       alloc: str = "equal", fraction: float = 0.2, max_positions: int = None):
+    """
+    Az összes (alapból a watchlist.json-ben engedélyezett) szimbólum egy menetben,
+    közös cash egyenleggel. Log forrásnál a logot egyszer olvassuk be és
+    szimbólumonként csoportosítjuk.
+    """
+    if symbols is None:
+        symbols, _ = load_watchlist()
+
+    frames = {}
+    if source == "klines":
+        for sym in symbols:
+            df = kline_frame(sym, interval, start, end)
+            if df is not None and not df.empty:
+                frames[sym] = df
+    else:
+        df = load_log(symbols, start, end, log_backend)
+        if "symbol" not in df.columns:
+            print("Hiba: a log nem tartalmaz 'symbol' oszlopot.")
+            return None
+        df = clean_log(df.copy(), signal_type)
+        if df is None:
+            return None
+        for sym, g in df.groupby("symbol", sort=False):
+            if sym in symbols:
+                frames[sym] = g
+
+    missing = [s for s in symbols if s not in frames]
+    if missing:
+        print("Nincs adat ezekre a szimbólumokra:", ", ".join(missing))
+    if not frames:
+        return None
+
+    inputs = {
+        sym: (g["timestamp"].to_numpy(), g["price"].to_numpy(dtype=float),
+              signals_from_log(g, signal_type))
+        for sym, g in ((s, frames[s]) for s in symbols if s in frames)
+    }
+    result = run_portfolio(inputs, start_balance, fee, alloc, fraction, max_positions)
+    print_portfolio(result, signal_type, alloc)
+    return result
+
+
+def print_portfolio(result, signal_type, alloc):
+    closed = result.closed()
+    wins = int((closed["pnl"] > 0).sum())
+    winrate = wins / len(closed) * 100 if len(closed) else 0
+
+    print("===== PORTFÓLIÓ BACKTEST =====")
+    print(f"Jel típus:           {signal_type}")
+    print(f"Allokáció:           {alloc}")
+    print(f"Kezdő egyenleg:      {result.start_balance:.2f} USDC")
+    print(f"Záró egyenleg:       {result.final_equity:.2f} USDC")
+    print(f"Összes PnL:          {result.total_pnl:.2f} USDC ({result.total_pnl_pct:.2f} %)")
+    print(f"Max drawdown:        {result.max_drawdown_pct:.2f} %")
+    print(f"Lezárt kötések:      {len(closed)}")
+    print(f"Winrate:             {winrate:.1f} %")
+    print()
+    print("Szimbólumonként:")
+    per = result.per_symbol()
+    if per.empty:
+        print(" - nincs kötés")
+    for sym, r in per.iterrows():
+        flag = "  (nyitott pozíció)" if r["open"] else ""
+        print(f" - {sym:<10} kötések: {int(r['trades']):>4}  winrate: {r['winrate']:5.1f} %  "
+              f"pnl: {r['pnl']:.2f} USDC{flag}")
+
+
+# ---- Paraméter sweep ----
+
+_sweep_data = {}
+
+
+def parse_range(text: str, cast=float):
+    """'20:35:5' -> [20, 25, 30, 35] (zárt intervallum), '25,30' -> [25, 30], '30' -> [30]"""
+    if ":" in text:
+        lo, hi, step = (cast(x) for x in text.split(":"))
+        out = []
+        v = lo
+        while v <= hi + (1e-9 if cast is float else 0):
+            out.append(cast(round(v, 10)) if cast is float else v)
+            v += step
+        return out
+    return [cast(x) for x in text.split(",") if x.strip()]
+
+
+def _sweep_init(price, rsi, emas, start_balance, signal_type):
+    _sweep_data.update(price=price, rsi=rsi, emas=emas,
+                       start_balance=start_balance, signal_type=signal_type)
+
+
+def _sweep_run(combos):
+    d = _sweep_data
+    out = []
+    for rsi_low, rsi_high, fast, slow, fee in combos:
+        if d["signal_type"] == "rsi":
+            sig = rsi_signals(d["rsi"], rsi_low, rsi_high)
+        else:
+            sig = combined_signals(d["rsi"], d["emas"][fast], d["emas"][slow], rsi_low, rsi_high)
+        r = run_long_only(d["price"], sig, d["start_balance"], fee)
+        out.append({
+            "rsi_low": rsi_low, "rsi_high": rsi_high,
+            "ema_fast": fast, "ema_slow": slow, "fee": fee,
+            "final_equity": r.final_equity, "pnl_pct": r.total_pnl_pct,
+            "trades": r.num_trades, "winrate": r.winrate,
+            "max_drawdown_pct": r.max_drawdown_pct,
+        })
+    return out
+
+
+def sweep(df: pd.DataFrame, rsi_lows, rsi_highs, ema_fasts, ema_slows, fees,
+          start_balance=1000.0, signal_type="combined", workers=None,
+          freq: str = CANDLE_FREQ) -> pd.DataFrame:
+    """
+    Rács keresés RSI határokra, EMA span-ekre és fee-re egy előkészített log DataFrame-en.
+    Az EMA oszlopokat span-enként egyszer számoljuk (candle_ema), a rácsot
+    process poolon osztjuk szét. Eredmény: PnL szerint csökkenő táblázat.
+    """
+    if signal_type == "rsi":
+        ema_fasts, ema_slows = [0], [0]
+    combos = [
+        c for c in itertools.product(rsi_lows, rsi_highs, ema_fasts, ema_slows, fees)
+        if c[0] < c[1] and (signal_type == "rsi" or c[2] < c[3])
+    ]
+    if not combos:
+        return pd.DataFrame()
+
+    price = df["price"].to_numpy(dtype=float)
+    rsi = df["rsi"].to_numpy(dtype=float)
+    times = df["timestamp"].to_numpy()
+    emas = {}
+    if signal_type != "rsi":
+        for span in sorted(set(ema_fasts) | set(ema_slows)):
+            emas[span] = candle_ema(times, price, span, freq)
+
+    workers = workers or os.cpu_count() or 1
+    init_args = (price, rsi, emas, start_balance, signal_type)
+    if workers <= 1 or len(combos) < 2 * workers:
+        _sweep_init(*init_args)
+        rows = _sweep_run(combos)
+    else:
+        size = max(1, len(combos) // (workers * 4))
+        chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_sweep_init,
+                                 initargs=init_args) as pool:
+            rows = [r for part in pool.map(_sweep_run, chunks) for r in part]
+
+    table = pd.DataFrame(rows)
+    return table.sort_values(["pnl_pct", "max_drawdown_pct"], ascending=[False, True]).reset_index(drop=True)
+
+
+def run_sweep(symbol, args):
+    df = _load_source(symbol, "rsi", args.source, args.interval, args.start, args.end, args.log_backend)
+    if df is None:
+        return None
+    # kline módban minden sor egy gyertya, log módban a bot gyertya méretére vetítünk
+    freq = interval_freq(args.interval) if args.source == "klines" else CANDLE_FREQ
+    table = sweep(
+        df,
+        rsi_lows=parse_range(args.rsi_low),
+        rsi_highs=parse_range(args.rsi_high),
+        ema_fasts=parse_range(args.ema_fast, int),
+        ema_slows=parse_range(args.ema_slow, int),
+        fees=parse_range(args.fees),
+        start_balance=args.balance,
+        signal_type=args.signal_type,
+        workers=args.workers,
+        freq=freq,
+    )
+    print(f"===== SWEEP EREDMÉNY ({symbol}, {args.signal_type}, {len(table)} kombináció) =====")
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        print(table.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.2f}",
+                                             formatters={"fee": lambda v: f"{v:.4f}"}))
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"Teljes táblázat: {args.out}")
+    return table
 
 
 if __name__ == "__main__":
     import argparse
 
-    parser = argparse.ArgumentParser(description="Egyszerű backtest a signals_log.csv alapján.")
+    parser = argparse.ArgumentParser(description="Egyszerű backtest a jelzés log (signals_log) alapján.")
     parser.add_argument("--symbol", default="BTCUSDC", help="Melyik szimbólumra fusson a backtest (pl. BTCUSDC)")
     parser.add_argument("--balance", type=float, default=1000.0, help="Kezdő USDC egyenleg")
     parser.add_argument("--fee", type=float, default=0.001, help="Jutalék (pl. 0.001 = 0.1%)")
     parser.add_argument("--signal-type", choices=["combined", "rsi"], default="combined",
                         help="Melyik jel alapján backtesteljünk: combined (RSI+EMA) vagy rsi (csak RSI)")
+    parser.add_argument("--start", help="Kezdő dátum (pl. 2024-01-01)")
+    parser.add_argument("--end", help="Záró dátum (kizárólagos)")
+    parser.add_argument("--log-backend", choices=["auto", "csv", "parquet"], default=None,
+                        help="Log forrás (alap: signal_log.LOG_BACKEND)")
+    parser.add_argument("--source", choices=["log", "klines"], default="log",
+                        help="log: jelzés log, klines: helyi gyertya archívum (kline_archive.py, offline)")
+    parser.add_argument("--interval", default="5m", help="Gyertya méret kline módban (pl. 5m, 1h)")
+
+    pf = parser.add_argument_group("portfólió", "Az összes watchlist szimbólum közös egyenleggel")
+    pf.add_argument("--portfolio", action="store_true", help="Portfólió backtest (--symbol helyett a watchlist)")
+    pf.add_argument("--alloc", choices=["equal", "fraction"], default="equal",
+                    help="equal: cash / flat szimbólumok, fraction: --fraction * kezdő egyenleg")
+    pf.add_argument("--fraction", type=float, default=0.2, help="Pozíció méret fraction módban")
+    pf.add_argument("--max-positions", type=int, default=None, help="Max egyszerre nyitott pozíció")
+
+    sw = parser.add_argument_group("sweep", "Paraméter rács (tartomány: 'min:max:lépés' vagy 'a,b,c')")
+    sw.add_argument("--sweep", action="store_true", help="Paraméter sweep futtatása egyetlen backtest helyett")
+    sw.add_argument("--rsi-low", default="20:35:5", help="RSI BUY határ(ok)")
+    sw.add_argument("--rsi-high", default="65:80:5", help="RSI SELL határ(ok)")
+    sw.add_argument("--ema-fast", default="5:13:2", help="Gyors EMA span(ok)")
+    sw.add_argument("--ema-slow", default="17:29:4", help="Lassú EMA span(ok)")
+    sw.add_argument("--fees", default=None, help="Fee érték(ek), alap: --fee")
+    sw.add_argument("--workers", type=int, default=None, help="Processzek száma (alap: CPU magok)")
+    sw.add_argument("--top", type=int, default=20, help="Ennyi legjobb sort írunk ki")
+    sw.add_argument("--out", help="Teljes eredmény táblázat CSV-be")
 
     args = parser.parse_args()
+    if args.portfolio:
+        portfolio_backtest(
+            start_balance=args.balance, fee=args.fee, signal_type=args.signal_type,
+            start=args.start, end=args.end, log_backend=args.log_backend,
+            source=args.source, interval=args.interval,
+            alloc=args.alloc, fraction=args.fraction, max_positions=args.max_positions,
+        )
+        raise SystemExit(0)
+
+    if args.sweep:
+        if args.fees is None:
+            args.fees = str(args.fee)
+        run_sweep(args.symbol, args)
+        raise SystemExit(0)
+
     backtest(
         symbol=args.symbol,
         start_balance=args.balance,
         fee=args.fee,
-        signal_type=args.signal_type
+        signal_type=args.signal_type,
+        start=args.start,
+        end=args.end,
+        log_backend=args.log_backend,
+        source=args.source,
+        interval=args.interval,
     )
\ No newline at end of file
@@ -0,0 +1,360 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+BUY = 1
+SELL = -1
+WAIT = 0
+
+RSI_LOW = 30
+RSI_HIGH = 70
+
+
+def rsi_signals(rsi: np.ndarray, rsi_low: float = RSI_LOW, rsi_high: float = RSI_HIGH) -> np.ndarray:
+    """RSI-only jel: <low BUY, >high SELL, különben WAIT (int8 kódok)."""
+    sig = np.zeros(len(rsi), dtype=np.int8)
+    sig[rsi < rsi_low] = BUY
+    sig[rsi > rsi_high] = SELL
+    return sig
+
+
+def combined_signals(rsi: np.ndarray, ema9: np.ndarray, ema21: np.ndarray,
+                     rsi_low: float = RSI_LOW, rsi_high: float = RSI_HIGH) -> np.ndarray:
+    """RSI+EMA jel: BUY ha RSI<low és ema9>ema21, SELL ha RSI>high és ema9<ema21 (NaN EMA -> WAIT)."""
+    sig = np.zeros(len(rsi), dtype=np.int8)
+    sig[(rsi < rsi_low) & (ema9 > ema21)] = BUY
+    sig[(rsi > rsi_high) & (ema9 < ema21)] = SELL
+    return sig
+
+
+def signals_from_log(df: pd.DataFrame, signal_type: str = "combined",
+                     rsi_low: float = RSI_LOW, rsi_high: float = RSI_HIGH) -> np.ndarray:
+    """
+    A log soraiból jel kódok, ugyanazzal a szabállyal, mint a régi soronkénti ciklus:
+    combined esetén ha van (nem üres) 'signal' oszlop, azt használjuk, különben RSI+EMA.
+    """
+    rsi = df["rsi"].to_numpy(dtype=float)
+    if signal_type == "rsi":
+        return rsi_signals(rsi, rsi_low, rsi_high)
+    if signal_type != "combined":
+        return np.zeros(len(df), dtype=np.int8)
+
+    sig = combined_signals(rsi, df["ema9"].to_numpy(dtype=float), df["ema21"].to_numpy(dtype=float),
+                           rsi_low, rsi_high)
+    if "signal" in df.columns:
+        col = df["signal"]
+        present = col.notna().to_numpy()
+        text = col.astype(str).str.upper().to_numpy()
+        logged = np.where(text == "BUY", BUY, np.where(text == "SELL", SELL, WAIT)).astype(np.int8)
+        sig = np.where(present, logged, sig).astype(np.int8)
+    return sig
+
+
+def candle_ema(timestamps: np.ndarray, price: np.ndarray, span: int, freq: str = "5min") -> np.ndarray:
+    """
+    EMA a log sorokra úgy, ahogy a bot számolja: a lezárt gyertyák (freq
+    szerinti vödrök utolsó ára) EMA-ja, a nyitott gyertyára az aktuális
+    sor árával (ewm(span).mean(), adjust=True). A kimaradt gyertyákat
+    (bot nem futott) egyszerűen átugorjuk.
+    """
+    n = len(price)
+    if n == 0:
+        return np.zeros(0)
+    bucket = pd.DatetimeIndex(timestamps).floor(freq).asi8
+    change = np.flatnonzero(bucket[1:] != bucket[:-1])
+    j = np.zeros(n, dtype=np.int64)
+    j[change + 1] = 1
+    j = np.cumsum(j)                              # vödör sorszám soronként
+    closes = price[np.r_[change, n - 1]]          # vödrönként az utolsó ár
+
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    ema = pd.Series(closes).ewm(span=span).mean().to_numpy()
+    den = (1.0 - decay ** np.arange(1, len(closes) + 1)) / alpha
+    num = ema * den
+
+    prev = j - 1
+    has_prev = prev >= 0
+    prev_num = np.where(has_prev, num[np.maximum(prev, 0)], 0.0)
+    prev_den = np.where(has_prev, den[np.maximum(prev, 0)], 0.0)
+    return (prev_num * decay + price) / (prev_den * decay + 1.0)
+
+
+def transitions(sig: np.ndarray):
+    """
+    Long-only állapotgép tömb műveletekkel: flat-ből az első BUY nyit,
+    pozícióból az első SELL zár, a többi ismétlődő jel nem csinál semmit.
+    Visszaadja a (buy_idx, sell_idx) sorindexeket; len(buy) - len(sell) = 1, ha nyitva maradt.
+    """
+    nz = np.flatnonzero(sig)
+    s = sig[nz]
+    buys = np.flatnonzero(s == BUY)
+    if len(buys) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    nz = nz[buys[0]:]
+    s = s[buys[0]:]
+    keep = np.ones(len(s), dtype=bool)
+    keep[1:] = s[1:] != s[:-1]
+    events = nz[keep]          # BUY, SELL, BUY, SELL, ...
+    return events[0::2], events[1::2]
+
+
+@dataclass
+class BacktestResult:
+    """Egy futás eredménye tömbökként (indexek a bemeneti sorokra mutatnak)."""
+    start_balance: float
+    equity: np.ndarray         # soronkénti equity (flat: cash, pozícióban: qty * ár)
+    buy_idx: np.ndarray
+    sell_idx: np.ndarray
+    buy_price: np.ndarray
+    sell_price: np.ndarray     # csak lezárt kötések
+    qty: np.ndarray            # kötésenként (az utolsó lehet nyitott)
+    pnl: np.ndarray            # lezárt kötésenként
+    final_equity: float
+
+    @property
+    def num_trades(self) -> int:
+        return len(self.pnl)
+
+    @property
+    def win_trades(self) -> int:
+        return int(np.count_nonzero(self.pnl > 0))
+
+    @property
+    def lose_trades(self) -> int:
+        return int(np.count_nonzero(self.pnl <= 0))
+
+    @property
+    def total_pnl(self) -> float:
+        return self.final_equity - self.start_balance
+
+    @property
+    def total_pnl_pct(self) -> float:
+        return (self.final_equity / self.start_balance - 1) * 100 if self.start_balance > 0 else 0
+
+    @property
+    def winrate(self) -> float:
+        return (self.win_trades / self.num_trades * 100) if self.num_trades > 0 else 0
+
+    @property
+    def max_drawdown_pct(self) -> float:
+        if len(self.equity) == 0:
+            return 0.0
+        peak = np.maximum.accumulate(np.maximum(self.equity, self.start_balance))
+        return float(np.max((peak - self.equity) / peak) * 100)
+
+
+def run_long_only(price: np.ndarray, sig: np.ndarray,
+                  start_balance: float = 1000.0, fee: float = 0.001) -> BacktestResult:
+    """
+    Long-only szimuláció: BUY-nál mindent megveszünk, SELL-nél mindent eladunk,
+    fee egyirányú jutalék. A pozíció váltások tömb műveletekből jönnek, a pénz
+    számolás kötésenként (nem soronként) megy, ugyanabban a művelet sorrendben,
+    mint a régi ciklus, így az eredmény bitre azonos (pozitív árak mellett).
+    """
+    price = np.asarray(price, dtype=float)
+    buy_idx, sell_idx = transitions(sig)
+    buy_price = price[buy_idx]
+    sell_price = price[sell_idx]
+
+    n_buys = len(buy_idx)
+    qty = np.empty(n_buys)
+    pnl = np.empty(len(sell_idx))
+    balances = np.empty(len(sell_idx) + 1)   # cash a k-adik lezárt kötés után
+    balances[0] = balance = start_balance
+    for k in range(n_buys):
+        q = balance * (1 - fee) / buy_price[k]
+        qty[k] = q
+        if k < len(sell_idx):
+            net = q * sell_price[k] * (1 - fee)
+            pnl[k] = net - (buy_price[k] * q)
+            balance = net
+            balances[k + 1] = balance
+
+    # soronkénti equity: hány esemény (BUY/SELL) történt az adott sorig
+    events = np.empty(n_buys + len(sell_idx), dtype=np.int64)
+    events[0::2] = buy_idx
+    events[1::2] = sell_idx
+    n_ev = np.searchsorted(events, np.arange(len(price)), side="right")
+    in_pos = (n_ev % 2) == 1
+    equity = balances[n_ev // 2]
+    if n_buys:
+        equity = np.where(in_pos, qty[np.maximum((n_ev - 1) // 2, 0)] * price, equity)
+
+    if n_buys > len(sell_idx):
+        final_equity = 0.0 + qty[-1] * price[-1]
+    else:
+        final_equity = balance
+
+    return BacktestResult(
+        start_balance=start_balance,
+        equity=equity,
+        buy_idx=buy_idx,
+        sell_idx=sell_idx,
+        buy_price=buy_price,
+        sell_price=sell_price,
+        qty=qty,
+        pnl=pnl,
+        final_equity=float(final_equity),
+    )
+
+
+# ---- Portfolió (közös cash, több szimbólum) ----
+
+@dataclass
+class PortfolioResult:
+    """Portfólió futás: közös equity görbe + kötések szimbólumonként."""
+    start_balance: float
+    times: np.ndarray            # az equity görbe időpontjai (összes szimbólum sorai)
+    equity: np.ndarray
+    final_equity: float
+    trades: pd.DataFrame         # symbol, entry_time, exit_time, entry_price, exit_price, qty, cost, pnl
+
+    @property
+    def total_pnl(self) -> float:
+        return self.final_equity - self.start_balance
+
+    @property
+    def total_pnl_pct(self) -> float:
+        return (self.final_equity / self.start_balance - 1) * 100 if self.start_balance > 0 else 0
+
+    @property
+    def max_drawdown_pct(self) -> float:
+        if len(self.equity) == 0:
+            return 0.0
+        peak = np.maximum.accumulate(np.maximum(self.equity, self.start_balance))
+        return float(np.max((peak - self.equity) / peak) * 100)
+
+    def closed(self) -> pd.DataFrame:
+        return self.trades[self.trades["exit_time"].notna()]
+
+    def per_symbol(self) -> pd.DataFrame:
+        closed = self.closed()
+        g = closed.groupby("symbol")
+        out = pd.DataFrame({
+            "trades": g.size(),
+            "wins": g["pnl"].apply(lambda p: int((p > 0).sum())),
+            "pnl": g["pnl"].sum(),
+        })
+        out["winrate"] = np.where(out["trades"] > 0, out["wins"] / out["trades"] * 100, 0.0)
+        open_pos = self.trades[self.trades["exit_time"].isna()]
+        out = out.reindex(sorted(set(out.index) | set(open_pos["symbol"])), fill_value=0)
+        out["open"] = out.index.isin(open_pos["symbol"])
+        return out
+
+
+def _candidate_events(sig: np.ndarray) -> np.ndarray:
+    """
+    Sorindexek, ahol a jel számíthat: minden BUY (ha nem volt rá cash,
+    a következő BUY újra próbálkozik) és a SELL sorozatok első eleme.
+    """
+    nz = np.flatnonzero(sig)
+    s = sig[nz]
+    first_of_run = np.ones(len(s), dtype=bool)
+    first_of_run[1:] = s[1:] != s[:-1]
+    return nz[(s == BUY) | first_of_run]
+
+
+def run_portfolio(frames: dict, start_balance: float = 1000.0, fee: float = 0.001,
+                  alloc: str = "equal", fraction: float = 0.2,
+                  max_positions: int = None) -> PortfolioResult:
+    """
+    Több szimbólum egy menetben, közös cash egyenleggel, long-only.
+
+    frames: {symbol: (times datetime64[ns], price, sig)} - idő szerint rendezve.
+    alloc:
+      - 'equal':    BUY-nál cash / (flat szimbólumok száma)
+      - 'fraction': BUY-nál min(cash, fraction * start_balance)
+    max_positions: egyszerre legfeljebb ennyi nyitott pozíció.
+    A jelek tömb műveletekből jönnek; csak a jelölt eseményeken (időrendben,
+    az összes szimbólumra összefésülve) megy végig egy ciklus.
+    """
+    symbols = list(frames)
+    ev_time, ev_sym, ev_row = [], [], []
+    for k, sym in enumerate(symbols):
+        times, _, sig = frames[sym]
+        idx = _candidate_events(sig)
+        ev_time.append(np.asarray(times, dtype="datetime64[ns]")[idx].astype(np.int64))
+        ev_sym.append(np.full(len(idx), k, dtype=np.int64))
+        ev_row.append(idx)
+    ev_time = np.concatenate(ev_time) if ev_time else np.zeros(0, dtype=np.int64)
+    ev_sym = np.concatenate(ev_sym) if ev_sym else np.zeros(0, dtype=np.int64)
+    ev_row = np.concatenate(ev_row) if ev_row else np.zeros(0, dtype=np.int64)
+    order = np.lexsort((ev_sym, ev_time))
+
+    cash = start_balance
+    qty = [0.0] * len(symbols)
+    entry = [None] * len(symbols)     # (row, price, cost)
+    n_open = 0
+    trades = []
+    pos_rows = [[] for _ in symbols]  # (row, +qty / -qty) pozíció változások
+    cash_steps = [(np.int64(np.iinfo(np.int64).min), cash)]
+
+    for i in order:
+        k = ev_sym[i]
+        row = ev_row[i]
+        times, price, sig = frames[symbols[k]]
+        p = float(price[row])
+        if sig[row] == BUY and qty[k] == 0.0:
+            if max_positions is not None and n_open >= max_positions:
+                continue
+            if alloc == "fraction":
+                amount = min(cash, fraction * start_balance)
+            else:
+                amount = cash / (len(symbols) - n_open)
+            if amount <= 0:
+                continue
+            q = amount * (1 - fee) / p
+            cash -= amount
+            qty[k] = q
+            entry[k] = (row, p, amount)
+            n_open += 1
+            pos_rows[k].append((row, q))
+            cash_steps.append((ev_time[i], cash))
+        elif sig[row] == SELL and qty[k] > 0.0:
+            q = qty[k]
+            net = q * p * (1 - fee)
+            e_row, e_price, cost = entry[k]
+            trades.append((symbols[k], times[e_row], times[row], e_price, p, q, cost, net - e_price * q))
+            cash += net
+            qty[k] = 0.0
+            entry[k] = None
+            n_open -= 1
+            pos_rows[k].append((row, -q))
+            cash_steps.append((ev_time[i], cash))
+
+    for k, sym in enumerate(symbols):
+        if entry[k] is not None:
+            times, _, _ = frames[sym]
+            e_row, e_price, cost = entry[k]
+            trades.append((sym, times[e_row], pd.NaT, e_price, np.nan, qty[k], cost, np.nan))
+
+    # equity görbe: cash lépcső + szimbólumonként qty * utolsó ismert ár (forward fill)
+    values = []
+    for k, sym in enumerate(symbols):
+        times, price, _ = frames[sym]
+        held = np.zeros(len(price))
+        for row, dq in pos_rows[k]:
+            held[row] += dq
+        held = np.cumsum(held)
+        values.append(pd.Series(held * np.asarray(price, dtype=float),
+                                index=pd.DatetimeIndex(times), name=sym))
+    if values:
+        wide = pd.concat([v.groupby(level=0).last() for v in values], axis=1).sort_index().ffill().fillna(0.0)
+        all_times = wide.index.to_numpy()
+        steps = np.array([t for t, _ in cash_steps], dtype=np.int64)
+        levels = np.array([c for _, c in cash_steps])
+        pos = np.searchsorted(steps, all_times.astype("datetime64[ns]").astype(np.int64), side="right") - 1
+        equity = levels[pos] + wide.sum(axis=1).to_numpy()
+    else:
+        all_times = np.zeros(0, dtype="datetime64[ns]")
+        equity = np.zeros(0)
+
+    final_equity = cash + sum(
+        qty[k] * float(frames[sym][1][-1]) for k, sym in enumerate(symbols) if qty[k] > 0.0
+    )
+    trades_df = pd.DataFrame(trades, columns=["symbol", "entry_time", "exit_time", "entry_price",
+                                              "exit_price", "qty", "cost", "pnl"])
+    return PortfolioResult(start_balance, all_times, equity, float(final_equity), trades_df)
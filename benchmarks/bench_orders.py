@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Éles végrehajtás késleltetés mérés a lokális mock Binance szerver ellen
+(tests/mock_exchange.py): jelzés váltás -> teljesült megbízás -> pozíció.
+
+    python benchmarks/bench_orders.py --orders 200
+    python benchmarks/bench_orders.py --orders 200 --latency 0.02
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from order_execution import SignedClient, LiveExecutor, FilterCache  # noqa: E402
+from mock_exchange import MockExchange, MOCK_KEY, MOCK_SECRET, SYMBOLS  # noqa: E402
+
+
+def run_bench(orders: int, latency: float):
+    """Jelzés váltások egymás után; mérjük a submit() -> pozíció frissülés idejét."""
+    server = MockExchange(latency=latency).start()
+    client = SignedClient(MOCK_KEY, MOCK_SECRET, base_url=server.url)
+    syms = list(SYMBOLS)
+    with tempfile.TemporaryDirectory() as tmp:
+        ex = LiveExecutor(client, syms, filters=FilterCache(client, syms),
+                          state_path=Path(tmp) / "live_state.json").start()
+        times = []
+        side = "BUY"
+        for i in range(orders):
+            sym = syms[i % len(syms)]
+            t0 = time.perf_counter()
+            ex.submit([{"symbol": sym, "signal": side, "price": float(SYMBOLS[sym][2])}])
+            while sym in ex._pending:
+                time.sleep(0.0001)
+            times.append(time.perf_counter() - t0)
+            if sym == syms[-1]:
+                side = "SELL" if side == "BUY" else "BUY"
+        ex.stop()
+    server.shutdown()
+
+    times.sort()
+    print(f"{len(server.orders)} teljesült megbízás / {orders} jelzés váltás, "
+          f"nyitott pozíció: {len(ex.positions)}")
+    print(f"jelzés -> teljesülés: medián {statistics.median(times) * 1000:.2f} ms, "
+          f"p99 {times[int(len(times) * 0.99) - 1] * 1000:.2f} ms, max {times[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LiveExecutor késleltetés mérés mock Binance ellen.")
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="Szerver oldali késleltetés (mp)")
+    args = parser.parse_args()
+
+    run_bench(args.orders, args.latency)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Jelzés pipeline + backtest benchmark, hálózat nélkül (hamis Spot kliens).
+
+Mért lépések: gyertya lekérés + parse (cache seed / inkrementális frissítés),
+indikátor számítás, get_signal, get_all_signals, JSON szerializálás, log
+hozzáfűzés (csv / parquet) és backtest.backtest 10k / 1M / 10M soros logon.
+Az eredmény gépi olvasásra szánt JSON, így commitok között összevethető:
+
+    python benchmarks/bench_pipeline.py --out before.json
+    python benchmarks/bench_pipeline.py --out after.json
+    python benchmarks/bench_pipeline.py --compare before.json after.json
+
+Felvett gyertyákkal: --fixture klines.json (REST klines formátumú lista).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+try:
+    import config  # noqa: F401
+except ImportError:
+    # a trading_bot importálja; a benchmark nem hív valódi API-t
+    config = types.ModuleType("config")
+    config.API_KEY = ""
+    config.API_SECRET = ""
+    sys.modules["config"] = config
+
+import backtest as bt                      # noqa: E402
+import candle_cache                        # noqa: E402
+import indicators                          # noqa: E402
+import serialize                           # noqa: E402
+import signal_log                          # noqa: E402
+import trading_bot                         # noqa: E402
+from kline_archive import interval_ms      # noqa: E402
+
+DEFAULT_LOG_ROWS = (10_000, 1_000_000, 10_000_000)
+BENCH_SYMBOL = "BTCUSDC"
+
+
+class FakeSpot:
+    """
+    binance.spot.Spot.klines() helyettesítő. A gyertyák egy előre legenerált
+    (vagy fixture-ből betöltött) sorból jönnek, a `now` indexig: advance()
+    léptetésével új gyertya "jelenik meg", mint élesben. Minden szimbólum
+    ugyanazt a sort kapja (a költség szempontjából mindegy).
+    """
+
+    def __init__(self, interval: str = "5m", candles: int = 20_000, fixture: Path = None, seed: int = 0):
+        if fixture is not None:
+            self.rows = [list(k) for k in json.loads(Path(fixture).read_text())]
+        else:
+            self.rows = synthetic_klines(interval, candles, seed)
+        self.open_times = np.array([int(k[0]) for k in self.rows], dtype=np.int64)
+        self.now = len(self.rows) // 2
+        self.calls = 0
+
+    def advance(self, n: int = 1):
+        if self.now + n > len(self.rows):
+            raise RuntimeError("elfogytak a fixture gyertyák (nagyobb --candles kell)")
+        self.now += n
+
+    def klines(self, symbol, interval, limit=500, startTime=None, endTime=None, **kwargs):
+        self.calls += 1
+        lo = 0 if startTime is None else int(np.searchsorted(self.open_times[:self.now], startTime))
+        hi = self.now if endTime is None else int(np.searchsorted(self.open_times[:self.now], endTime, "right"))
+        if startTime is None:
+            lo = max(hi - limit, 0)
+        return [list(k) for k in self.rows[lo:min(hi, lo + limit)]]
+
+
+def synthetic_klines(interval: str, candles: int, seed: int = 0) -> list:
+    """Geometriai bolyongás, REST formában (string árak, mint a Binance)."""
+    rng = np.random.default_rng(seed)
+    step = interval_ms(interval)
+    t0 = 1_700_000_000_000 - 1_700_000_000_000 % step
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, candles)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.001, candles))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.001, candles))
+    vol = rng.uniform(1, 100, candles)
+    return [
+        [t0 + i * step, f"{open_[i]:.8f}", f"{high[i]:.8f}", f"{low[i]:.8f}", f"{close[i]:.8f}",
+         f"{vol[i]:.8f}", t0 + (i + 1) * step - 1, "0", 100, "0", "0", "0"]
+        for i in range(candles)
+    ]
+
+
+def synthetic_log(rows: int, symbol: str = BENCH_SYMBOL, seed: int = 0) -> pd.DataFrame:
+    """signals_log sorok (10 mp-enként), a bot oszlopaival."""
+    rng = np.random.default_rng(seed)
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, rows)))
+    s = pd.Series(price)
+    ema9 = s.ewm(span=9).mean().to_numpy()
+    ema21 = s.ewm(span=21).mean().to_numpy()
+    rsi = 50 + 35 * np.sin(np.cumsum(rng.normal(0, 0.05, rows)))
+    sig_rsi = np.where(rsi < 30, "BUY", np.where(rsi > 70, "SELL", "WAIT"))
+    sig = np.where((rsi < 30) & (ema9 > ema21), "BUY",
+                   np.where((rsi > 70) & (ema9 < ema21), "SELL", "WAIT"))
+    return pd.DataFrame({
+        "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows) * 10, unit="s"),
+        "symbol": symbol,
+        "price": price,
+        "rsi": rsi,
+        "ema9": ema9,
+        "ema21": ema21,
+        "signal_rsi": sig_rsi,
+        "signal_combined": sig,
+    })
+
+
+def write_log(df: pd.DataFrame, kind: str, root: Path):
+    """Log store a backend saját formátumában (parquet: napi partíciók, csv: egy fájl)."""
+    if kind == "csv":
+        backend = signal_log.CsvLogBackend(root / "signals_log.csv")
+        df.to_csv(backend.path, index=False, columns=signal_log.COLUMNS,
+                  date_format="%Y-%m-%dT%H:%M:%S")
+        return backend
+    backend = signal_log.ParquetLogBackend(root / "signals_log")
+    days = df["timestamp"].dt.strftime("%Y-%m-%d")
+    for (day, symbol), part in df.groupby([days, df["symbol"]], sort=False):
+        d = backend._partition_dir(day, symbol)
+        d.mkdir(parents=True, exist_ok=True)
+        table = signal_log.pa.Table.from_pandas(part, schema=backend.schema, preserve_index=False)
+        signal_log.pq.write_table(table, d / "data.parquet")
+    return backend
+
+
+# ---- mérés ----
+
+def measure(name: str, fn, repeat: int = 20, items: int = 1, setup=None, **params) -> dict:
+    """fn() futásideje `repeat`-szer (setup() minden futás előtt, nem mérve)."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    median = statistics.median(times)
+    res = {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "items": items,
+        "min_s": min(times),
+        "median_s": median,
+        "mean_s": statistics.fmean(times),
+        "per_item_us": median / items * 1e6,
+    }
+    print(f"{name:<28} {json.dumps(params):<40} median {median * 1e3:10.3f} ms"
+          f"  ({res['per_item_us']:.1f} µs / item)", file=sys.stderr)
+    return res
+
+
+def _reset_state():
+    with candle_cache._caches_lock:
+        candle_cache._caches.clear()
+    with indicators._states_lock:
+        indicators._states.clear()
+
+
+def bench_pipeline(fake: FakeSpot, symbols: list, repeat: int, tmp: Path) -> list:
+    interval, limit = trading_bot.HISTORY_INTERVAL, trading_bot.HISTORY_LIMIT
+    trading_bot._rest_client = lambda: fake
+    trading_bot.load_watchlist = lambda: (symbols, {})
+    n = len(symbols)
+    out = []
+
+    # 1) lekérés + parse: üres cache seed (teljes limit), majd 1 új gyertya
+    def seed_all():
+        for sym in symbols:
+            trading_bot._cached(sym, interval, limit)
+    out.append(measure("fetch_parse_seed", seed_all, repeat, n, setup=_reset_state,
+                       symbols=n, candles=limit))
+
+    def refresh_all():
+        for sym in symbols:
+            trading_bot._cached(sym, interval, limit)
+    out.append(measure("fetch_parse_incremental", refresh_all, repeat, n,
+                       setup=fake.advance, symbols=n))
+
+    # 2) indikátorok: hideg (teljes history) és inkrementális (1 új gyertya)
+    cache = trading_bot._cached(BENCH_SYMBOL, interval, limit)
+    holder = {}
+
+    def cold_setup():
+        holder["state"] = indicators.IndicatorState(limit)
+
+    def sync():
+        with cache.lock:
+            holder["state"].sync(cache.view("open_time"), cache.view("close"))
+    out.append(measure("indicators_cold", sync, repeat, 1, setup=cold_setup, candles=limit))
+
+    def warm_setup():
+        fake.advance()
+        cache.refresh(fake)
+    out.append(measure("indicators_incremental", sync, repeat, 1, setup=warm_setup))
+
+    # 3) teljes jelzés szimbólumonként / az egész watchlistre (log nélkül / log-gal)
+    def signal_all():
+        for sym in symbols:
+            trading_bot.get_signal(sym)
+    out.append(measure("get_signal", signal_all, repeat, n, setup=fake.advance, symbols=n))
+
+    signal_log._backend = signal_log.CsvLogBackend(tmp / "pipeline_log.csv")
+    for workers in sorted({1, trading_bot.FETCH_WORKERS}):
+        out.append(measure("get_all_signals", lambda w=workers: trading_bot.get_all_signals(max_workers=w),
+                           repeat, n, setup=fake.advance, symbols=n, workers=workers))
+
+    # 4) szerializálás (snapshot body)
+    results = trading_bot.get_all_signals(max_workers=1)
+    out.append(measure("serialize_signals", lambda: serialize.dumps(results), repeat, n,
+                       symbols=n, orjson=serialize.orjson is not None))
+
+    # 5) log hozzáfűzés: 100 poll kör, a végén flush (parquet: pufferelt)
+    rows = signal_log.signal_rows(results)
+    kinds = ["csv"] + (["parquet"] if signal_log.pq is not None else [])
+    for kind in kinds:
+        def append_rounds(kind=kind):
+            d = Path(tempfile.mkdtemp(dir=tmp))
+            backend = (signal_log.CsvLogBackend(d / "log.csv") if kind == "csv"
+                       else signal_log.ParquetLogBackend(d / "log"))
+            for _ in range(100):
+                backend.append(rows)
+            backend.flush()
+        out.append(measure("log_append", append_rounds, max(repeat // 4, 3), 100 * len(rows),
+                           backend=kind, rows_per_poll=len(rows)))
+    return out
+
+
+def bench_backtest(sizes, kinds, repeat: int, tmp: Path) -> list:
+    out = []
+    for rows in sizes:
+        df = synthetic_log(rows)
+        for kind in kinds:
+            if kind == "csv" and rows > 1_000_000:
+                print(f"backtest csv {rows} sor kihagyva (túl nagy CSV)", file=sys.stderr)
+                continue
+            d = Path(tempfile.mkdtemp(dir=tmp))
+            signal_log._backend = write_log(df, kind, d)
+
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    bt.backtest(symbol=BENCH_SYMBOL)
+            reps = repeat if rows <= 100_000 else max(1, repeat // 10)
+            out.append(measure("backtest", run, reps, rows, rows=rows, backend=kind))
+
+        clean = bt.clean_log(df.copy(), "combined")
+        out.append(measure("backtest_engine", lambda: bt.run_backtest(clean), repeat, rows, rows=rows))
+        del df, clean
+    return out
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(old_path: Path, new_path: Path):
+    """Két futás összevetése (median, new / old arány)."""
+    def key(r):
+        return r["name"], json.dumps(r["params"], sort_keys=True)
+
+    old = {key(r): r for r in json.loads(Path(old_path).read_text())["results"]}
+    new = json.loads(Path(new_path).read_text())["results"]
+    print(f"{'lépés':<28} {'paraméterek':<40} {'régi ms':>10} {'új ms':>10} {'arány':>7}")
+    for r in new:
+        o = old.get(key(r))
+        if o is None:
+            continue
+        ratio = r["median_s"] / o["median_s"] if o["median_s"] else float("nan")
+        print(f"{r['name']:<28} {json.dumps(r['params']):<40} {o['median_s'] * 1e3:10.3f} "
+              f"{r['median_s'] * 1e3:10.3f} {ratio:7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jelzés pipeline és backtest benchmark (offline).")
+    parser.add_argument("--symbols", type=int, default=50, help="Szimbólumok száma a watchlist helyett")
+    parser.add_argument("--repeat", type=int, default=20, help="Ismétlések lépésenként")
+    parser.add_argument("--candles", type=int, default=20_000, help="Szintetikus gyertyák száma")
+    parser.add_argument("--fixture", type=Path, help="Felvett klines JSON (REST formátum) a szintetikus helyett")
+    parser.add_argument("--log-rows", default=",".join(str(n) for n in DEFAULT_LOG_ROWS),
+                        help="Backtest log méretek vesszővel (alap: 10k,1M,10M)")
+    parser.add_argument("--log-backends", default=None,
+                        help="csv,parquet (alap: parquet, ha van pyarrow, különben csv)")
+    parser.add_argument("--skip-pipeline", action="store_true", help="Csak a backtest mérések")
+    parser.add_argument("--skip-backtest", action="store_true", help="Csak a pipeline mérések")
+    parser.add_argument("--out", type=Path, help="JSON eredmény fájl (alap: stdout)")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("OLD", "NEW"),
+                        help="Két korábbi JSON eredmény összevetése")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        raise SystemExit(0)
+
+    kinds = (args.log_backends.split(",") if args.log_backends
+             else ["parquet" if signal_log.pq is not None else "csv"])
+    sizes = [int(float(x)) for x in args.log_rows.split(",") if x.strip()]
+    symbols = [f"SYM{i:03d}USDC" for i in range(args.symbols)]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="crypto-bot-bench-") as tmp:
+        tmp = Path(tmp)
+        if not args.skip_pipeline:
+            fake = FakeSpot(trading_bot.HISTORY_INTERVAL, args.candles, args.fixture)
+            results += bench_pipeline(fake, symbols, args.repeat, tmp)
+        if not args.skip_backtest:
+            results += bench_backtest(sizes, kinds, max(args.repeat // 4, 3), tmp)
+        signal_log._backend = None
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "orjson": serialize.orjson is not None,
+            "pyarrow": signal_log.pq is not None,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+History szerializálás mikro-benchmark: egy szimbólum history-jának
+(HISTORY_LIMIT gyertya) előállítása + JSON kódolása, régi és új úton.
+
+    python benchmarks/bench_serialize.py [--points 288] [--repeat 2000]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serialize                       # noqa: E402
+from serialize import dumps, time_labels   # noqa: E402
+
+
+def make_columns(points: int):
+    rng = np.random.default_rng(0)
+    open_times = 1_700_000_000_000 + np.arange(points, dtype=np.int64) * 300_000
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, points)))
+    ema9 = pd.Series(closes).ewm(span=9).mean().to_numpy()
+    ema21 = pd.Series(closes).ewm(span=21).mean().to_numpy()
+    rsi = rng.uniform(20, 80, points)
+    rsi[:14] = np.nan
+    return open_times, closes, ema9, ema21, rsi
+
+
+def legacy_encode(open_times, closes, ema9, ema21, rsi) -> bytes:
+    """A korábbi út: DataFrame, soronkénti pd.notna, dt.strftime, json.dumps."""
+    df = pd.DataFrame({"open_time": open_times, "c": closes, "ema9": ema9, "ema21": ema21, "rsi": rsi})
+
+    def clean(series):
+        return [float(v) if pd.notna(v) else None for v in series]
+
+    hist = df.copy()
+    history = {
+        "open_times": [int(t) for t in hist["open_time"]],
+        "times": pd.to_datetime(hist["open_time"], unit="ms").dt.strftime("%H:%M").tolist(),
+        "prices": clean(hist["c"]),
+        "ema9": clean(hist["ema9"]),
+        "ema21": clean(hist["ema21"]),
+        "rsi": clean(hist["rsi"]),
+    }
+    return json.dumps(history, separators=(",", ":")).encode("utf-8")
+
+
+def fast_encode(open_times, closes, ema9, ema21, rsi) -> bytes:
+    """Az új út (trading_bot._history + serialize.dumps)."""
+    history = {
+        "open_times": np.array(open_times, dtype=np.int64),
+        "times": time_labels(open_times),
+        "prices": np.array(closes),
+        "ema9": np.array(ema9),
+        "ema21": np.array(ema21),
+        "rsi": np.array(rsi),
+    }
+    return dumps(history)
+
+
+def bench(fn, cols, repeat: int) -> float:
+    fn(*cols)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(*cols)
+    return (time.perf_counter() - t0) / repeat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="History szerializálás benchmark (régi vs új).")
+    parser.add_argument("--points", type=int, default=288, help="Gyertyák száma / szimbólum")
+    parser.add_argument("--repeat", type=int, default=2000, help="Ismétlések száma")
+    args = parser.parse_args()
+
+    cols = make_columns(args.points)
+    assert json.loads(legacy_encode(*cols)) == json.loads(fast_encode(*cols))
+
+    legacy = bench(legacy_encode, cols, args.repeat)
+    fast = bench(fast_encode, cols, args.repeat)
+    orjson_mod, serialize.orjson = serialize.orjson, None
+    fallback = bench(fast_encode, cols, args.repeat)
+    serialize.orjson = orjson_mod
+
+    print(f"{args.points} pont / szimbólum, {args.repeat} ismétlés")
+    print(f" - régi (pandas + json):        {legacy * 1e6:9.1f} µs / szimbólum")
+    print(f" - új, json fallback:           {fallback * 1e6:9.1f} µs / szimbólum")
+    if orjson_mod is not None:
+        print(f" - új, orjson:                  {fast * 1e6:9.1f} µs / szimbólum  "
+              f"({legacy / fast:.0f}x)")
+    else:
+        print(" - orjson nincs telepítve (pip install orjson)")
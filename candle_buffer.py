@@ -0,0 +1,122 @@
+import numpy as np
+
+# Gyertya oszlopok (a REST kline lista első 7 eleme, típusosan)
+KLINE_COLUMNS = (
+    ("open_time", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+    ("close_time", np.int64),
+)
+INDICATOR_COLUMNS = (
+    ("ema9", np.float64),
+    ("ema21", np.float64),
+    ("rsi", np.float64),
+)
+
+
+def parse_kline(k) -> tuple:
+    """REST / stream kline lista -> (open_time, o, h, l, c, v, close_time) típusosan"""
+    return (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]), int(k[6]))
+
+
+class CandleRing:
+    """
+    Fix kapacitású gyűrűs puffer oszloponként egy-egy típusos NumPy tömbben.
+
+    Minden érték kétszer kerül tárolásra (i és i + capacity helyen), így az
+    utolsó n elem mindig egy folytonos szelet: view() másolás nélküli nézetet
+    ad (history szerializáláshoz, backtesthez). A memória fix:
+    2 * capacity * oszlopszám * 8 byte, hozzáfűzéskor nincs allokáció.
+
+    stage(): a következő helyre ír, de nem lépteti a puffert (pl. a nyitott
+    gyertya ideiglenes indikátor értéke), view(staged=True) ezt is mutatja.
+    A puffer nem szálbiztos, a tulajdonos lockja alatt használjuk.
+    """
+
+    def __init__(self, capacity: int, columns=KLINE_COLUMNS):
+        if capacity < 1:
+            raise ValueError("capacity >= 1 kell")
+        self.capacity = capacity
+        self.names = tuple(name for name, _ in columns)
+        self._data = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in columns}
+        self._cols = [self._data[name] for name in self.names]
+        self._end = 0       # eddig hozzáfűzött elemek száma (monoton)
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def clear(self):
+        self._end = 0
+        self._len = 0
+
+    def _write(self, pos: int, values):
+        i = pos % self.capacity
+        j = i + self.capacity
+        for col, v in zip(self._cols, values):
+            col[i] = v
+            col[j] = v
+
+    def append(self, values):
+        """Új sor (oszlop sorrendben)."""
+        self._write(self._end, values)
+        self._end += 1
+        if self._len < self.capacity:
+            self._len += 1
+
+    def load(self, columns: dict):
+        """
+        Puffer feltöltése oszloponként ({név: tömb}, időrendben, pl. checkpointból);
+        a kapacitásnál hosszabb sorból az utolsó elemek maradnak.
+        """
+        n = min(min(len(columns[name]) for name in self.names), self.capacity)
+        for name in self.names:
+            arr = np.asarray(columns[name])
+            arr = arr[len(arr) - n:]
+            self._data[name][:n] = arr
+            self._data[name][self.capacity:self.capacity + n] = arr
+        self._end = n
+        self._len = n
+
+    def replace_last(self, values):
+        if not self._len:
+            raise IndexError("üres puffer")
+        self._write(self._end - 1, values)
+
+    def stage(self, values):
+        """Ideiglenes sor a következő helyre (append nélkül)."""
+        self._write(self._end, values)
+
+    def last(self, name: str):
+        if not self._len:
+            return None
+        return self._data[name][(self._end - 1) % self.capacity].item()
+
+    def row(self, index: int = -1) -> tuple:
+        """Egy sor tuple-ként (negatív index a végéről)."""
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        i = (self._end - self._len + index) % self.capacity
+        return tuple(col[i].item() for col in self._cols)
+
+    def view(self, name: str, n: int = None, staged: bool = False) -> np.ndarray:
+        """
+        Az utolsó n elem (alap: mind) másolás nélküli nézete, időrendben.
+        staged=True: a stage()-elt sor is a végére kerül (n-be beleszámít).
+        A nézet a következő írásig érvényes.
+        """
+        avail = self._len + (1 if staged else 0)
+        if staged and self._len == self.capacity:
+            avail = self.capacity   # a stage a legrégebbi helyére írt
+        n = avail if n is None else min(n, avail)
+        end = self._end + (1 if staged else 0)
+        start = (end - n) % self.capacity
+        return self._data[name][start:start + n]
+
+    def columns(self, n: int = None, staged: bool = False) -> dict:
+        return {name: self.view(name, n, staged) for name in self.names}
@@ -0,0 +1,198 @@
+import threading
+
+from candle_buffer import CandleRing, parse_kline
+
+
+class CandleCache:
+    """
+    Egy (symbol, interval) pár gyertyái memóriában.
+
+    Első híváskor a teljes `limit` history-t letöltjük, utána csak az
+    utolsó tárolt open_time-tól kérünk (startTime), így a még nyitott
+    utolsó gyertyát helyben lecseréljük, az újakat pedig hozzáfűzzük.
+    A gyertyák típusos NumPy gyűrűs pufferben vannak (candle_buffer.CandleRing),
+    a view()-k másolás nélküliek, ezért a lock alatt olvassuk őket.
+    A `limit` a legnagyobb igényelt history: kisebb limittel CacheView-t adunk.
+    """
+
+    def __init__(self, symbol: str, interval: str, limit: int):
+        self.symbol = symbol
+        self.interval = interval
+        self.limit = limit
+        self.ring = CandleRing(limit)     # open_time szerint rendezve
+        self.lock = threading.RLock()
+        self._short = False               # bővítés után a régebbi gyertyák még hiányoznak
+        self.seeds = 0                    # teljes letöltések száma (cache miss metrikához)
+
+    def __len__(self):
+        return len(self.ring)
+
+    @property
+    def last_open_time(self):
+        return self.ring.last("open_time")
+
+    @property
+    def needs_seed(self) -> bool:
+        """A következő refresh() teljes letöltés lesz (üres / bővített cache)."""
+        return self._short or not len(self.ring)
+
+    def grow(self, limit: int):
+        """Nagyobb limit igény: a meglévő gyertyák maradnak, a következő refresh() újratölt."""
+        with self.lock:
+            if limit <= self.limit:
+                return
+            ring = CandleRing(limit)
+            if len(self.ring):
+                ring.load(self.ring.columns())
+                self._short = True
+            self.ring = ring
+            self.limit = limit
+
+    def _seed(self, client):
+        klines = client.klines(self.symbol, self.interval, limit=self.limit)
+        self.ring.clear()
+        for k in klines:
+            self.ring.append(parse_kline(k))
+        self._short = False
+        self.seeds += 1
+        return len(klines)
+
+    def _merge(self, klines):
+        """Új gyertyák beillesztése: azonos open_time -> csere, újabb -> hozzáfűzés."""
+        changed = 0
+        for k in klines:
+            row = parse_kline(k)
+            last = self.ring.last("open_time")
+            if row[0] == last:
+                if self.ring.row(-1) != row:
+                    self.ring.replace_last(row)
+                    changed += 1
+            elif row[0] > last:
+                self.ring.append(row)
+                changed += 1
+        return changed
+
+    def refresh(self, client):
+        """Frissítés a tőzsdéről, visszaadja hány gyertya változott / jött."""
+        with self.lock:
+            if self.needs_seed:
+                return self._seed(client)
+
+            klines = client.klines(
+                self.symbol, self.interval,
+                startTime=self.last_open_time, limit=self.limit
+            )
+            # Ha a rés nagyobb, mint a teljes history (pl. sokáig állt a bot),
+            # egyszerűbb újratölteni a legutolsó `limit` gyertyát.
+            if len(klines) >= self.limit:
+                return self._seed(client)
+            return self._merge(klines)
+
+    def apply(self, kline):
+        """Egy (pl. websocketről jött) gyertya beillesztése, seedelés előtt eldobjuk."""
+        with self.lock:
+            if not len(self.ring):
+                return 0
+            return self._merge([kline])
+
+    def view(self, name: str, n: int = None):
+        """Egy oszlop (utolsó n eleme) másolás nélküli nézete (a lock alatt használd)."""
+        return self.ring.view(name, n)
+
+    def checkpoint(self):
+        """Állapot mentéshez: {oszlop: tömb másolat}."""
+        return self.snapshot()
+
+    def restore(self, columns: dict) -> bool:
+        """Checkpointból visszatöltés (csak üres cache-be); utána refresh() már csak a rést kéri."""
+        with self.lock:
+            if len(self.ring):
+                return False
+            self.ring.load(columns)
+            return bool(len(self.ring))
+
+    def snapshot(self, n: int = None):
+        """A tárolt (utolsó n) gyertyák másolata oszloponként ({név: tömb})."""
+        with self.lock:
+            return {name: arr.copy() for name, arr in self.ring.columns(n).items()}
+
+
+class CacheView:
+    """
+    Egy közös CandleCache a kért limitre vágva (az utolsó `limit` gyertya):
+    a különböző limittel hívók (dashboard, bot, backtest letöltés) ugyanazt a
+    cache-t frissítik, nem töltik újra egymás elől.
+    """
+
+    def __init__(self, cache: CandleCache, limit: int):
+        self.cache = cache
+        self.symbol = cache.symbol
+        self.interval = cache.interval
+        self.limit = limit
+        self.lock = cache.lock
+
+    def __len__(self):
+        return min(len(self.cache), self.limit)
+
+    @property
+    def last_open_time(self):
+        return self.cache.last_open_time
+
+    @property
+    def needs_seed(self) -> bool:
+        return self.cache.needs_seed
+
+    @property
+    def seeds(self) -> int:
+        return self.cache.seeds
+
+    def refresh(self, client):
+        return self.cache.refresh(client)
+
+    def apply(self, kline):
+        return self.cache.apply(kline)
+
+    def view(self, name: str, n: int = None):
+        return self.cache.view(name, self.limit if n is None else min(n, self.limit))
+
+    def checkpoint(self):
+        return self.cache.checkpoint()
+
+    def restore(self, columns: dict) -> bool:
+        return self.cache.restore(columns)
+
+    def snapshot(self, n: int = None):
+        return self.cache.snapshot(self.limit if n is None else min(n, self.limit))
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(symbol: str, interval: str, limit: int):
+    """
+    (symbol, interval) -> CandleCache, a kapacitás az eddigi legnagyobb limit;
+    kisebb limitre CacheView (ugyanazok a gyertyák, az utolsó `limit` darab).
+    """
+    key = (symbol, interval)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = CandleCache(symbol, interval, limit)
+            _caches[key] = cache
+        elif limit > cache.limit:
+            cache.grow(limit)
+    return cache if limit == cache.limit else CacheView(cache, limit)
+
+
+def cache_items():
+    """[((symbol, interval), CandleCache)] pillanatkép (checkpointhoz)."""
+    with _caches_lock:
+        return list(_caches.items())
+
+
+def drop_cache(symbol: str, interval: str = None):
+    """Szimbólum cache-ének eldobása (watchlistről levett pár); interval=None: mind."""
+    with _caches_lock:
+        for key in [k for k in _caches if k[0] == symbol and (interval is None or k[1] == interval)]:
+            del _caches[key]
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+import metrics
+from candle_cache import cache_items, get_cache
+from indicators import state_items, get_indicator_state
+from timeframes import bars_items, get_timeframe_bars
+
+CHECKPOINT_PATH = Path(__file__).with_name("state_checkpoint.npz")
+CHECKPOINT_SECONDS = 60        # ennyi mp-enként mentünk (és leálláskor)
+CHECKPOINT_VERSION = 1         # formátum változáskor emelni: a régi fájlt figyelmen kívül hagyjuk
+
+metrics.describe("cryptobot_checkpoint_entries", "Checkpointba mentett / visszatöltött elemek száma")
+
+
+def shard_path(shard: int, path: Path = CHECKPOINT_PATH) -> Path:
+    """Shardonként külön fájl (state_checkpoint.shard<N>.npz)."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.shard{shard}{path.suffix}")
+
+
+def _collect():
+    """(meta bejegyzések, {név: tömb}) a memóriában lévő cache / indikátor / idősík állapotokból."""
+    entries = []
+    arrays = {}
+
+    def add(kind, key, limit, data, last_time):
+        i = len(entries)
+        entries.append({"kind": kind, "key": list(key), "limit": limit, "last_time": last_time})
+        for name, arr in data.items():
+            arrays[f"{i}/{name}"] = arr
+
+    for key, cache in cache_items():
+        data = cache.checkpoint()
+        if len(data["open_time"]):
+            add("cache", key, cache.limit, data, int(data["open_time"][-1]))
+    for key, state in state_items():
+        data = state.checkpoint()
+        if data["scalars"][8] >= 0:
+            add("state", key, state.limit, data, int(data["scalars"][8]))
+    for key, bars in bars_items():
+        data = bars.checkpoint()
+        if data["last_base"][0] >= 0:
+            add("bars", key, bars.limit, data, int(data["last_base"][0]))
+    return entries, arrays
+
+
+def save(path: Path = CHECKPOINT_PATH) -> int:
+    """
+    Gyertya pufferek + indikátor / idősík futó állapotok mentése egy tömörített
+    .npz fájlba (formátum verzió, mentés ideje, elemenként az utolsó gyertya ideje).
+    Atomikus csere: félbeszakadt mentés nem rontja el az előzőt.
+    """
+    path = Path(path)
+    with metrics.timer("cryptobot_stage_seconds", stage="checkpoint_save", symbol="all"):
+        entries, arrays = _collect()
+        meta = {"version": CHECKPOINT_VERSION, "saved_at": int(time.time() * 1000), "entries": entries}
+        arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+    metrics.inc("cryptobot_checkpoint_entries", len(entries), op="save")
+    return len(entries)
+
+
+def restore(path: Path = CHECKPOINT_PATH, symbols=None) -> int:
+    """
+    Induláskor: a mentett állapot visszatöltése (symbols: csak ezekre).
+    Utána a cache refresh() csak a mentés óta eltelt rést kéri le, az
+    indikátorok pedig onnan folytatnak; nem illeszkedő állapotnál a szokásos
+    út (teljes letöltés / újraszámolás) veszi át. Visszaadja a betöltött elemek számát.
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(z["meta"].tobytes())
+            if meta.get("version") != CHECKPOINT_VERSION:
+                print(f"Checkpoint: ismeretlen verzió ({meta.get('version')}), kihagyjuk:", path)
+                return 0
+            names = {}
+            for name in z.files:
+                i, _, field = name.partition("/")
+                if field:
+                    names.setdefault(int(i), []).append(field)
+            wanted = None if symbols is None else set(symbols)
+            restored = 0
+            for i, e in enumerate(meta["entries"]):
+                key = e["key"]
+                if wanted is not None and key[0] not in wanted:
+                    continue
+                data = {field: z[f"{i}/{field}"] for field in names.get(i, ())}
+                if e["kind"] == "cache":
+                    ok = get_cache(key[0], key[1], e["limit"]).restore(data)
+                elif e["kind"] == "state":
+                    ok = get_indicator_state(key[0], key[1], e["limit"]).restore(data)
+                elif e["kind"] == "bars":
+                    ok = get_timeframe_bars(key[0], key[1], e["limit"], key[2]).restore(data)
+                else:
+                    ok = False
+                restored += bool(ok)
+    except Exception as e:
+        print("Hiba a checkpoint betöltésénél (hidegindítás):", e)
+        return 0
+    metrics.inc("cryptobot_checkpoint_entries", restored, op="restore")
+    return restored
+
+
+class Checkpointer:
+    """Háttérszál: CHECKPOINT_SECONDS-enként save(), stop()-kor (és kilépéskor) még egyszer."""
+
+    def __init__(self, path: Path = CHECKPOINT_PATH, interval: float = CHECKPOINT_SECONDS):
+        self.path = Path(path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def save(self):
+        with self._lock:
+            try:
+                return save(self.path)
+            except Exception as e:
+                print("Hiba a checkpoint mentésénél:", e)
+                return 0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.save()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="checkpoint", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.save()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Checkpoint fájl tartalma.")
+    parser.add_argument("path", nargs="?", default=str(CHECKPOINT_PATH))
+    args = parser.parse_args()
+
+    with np.load(args.path, allow_pickle=False) as z:
+        meta = json.loads(z["meta"].tobytes())
+    saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(meta["saved_at"] / 1000))
+    print(f"verzió: {meta['version']}, mentve: {saved}, elemek: {len(meta['entries'])}")
+    for e in meta["entries"]:
+        last = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["last_time"] / 1000))
+        print(f"  {e['kind']:<6} {'/'.join(e['key']):<24} limit {e['limit']:>5}  utolsó gyertya: {last}")
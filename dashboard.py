@@ -1,9 +1,24 @@
 #!/usr/bin/env python3
-from flask import Flask, render_template_string, jsonify
-from trading_bot import get_signal, get_all_signals
+from flask import Flask, render_template_string, jsonify, request, Response, g
+from trading_bot import get_signal, get_all_signals, HISTORY_LIMIT
+from snapshot import SnapshotRefresher, REFRESH_SECONDS, summarize
+from history_codec import history_delta, parse_since, encode_binary
+from serialize import dumps
+from shards import SignalTable, HEARTBEAT_TIMEOUT
+from watchlist import watchlist_manager
+import metrics
+import time
+from functools import partial
 
 app = Flask(__name__)
 
+# Egyetlen háttérszál számol, a handlerek csak a kész snapshotot adják ki.
+# A jelzés logot a bot írja, a dashboard nem (különben duplikált sorok, két író egy fájlon).
+refresher = SnapshotRefresher(partial(get_all_signals, log=False), REFRESH_SECONDS)
+
+REPLAY_STEP_SECONDS = 0.2      # --replay --speed 0: ennyi valós mp-enként lép egy frissítési kört
+SSE_HEARTBEAT_SECONDS = 15     # ennyi csend után ping komment (proxy / kapcsolat életben tartás)
+
 TEMPLATE = """
 <!doctype html>
 <html>
@@ -254,69 +269,191 @@ TEMPLATE = """
         }
       }
 
+      let histories = {};           // symbol -> lokálisan tárolt history (delta-val frissítve)
+      let maxPoints = 288;          // szerver history hossza
+
+      // delta beolvasztása: az első új open_time-tól eldobjuk a régit, hozzáfűzzük az újat
+      function mergeHistory(old, delta) {
+        if (!old || !delta.open_times.length) return old || delta;
+        const first = delta.open_times[0];
+        let cut = old.open_times.length;
+        while (cut > 0 && old.open_times[cut - 1] >= first) cut--;
+        const merged = {};
+        Object.keys(delta).forEach(k => {
+          merged[k] = old[k].slice(0, cut).concat(delta[k]);
+          if (merged[k].length > maxPoints) merged[k] = merged[k].slice(merged[k].length - maxPoints);
+        });
+        return merged;
+      }
+
+      async function refreshHistory(symbol) {
+        const known = histories[symbol];
+        let url = '/api/history?symbols=' + symbol;
+        if (known && known.open_times.length) {
+          url += '&since=' + symbol + ':' + known.open_times[known.open_times.length - 1];
+        }
+        const resp = await fetch(url);
+        const payload = await resp.json();
+        if (payload.error) {
+          console.error('history API hiba:', payload.error);
+          return;
+        }
+        if (payload.max_points) maxPoints = payload.max_points;
+        const delta = payload.history[symbol];
+        if (!delta) return;
+        histories[symbol] = mergeHistory(known, delta);
+        if (symbol === currentSymbol) {
+          currentHistory = histories[symbol];
+          updateChartFromHistory();
+        }
+      }
+
       function selectSymbol(symbol) {
         if (!allSignalsData || allSignalsData.length === 0) return;
         const row = allSignalsData.find(r => r.symbol === symbol);
-        if (!row || !row.history) return;
+        if (!row) return;
 
         currentSymbol = symbol;
-        currentHistory = row.history;
+        currentHistory = histories[symbol] || null;
         if (selectedChart) {
           selectedChart.resetZoom();
         }
         updateChartFromHistory();
+        refreshHistory(symbol).catch(err => console.error('refreshHistory hiba:', err));
+      }
+
+      const rowEls = {};            // symbol -> <tr>, csak a változott cellákat írjuk át
+
+      // NaN -> null a JSON-ban (pl. kevés gyertya / több idősík): '-' a táblában
+      function fmt(v) {
+        return v == null ? '-' : v.toFixed(2);
+      }
+
+      function setCell(td, text, cls) {
+        if (td.textContent !== text) td.textContent = text;
+        if (cls !== undefined && td.className !== cls) td.className = cls;
+      }
+
+      function renderRows(rows) {
+        const tbody = document.getElementById('signals-table-body');
+        rows.forEach(row => {
+          let tr = rowEls[row.symbol];
+          if (!tr) {
+            tr = document.createElement('tr');
+            tr.className = 'clickable-row';
+            for (let i = 0; i < 7; i++) tr.appendChild(document.createElement('td'));
+            tr.addEventListener('click', () => selectSymbol(row.symbol));
+            tbody.appendChild(tr);
+            rowEls[row.symbol] = tr;
+          }
+          const td = tr.children;
+          setCell(td[0], row.symbol);
+          setCell(td[1], fmt(row.price));
+          setCell(td[2], fmt(row.rsi));
+          setCell(td[3], fmt(row.ema9));
+          setCell(td[4], fmt(row.ema21));
+          setCell(td[5], row.signal_rsi, row.signal_rsi);
+          setCell(td[6], row.signal, row.signal);
+        });
+      }
+
+      function removeMissingRows(symbols) {
+        Object.keys(rowEls).forEach(sym => {
+          if (!symbols.includes(sym)) {
+            rowEls[sym].remove();
+            delete rowEls[sym];
+            delete histories[sym];
+          }
+        });
+      }
+
+      // ----- SSE: a szerver csak változáskor küld -----
+      function applyStreamUpdate(msg) {
+        if (msg.max_points) maxPoints = msg.max_points;
+        msg.rows.forEach(row => {
+          const i = allSignalsData.findIndex(r => r.symbol === row.symbol);
+          if (i >= 0) allSignalsData[i] = row; else allSignalsData.push(row);
+        });
+        if (msg.removed.length) {
+          allSignalsData = allSignalsData.filter(r => !msg.removed.includes(r.symbol));
+          removeMissingRows(allSignalsData.map(r => r.symbol));
+        }
+        renderRows(msg.rows);
+
+        Object.keys(msg.history).forEach(sym => {
+          histories[sym] = mergeHistory(histories[sym], msg.history[sym]);
+        });
+        if (!currentSymbol && allSignalsData.length > 0) {
+          currentSymbol = allSignalsData[0].symbol;
+        }
+        if (currentSymbol && msg.history[currentSymbol]) {
+          currentHistory = histories[currentSymbol];
+          updateChartFromHistory();
+        }
+      }
+
+      let pollTimer = null;
+      function startPolling() {
+        if (pollTimer) return;
+        refreshAllSignals();
+        pollTimer = setInterval(() => {
+          refreshAllSignals();
+        }, 5000);
+      }
+
+      function startStream() {
+        if (!window.EventSource) {
+          startPolling();
+          return;
+        }
+        const es = new EventSource('/api/stream');
+        let opened = false;
+        es.addEventListener('open', () => { opened = true; });
+        es.addEventListener('update', ev => {
+          try {
+            applyStreamUpdate(JSON.parse(ev.data));
+          } catch (err) {
+            console.error('stream update hiba:', err);
+          }
+        });
+        es.addEventListener('error', () => {
+          // ha már az első kapcsolat sem jön létre, visszaállunk pollingra
+          if (!opened) {
+            es.close();
+            startPolling();
+          }
+        });
       }
 
       async function refreshAllSignals() {
         try {
-          const resp = await fetch('/api/all_signals');
-          const data = await resp.json();
+          // táblázathoz elég az összefoglaló (history nélkül)
+          const resp = await fetch('/api/summary');
+          if (resp.status === 304) return;   // nincs változás (ETag)
+          const payload = await resp.json();
 
-          if (data.error) {
-            console.error('all_signals API hiba:', data.error);
+          if (payload.error) {
+            console.error('summary API hiba:', payload.error);
             return;
           }
 
+          const data = payload.signals;
           if (!Array.isArray(data)) {
-            console.error('Nem lista jött /api/all_signals-tól:', data);
+            console.error('Nem lista jött /api/summary-tól:', payload);
             return;
           }
 
           allSignalsData = data;
+          renderRows(data);
+          removeMissingRows(data.map(r => r.symbol));
 
-          // ----- TÁBLÁZAT -----
-          const tbody = document.getElementById('signals-table-body');
-          tbody.innerHTML = '';
-
-          data.forEach(row => {
-            const tr = document.createElement('tr');
-            tr.className = 'clickable-row';
-
-            tr.innerHTML = `
-              <td>${row.symbol}</td>
-              <td>${row.price.toFixed(2)}</td>
-              <td>${row.rsi.toFixed(2)}</td>
-              <td>${row.ema9.toFixed(2)}</td>
-              <td>${row.ema21.toFixed(2)}</td>
-              <td class="${row.signal_rsi}">${row.signal_rsi}</td>
-              <td class="${row.signal}">${row.signal}</td>
-            `;
-            tr.addEventListener('click', () => selectSymbol(row.symbol));
-            tbody.appendChild(tr);
-          });
-
-          // ha már van kiválasztott coin, frissítsük a history-ját
-          if (currentSymbol) {
-            const row = data.find(r => r.symbol === currentSymbol);
-            if (row && row.history) {
-              currentHistory = row.history;
-              updateChartFromHistory();
-            }
-          } else if (data.length > 0) {
+          // ha már van kiválasztott coin, csak a változott history pontokat kérjük le
+          if (!currentSymbol && data.length > 0) {
             // első betöltéskor válasszuk az első coint
             currentSymbol = data[0].symbol;
-            currentHistory = data[0].history;
-            updateChartFromHistory();
+          }
+          if (currentSymbol) {
+            await refreshHistory(currentSymbol);
           }
 
         } catch (err) {
@@ -326,10 +463,7 @@ TEMPLATE = """
 
       window.addEventListener('load', function() {
         updateRangeButtons();
-        refreshAllSignals();
-        setInterval(() => {
-          refreshAllSignals();
-        }, 5000);
+        startStream();
       });
     </script>
   </head>
@@ -389,6 +523,48 @@ TEMPLATE = """
 </html>
 """
 
+metrics.describe("cryptobot_http_request_seconds", "Dashboard HTTP handlerek ideje (SSE: a válasz indulásáig)")
+
+
+@app.before_request
+def _start_refresher():
+    refresher.start()
+    if metrics.METRICS_ENABLED:
+        g.metrics_t0 = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(resp):
+    t0 = g.get("metrics_t0")
+    if t0 is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else "other"
+        metrics.observe("cryptobot_http_request_seconds", time.perf_counter() - t0,
+                        endpoint=endpoint, status=str(resp.status_code))
+    return resp
+
+
+def _snapshot_response(body: bytes, etag: str, generated_at: str):
+    resp = Response(body, mimetype="application/json")
+    # gyenge validátor: az etag a jelzések tartalmából jön, a body generated_at-je
+    # változatlan jelzéseknél is friss (a 304 "szemantikailag azonos" választ jelent)
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Generated-At"] = generated_at
+    return resp.make_conditional(request)
+
+
+def _json_response(obj, status: int = 200):
+    """jsonify helyett: numpy tömbök közvetlenül, NaN -> null (serialize.dumps)"""
+    return Response(dumps(obj), status=status, mimetype="application/json")
+
+
+def _not_ready():
+    resp = jsonify({"error": "még nincs adat, az első frissítés folyamatban"})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(REFRESH_SECONDS)
+    return resp
+
+
 @app.route("/")
 def index():
     return render_template_string(TEMPLATE)
@@ -396,20 +572,196 @@ def index():
 @app.route("/api/signal")
 def api_signal():
     # backend oldalon meghagyjuk, ha később kell
+    snap = refresher.current()
+    s = snap.find("BTCUSDC") if snap is not None else None
+    if s is not None:
+        return _json_response(s)
     try:
         s = get_signal("BTCUSDC")
-        return jsonify(s)
+        return _json_response(s)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/all_signals")
 def api_all_signals():
-    try:
-        s = get_all_signals()
-        return jsonify(s)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    snap = refresher.current()
+    if snap is None:
+        return _not_ready()
+    return _snapshot_response(snap.body, snap.etag, snap.generated_at)
+
+@app.route("/api/summary")
+def api_summary():
+    # táblázathoz: jelzések history nélkül
+    snap = refresher.current()
+    if snap is None:
+        return _not_ready()
+    return _snapshot_response(snap.summary_body, snap.summary_etag, snap.generated_at)
+
+@app.route("/api/history")
+def api_history():
+    """
+    Delta history: ?symbols=BTCUSDC,ETHUSDC&since=BTCUSDC:<open_time ms>,...
+    Ahol van since, csak az annál nem régebbi pontok jönnek (az utolsó
+    ismert gyertya is, mert az még változhatott).
+    format=json (alap, oszlopos) vagy format=bin (application/octet-stream).
+    """
+    snap = refresher.current()
+    if snap is None:
+        return _not_ready()
+
+    since = parse_since(request.args.get("since", ""))
+    wanted = request.args.get("symbols")
+    if wanted:
+        wanted = [w.strip().upper() for w in wanted.split(",") if w.strip()]
+    else:
+        wanted = [s["symbol"] for s in snap.signals]
+
+    histories = {}
+    for sym in wanted:
+        s = snap.find(sym)
+        if s is not None and s.get("history"):
+            histories[sym] = history_delta(s["history"], since.get(sym))
+
+    if request.args.get("format") == "bin":
+        resp = Response(encode_binary(histories), mimetype="application/octet-stream")
+        resp.headers["X-Generated-At"] = snap.generated_at
+        return resp
+    return _json_response({
+        "generated_at": snap.generated_at,
+        "max_points": HISTORY_LIMIT,
+        "history": histories,
+    })
+
+@app.route("/metrics")
+def api_metrics():
+    """Prometheus szöveges formátum (pipeline lépések, Binance weight, cache, HTTP)."""
+    if not metrics.METRICS_ENABLED:
+        return Response("metrics disabled\n", status=404, mimetype="text/plain")
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+_table = None
+
+
+def shared_signals():
+    """
+    trading_bot.py --shards mellett: a jelzések a shardok osztott memóriás
+    táblájából (tőzsde hívás és számolás nélkül). Ha a bot újraindult (új
+    tábla), a régi szegmens heartbeatjei elavulnak -> újracsatlakozunk.
+    """
+    global _table
+    if _table is not None and time.time() - _table.header["heartbeat"].max() > HEARTBEAT_TIMEOUT:
+        _table.close()
+        _table = None
+    if _table is None:
+        _table = SignalTable.attach()
+    return _table.read_all()
+
+
+def _last_point(history: dict):
+    point = []
+    for k in ("open_times", "prices", "ema9", "ema21", "rsi"):
+        v = history[k][-1]
+        v = v.item() if hasattr(v, "item") else v
+        point.append(None if v != v else v)     # NaN != NaN, így a változatlan pont is egyezik
+    return tuple(point)
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {dumps(payload).decode('utf-8')}\n\n"
+
+
+@app.route("/api/stream")
+def api_stream():
+    """
+    Server-Sent Events: csak akkor küldünk 'update' eseményt, ha új snapshot
+    jött ÉS abban tényleg változott valami a kliensnek már elküldötthöz képest.
+    Az esemény a változott sorok összefoglalóját és a history deltákat viszi.
+    """
+    def gen():
+        sent_rows = {}     # symbol -> utoljára elküldött összefoglaló
+        sent_points = {}   # symbol -> utoljára elküldött utolsó history pont
+        version = -1
+        while True:
+            snap = refresher.wait_for_update(version, SSE_HEARTBEAT_SECONDS)
+            if snap is None or snap.version == version:
+                yield ": ping\n\n"
+                continue
+            version = snap.version
+
+            rows, histories = [], {}
+            present = set()
+            for s in snap.signals:
+                sym = s["symbol"]
+                present.add(sym)
+                row = summarize(s)
+                if sent_rows.get(sym) != row:
+                    rows.append(row)
+                    sent_rows[sym] = row
+
+                h = s.get("history")
+                if not h or not len(h["open_times"]):
+                    continue
+                last = sent_points.get(sym)
+                delta = history_delta(h, last[0] if last else None)
+                point = _last_point(h)
+                if last is None or len(delta["open_times"]) > 1 or point != last:
+                    histories[sym] = delta
+                    sent_points[sym] = point
+
+            removed = [sym for sym in sent_rows if sym not in present]
+            for sym in removed:
+                sent_rows.pop(sym, None)
+                sent_points.pop(sym, None)
+
+            if rows or histories or removed:
+                yield _sse("update", {
+                    "generated_at": snap.generated_at,
+                    "max_points": HISTORY_LIMIT,
+                    "rows": rows,
+                    "history": histories,
+                    "removed": removed,
+                })
+
+    resp = Response(gen(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=6000, debug=False)
\ No newline at end of file
+    import argparse
+    import trading_bot
+    from recorder import Replay
+
+    parser = argparse.ArgumentParser(description="RSI+EMA dashboard.")
+    parser.add_argument("--replay", metavar="FILE", help="Felvett piaci adat visszajátszása élő API helyett")
+    parser.add_argument("--speed", type=float, default=100.0, help="Visszajátszás sebessége (x valós idő, 0 = determinisztikus léptetés)")
+    parser.add_argument("--shards", action="store_true",
+                        help="Jelzések a bot osztott memóriás táblájából (trading_bot.py --shards)")
+    args = parser.parse_args()
+    watchlist_manager().start()
+    if args.shards:
+        refresher.compute = shared_signals
+    if args.replay:
+        replay = Replay(args.replay, speed=args.speed or None)
+        trading_bot.use_replay(replay)
+        if replay.clock.speed:
+            refresher.interval = REFRESH_SECONDS / replay.clock.speed   # szimulált időben 5 mp-enként
+        else:
+            # --speed 0: determinisztikus, az óra csak léptetésre halad -> körönként
+            # REFRESH_SECONDS szimulált idő, valós időben REPLAY_STEP_SECONDS-enként
+            compute = refresher.compute
+
+            def step_and_compute():
+                replay.clock.sleep(REFRESH_SECONDS)
+                return compute()
+
+            refresher.compute = step_and_compute
+            refresher.interval = REPLAY_STEP_SECONDS
+    elif not args.shards:
+        # saját fájl: a bot és a dashboard külön folyamat, külön cache-sel
+        trading_bot.use_checkpoint(trading_bot.CHECKPOINT_PATH.with_name("dashboard_checkpoint.npz"))
+
+    refresher.start()
+    app.run(host="0.0.0.0", port=6000, debug=False, threaded=True)
\ No newline at end of file
@@ -0,0 +1,57 @@
+import struct
+from bisect import bisect_left
+
+import numpy as np
+
+# Bináris formátum (little-endian):
+#   b"CBH1", u16 szimbólum szám, majd szimbólumonként:
+#   u8 név hossz, név (ascii), u32 n, int64[n] open_times,
+#   float64[n] prices, ema9, ema21, rsi  (null -> NaN)
+BINARY_MAGIC = b"CBH1"
+BINARY_COLUMNS = ("prices", "ema9", "ema21", "rsi")
+
+
+def history_delta(history: dict, since=None) -> dict:
+    """
+    A history-ból csak az open_time >= since pontok (az utolsó ismert
+    gyertya is, mert az még változhatott). since=None -> teljes history.
+    """
+    if since is None:
+        return history
+    times = history["open_times"]
+    if isinstance(times, np.ndarray):
+        start = int(np.searchsorted(times, since, side="left"))
+    else:
+        start = bisect_left(times, since)
+    return {k: v[start:] for k, v in history.items()}
+
+
+def parse_since(raw: str) -> dict:
+    """'BTCUSDC:1700000000000,ETHUSDC:1700000300000' -> {symbol: ms}"""
+    out = {}
+    for part in (raw or "").split(","):
+        sym, sep, ts = part.partition(":")
+        if sep and sym and ts.strip().isdigit():
+            out[sym.strip().upper()] = int(ts)
+    return out
+
+
+def _floats(values) -> np.ndarray:
+    if isinstance(values, np.ndarray):
+        return values.astype("<f8", copy=False)
+    return np.array([np.nan if v is None else v for v in values], dtype="<f8")
+
+
+def encode_binary(histories: dict) -> bytes:
+    """{symbol: history} -> tömör bináris oszlopos formátum (times címkék nélkül)."""
+    parts = [BINARY_MAGIC, struct.pack("<H", len(histories))]
+    for sym, h in histories.items():
+        name = sym.encode("ascii")
+        n = len(h["open_times"])
+        parts.append(struct.pack("<B", len(name)))
+        parts.append(name)
+        parts.append(struct.pack("<I", n))
+        parts.append(np.asarray(h["open_times"], dtype="<i8").tobytes())
+        for col in BINARY_COLUMNS:
+            parts.append(_floats(h[col]).tobytes())
+    return b"".join(parts)
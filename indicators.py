@@ -0,0 +1,207 @@
+import threading
+
+import numpy as np
+
+from candle_buffer import CandleRing, INDICATOR_COLUMNS
+
+NAN = float("nan")
+
+
+class EMA:
+    """
+    Inkrementális EMA, ugyanaz mint a pandas `ewm(span=span).mean()` (adjust=True):
+    súlyozott átlag (1-alpha)^i súlyokkal, számláló/nevező futó összegként.
+    """
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.num = 0.0
+        self.den = 0.0
+
+    def _next(self, x: float):
+        decay = 1.0 - self.alpha
+        return self.num * decay + x, self.den * decay + 1.0
+
+    def update(self, x: float) -> float:
+        self.num, self.den = self._next(x)
+        return self.num / self.den
+
+    def peek(self, x: float) -> float:
+        num, den = self._next(x)
+        return num / den
+
+
+class WilderRSI:
+    """
+    Inkrementális RSI, ugyanaz mint a `ta.momentum.RSIIndicator(close, window)`:
+    fel/le mozgások ewm(alpha=1/window, adjust=False) átlaga, az első
+    `window` gyertyáig NaN.
+    """
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.alpha = 1.0 / window
+        self.prev_close = None
+        self.avg_up = 0.0
+        self.avg_dn = 0.0
+        self.count = 0
+
+    def _next(self, close: float):
+        if self.prev_close is None:
+            # ta-ban az első diff NaN -> 0.0, az ewm ezzel indul
+            return 0.0, 0.0
+        diff = close - self.prev_close
+        up = diff if diff > 0 else 0.0
+        dn = -diff if diff < 0 else 0.0
+        decay = 1.0 - self.alpha
+        return (self.avg_up * decay + self.alpha * up,
+                self.avg_dn * decay + self.alpha * dn)
+
+    def _value(self, avg_up: float, avg_dn: float, count: int) -> float:
+        if count < self.window:
+            return NAN
+        if avg_dn == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + avg_up / avg_dn)
+
+    def update(self, close: float) -> float:
+        self.avg_up, self.avg_dn = self._next(close)
+        self.prev_close = close
+        self.count += 1
+        return self._value(self.avg_up, self.avg_dn, self.count)
+
+    def peek(self, close: float) -> float:
+        avg_up, avg_dn = self._next(close)
+        return self._value(avg_up, avg_dn, self.count + 1)
+
+
+class IndicatorState:
+    """
+    Egy (symbol, interval) pár EMA9 / EMA21 / RSI futó állapota.
+
+    - update(): lezárt gyertya -> állapot továbbvitele O(1) időben
+    - provisional(): a még nyitott gyertyára számolt érték, állapot változtatás nélkül
+    A lezárt gyertyák indikátor értékeit `limit` hosszan megtartjuk a history-hoz
+    (típusos gyűrűs pufferben, +1 hely a nyitott gyertya ideiglenes értékének).
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.lock = threading.RLock()
+        self.hist = CandleRing(limit + 1, INDICATOR_COLUMNS)
+        self.reset()
+
+    def reset(self):
+        self.ema9 = EMA(9)
+        self.ema21 = EMA(21)
+        self.rsi = WilderRSI(14)
+        self.last_open_time = None
+        self.hist.clear()
+
+    def update(self, open_time: int, close: float):
+        e9 = self.ema9.update(close)
+        e21 = self.ema21.update(close)
+        r = self.rsi.update(close)
+        self.hist.append((e9, e21, r))
+        self.last_open_time = open_time
+        return e9, e21, r
+
+    def checkpoint(self):
+        """
+        Futó állapot mentéshez: skalárok (EMA számláló / nevező, RSI átlagok,
+        utolsó feldolgozott open_time) + a lezárt gyertyák indikátor értékei.
+        """
+        with self.lock:
+            rsi = self.rsi
+            scalars = np.array([
+                self.ema9.num, self.ema9.den, self.ema21.num, self.ema21.den,
+                NAN if rsi.prev_close is None else rsi.prev_close,
+                rsi.avg_up, rsi.avg_dn, rsi.count,
+                -1 if self.last_open_time is None else self.last_open_time,
+            ], dtype=np.float64)
+            out = {name: arr.copy() for name, arr in self.hist.columns().items()}
+            out["scalars"] = scalars
+            return out
+
+    def restore(self, data: dict) -> bool:
+        """Checkpointból visszatöltés; a következő sync() innen folytatja (csak az új gyertyák)."""
+        s = data["scalars"]
+        if len(s) != 9 or s[8] < 0:
+            return False
+        with self.lock:
+            self.reset()
+            self.ema9.num, self.ema9.den, self.ema21.num, self.ema21.den = (float(v) for v in s[:4])
+            self.rsi.prev_close = None if s[4] != s[4] else float(s[4])
+            self.rsi.avg_up, self.rsi.avg_dn = float(s[5]), float(s[6])
+            self.rsi.count = int(s[7])
+            self.last_open_time = int(s[8])
+            self.hist.load(data)
+        return True
+
+    def provisional(self, close: float):
+        return self.ema9.peek(close), self.ema21.peek(close), self.rsi.peek(close)
+
+    def sync(self, open_times, closes):
+        """
+        Állapot igazítása a gyertya listához (az utolsó gyertya nyitott).
+        Csak az új lezárt gyertyákat dolgozzuk fel; ha nem folytonos
+        (pl. a cache újratöltött), elölről számolunk.
+        Visszaadja az összes gyertyára az (ema9, ema21, rsi) tömböket: ezek
+        másolás nélküli nézetek, a következő sync()-ig érvényesek (a lock
+        alatt olvasd őket, ha több szál is számolhat).
+        """
+        closed = len(open_times) - 1
+        with self.lock:
+            start = 0
+            if self.last_open_time is not None:
+                # hátulról keressük, normál esetben 0-1 lépés
+                i = closed - 1
+                while i >= 0 and open_times[i] > self.last_open_time:
+                    i -= 1
+                if i >= 0 and open_times[i] == self.last_open_time:
+                    start = i + 1
+                else:
+                    self.reset()
+            if start and len(self.hist) < start:
+                # régebbi gyertyák is jöttek, mint amire van érték -> elölről
+                self.reset()
+                start = 0
+            for i in range(start, closed):
+                self.update(int(open_times[i]), float(closes[i]))
+
+            self.hist.stage(self.provisional(float(closes[-1])))
+            n = closed + 1
+            return (self.hist.view("ema9", n, staged=True),
+                    self.hist.view("ema21", n, staged=True),
+                    self.hist.view("rsi", n, staged=True))
+
+
+_states = {}
+_states_lock = threading.Lock()
+
+
+def get_indicator_state(symbol: str, interval: str, limit: int) -> IndicatorState:
+    """
+    (symbol, interval) -> IndicatorState; a history puffer az eddigi legnagyobb
+    limit (mint a gyertya cache), kisebb limittel hívva ugyanazt adjuk vissza.
+    """
+    key = (symbol, interval)
+    with _states_lock:
+        state = _states.get(key)
+        if state is None or state.limit < limit:
+            state = IndicatorState(limit)
+            _states[key] = state
+        return state
+
+
+def state_items():
+    """[((symbol, interval), IndicatorState)] pillanatkép (checkpointhoz)."""
+    with _states_lock:
+        return list(_states.items())
+
+
+def drop_state(symbol: str):
+    """Szimbólum összes indikátor állapotának eldobása (minden interval / idősík)."""
+    with _states_lock:
+        for key in [k for k in _states if k[0] == symbol]:
+            del _states[key]
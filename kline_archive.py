@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ARCHIVE_DIR = Path(__file__).with_name("klines")
+PAGE_LIMIT = 1000              # Binance klines max limit / kérés
+
+# Egy gyertya a fájlban (fix méretű rekord, little-endian)
+KLINE_DTYPE = np.dtype([
+    ("open_time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+    ("close_time", "<i8"),
+])
+
+_UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def interval_ms(interval: str) -> int:
+    """'5m' -> 300000 (havi '1M' nem támogatott, nem fix hosszú)"""
+    return int(interval[:-1]) * _UNIT_MS[interval[-1]]
+
+
+def interval_freq(interval: str) -> str:
+    """'5m' -> '5min' (pandas frekvencia)"""
+    n, unit = interval[:-1], interval[-1]
+    return n + {"m": "min", "h": "h", "d": "D", "w": "W"}[unit]
+
+
+def to_ms(value) -> int:
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def frame_to_records(df: pd.DataFrame) -> np.ndarray:
+    """get_data DataFrame -> KLINE_DTYPE tömb"""
+    out = np.empty(len(df), dtype=KLINE_DTYPE)
+    out["open_time"] = df["open_time"].to_numpy(dtype="int64")
+    for src, dst in (("o", "open"), ("h", "high"), ("l", "low"), ("c", "close"), ("v", "volume")):
+        out[dst] = df[src].to_numpy(dtype=float)
+    out["close_time"] = df["close_time"].to_numpy(dtype="int64")
+    return out
+
+
+class KlineArchive:
+    """
+    Helyi gyertya archívum: szimbólum + interval páronként egy bináris fájl
+    (klines/BTCUSDC_5m.bin), open_time szerint rendezett KLINE_DTYPE rekordok.
+    Olvasás memory-mappel, így több év adat is azonnal megnyílik.
+    """
+
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+
+    def path(self, symbol: str, interval: str) -> Path:
+        return self.root / f"{symbol}_{interval}.bin"
+
+    def load(self, symbol: str, interval: str, start=None, end=None) -> np.ndarray:
+        """memmap nézet az [start, end) időszakra (üres tömb, ha nincs adat)."""
+        p = self.path(symbol, interval)
+        if not p.exists() or p.stat().st_size < KLINE_DTYPE.itemsize:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        data = np.memmap(p, dtype=KLINE_DTYPE, mode="r")
+        times = data["open_time"]
+        lo = np.searchsorted(times, to_ms(start)) if start is not None else 0
+        hi = np.searchsorted(times, to_ms(end)) if end is not None else len(data)
+        return data[lo:hi]
+
+    def bounds(self, symbol: str, interval: str):
+        """(első, utolsó) open_time vagy (None, None)"""
+        data = self.load(symbol, interval)
+        if len(data) == 0:
+            return None, None
+        return int(data["open_time"][0]), int(data["open_time"][-1])
+
+    def write(self, symbol: str, interval: str, records: np.ndarray) -> int:
+        """
+        Gyertyák mentése. Ha mind újabb a meglévőknél, egyszerű hozzáfűzés;
+        különben (elejére / résbe kerülnek) összefésülés és atomikus újraírás.
+        """
+        if len(records) == 0:
+            return 0
+        records = np.sort(records, order="open_time")
+        self.root.mkdir(parents=True, exist_ok=True)
+        p = self.path(symbol, interval)
+        first, last = self.bounds(symbol, interval)
+
+        if last is None or records["open_time"][0] > last:
+            with p.open("ab") as f:
+                f.write(np.ascontiguousarray(records).tobytes())
+            return len(records)
+
+        old = np.array(self.load(symbol, interval))
+        merged = np.concatenate([old, records])
+        # azonos open_time esetén az újabb letöltés nyer
+        _, idx = np.unique(merged["open_time"][::-1], return_index=True)
+        merged = merged[::-1][idx]
+        tmp = p.with_suffix(".tmp")
+        tmp.write_bytes(np.ascontiguousarray(merged).tobytes())
+        os.replace(tmp, p)
+        return len(merged) - len(old)
+
+    def gaps(self, symbol: str, interval: str):
+        """Hiányzó szakaszok: [(from_ms, to_ms), ...] (to kizárólagos)."""
+        data = self.load(symbol, interval)
+        if len(data) < 2:
+            return []
+        step = interval_ms(interval)
+        t = data["open_time"]
+        idx = np.flatnonzero(np.diff(t) > step)
+        return [(int(t[i]) + step, int(t[i + 1])) for i in idx]
+
+
+def _fetch_range(symbol: str, interval: str, from_ms: int, to_ms_: int) -> np.ndarray:
+    """[from, to) időszak letöltése lapozva a trading_bot.get_data-n keresztül (csak lezárt gyertyák)."""
+    from trading_bot import get_data   # csak letöltéskor kell API kliens / config
+
+    step = interval_ms(interval)
+    now = int(time.time() * 1000)
+    parts = []
+    cursor = from_ms
+    while cursor < to_ms_:
+        df = get_data(symbol, interval, limit=PAGE_LIMIT, start_time=cursor, end_time=to_ms_ - 1)
+        if df.empty:
+            break
+        rec = frame_to_records(df)
+        parts.append(rec[rec["close_time"] < now])
+        if len(df) < PAGE_LIMIT:
+            break
+        cursor = int(rec["open_time"][-1]) + step
+    if not parts:
+        return np.empty(0, dtype=KLINE_DTYPE)
+    return np.concatenate(parts)
+
+
+def download(symbol: str, interval: str, start=None, end=None,
+             archive: KlineArchive = None, fill_gaps: bool = True) -> int:
+    """
+    Archívum feltöltése / frissítése. Első futáskor `start`-tól tölt le,
+    utána csak a hiányzó részeket: az utolsó gyertya utáni szakaszt, a
+    `start` és az első tárolt gyertya közötti részt, és (fill_gaps) a belső réseket.
+    Visszaadja az új gyertyák számát.
+    """
+    archive = archive or KlineArchive()
+    step = interval_ms(interval)
+    end_ms = to_ms(end) if end is not None else int(time.time() * 1000)
+    first, last = archive.bounds(symbol, interval)
+
+    ranges = []
+    if first is None:
+        if start is None:
+            raise ValueError("Üres archívumhoz meg kell adni a start dátumot")
+        ranges.append((to_ms(start), end_ms))
+    else:
+        if start is not None and to_ms(start) < first:
+            ranges.append((to_ms(start), first))
+        ranges.append((last + step, end_ms))
+        if fill_gaps:
+            ranges.extend(archive.gaps(symbol, interval))
+
+    added = 0
+    for a, b in ranges:
+        if a < b:
+            added += archive.write(symbol, interval, _fetch_range(symbol, interval, a, b))
+    return added
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Helyi gyertya archívum letöltése / frissítése.")
+    parser.add_argument("--symbol", action="append", help="Szimbólum (többször megadható), alap: watchlist")
+    parser.add_argument("--interval", default="5m", help="Gyertya méret (pl. 1m, 5m, 1h)")
+    parser.add_argument("--start", help="Kezdő dátum (üres archívumnál kötelező)")
+    parser.add_argument("--end", help="Záró dátum (alap: most)")
+    parser.add_argument("--no-gaps", action="store_true", help="Belső rések pótlásának kihagyása")
+    args = parser.parse_args()
+
+    symbols = args.symbol
+    if not symbols:
+        from watchlist import load_watchlist
+        symbols, _ = load_watchlist()
+
+    arch = KlineArchive()
+    for sym in symbols:
+        try:
+            n = download(sym, args.interval, args.start, args.end, arch, fill_gaps=not args.no_gaps)
+            first, last = arch.bounds(sym, args.interval)
+            span = (f"{pd.Timestamp(first, unit='ms')} – {pd.Timestamp(last, unit='ms')}"
+                    if first is not None else "üres")
+            print(f"{sym} {args.interval}: +{n} gyertya ({span})")
+        except Exception as e:
+            print(f"Hiba {sym} letöltésénél:", e)
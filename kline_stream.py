@@ -0,0 +1,189 @@
+import json
+import threading
+
+import websocket
+
+from candle_cache import get_cache
+
+# Kombinált stream: wss://.../stream?streams=btcusdc@kline_5m/ethusdc@kline_5m
+STREAM_URL = "wss://stream.binance.com:9443/stream?streams="
+RECV_TIMEOUT = 60              # mp, ennyi csend után újracsatlakozunk
+
+
+class WebsocketTransport:
+    """
+    Alapértelmezett transport (websocket-client).
+    Bármi lecserélheti, aminek van recv() és close() metódusa,
+    pl. tesztben egy lokális replay szerver vagy sima lista.
+    """
+
+    def __init__(self, url: str, timeout: float = RECV_TIMEOUT):
+        self.ws = websocket.create_connection(url, timeout=timeout)
+
+    def recv(self) -> str:
+        return self.ws.recv()
+
+    def send(self, text: str):
+        self.ws.send(text)
+
+    def close(self):
+        self.ws.close()
+
+
+def kline_from_stream(k: dict) -> list:
+    """Stream 'k' objektum -> ugyanaz a lista forma, amit a REST klines ad."""
+    return [
+        k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"],
+        k["q"], k["n"], k["V"], k["Q"], k["B"],
+    ]
+
+
+class KlineStream:
+    """
+    Kline stream feldolgozó: a beérkező gyertyákat a CandleCache-be írja,
+    és csak akkor hívja az on_update(symbol, closed) callbacket, ha a
+    gyertya ténylegesen változott (vagy lezárult).
+    Újracsatlakozás után REST-en pótoljuk a kimaradt gyertyákat.
+    """
+
+    def __init__(self, symbols, interval: str, limit: int, client, on_update,
+                 transport_factory=WebsocketTransport,
+                 base_url: str = STREAM_URL,
+                 reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 60.0):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.limit = limit
+        self.client = client
+        self.on_update = on_update
+        self.transport_factory = transport_factory
+        self.base_url = base_url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._stop = threading.Event()
+        self._transport = None
+        self._active = set(self.symbols)
+        self._subscribed = set()       # az élő kapcsolat streamjei (URL + SUBSCRIBE)
+        self._sub_lock = threading.RLock()
+        self._reconnect = False
+        self._sub_id = 0
+
+    def url(self) -> str:
+        streams = "/".join(self._stream_name(s) for s in self.symbols)
+        return self.base_url + streams
+
+    def _stream_name(self, sym: str) -> str:
+        return f"{sym.lower()}@kline_{self.interval}"
+
+    def set_symbols(self, symbols):
+        """
+        Feliratkozások módosítása futás közben (watchlist változás):
+        SUBSCRIBE / UNSUBSCRIBE az élő kapcsolaton, az új szimbólumokra
+        REST seed. Ha a transport nem tud küldeni, új URL-lel újracsatlakozunk.
+        """
+        symbols = list(symbols)
+        with self._sub_lock:
+            self.symbols = symbols
+            self._active = set(symbols)
+            tr = self._transport
+            if tr is None:
+                return         # épp csatlakozunk: run_forever a kapcsolat után egyezteti
+            added = self._resubscribe(tr)
+        if added:
+            self.backfill(added)
+
+    def _resubscribe(self, tr):
+        """
+        A kapcsolat feliratkozásainak igazítása self.symbols-hoz (a _sub_lock alatt).
+        Visszaadja az újonnan feliratkozott szimbólumokat.
+        """
+        added = [s for s in self.symbols if s not in self._subscribed]
+        removed = [s for s in self._subscribed if s not in self._active]
+        if not added and not removed:
+            return []
+        send = getattr(tr, "send", None)
+        if send is None:
+            self._reconnect = True
+            self._close_transport()
+            return []
+        try:
+            for method, syms in (("UNSUBSCRIBE", removed), ("SUBSCRIBE", added)):
+                if syms:
+                    self._sub_id += 1
+                    send(json.dumps({"method": method, "params": [self._stream_name(s) for s in syms],
+                                     "id": self._sub_id}))
+        except Exception as e:
+            print("Stream feliratkozás hiba, újracsatlakozás:", e)
+            self._reconnect = True
+            self._close_transport()
+            return []
+        self._subscribed = set(self.symbols)
+        return added
+
+    def backfill(self, symbols=None):
+        """REST pótlás: induláskor seed, újracsatlakozás után csak a rés."""
+        for sym in (self.symbols if symbols is None else symbols):
+            try:
+                if get_cache(sym, self.interval, self.limit).refresh(self.client):
+                    self.on_update(sym, False)
+            except Exception as e:
+                print(f"Backfill hiba {sym}:", e)
+
+    def handle_message(self, raw):
+        msg = json.loads(raw)
+        data = msg.get("data", msg)
+        if data.get("e") != "kline":
+            return
+        k = data["k"]
+        sym = data["s"]
+        if k.get("i", self.interval) != self.interval or sym not in self._active:
+            return
+        cache = get_cache(sym, self.interval, self.limit)
+        if cache.apply(kline_from_stream(k)):
+            self.on_update(sym, bool(k.get("x")))
+
+    def run_forever(self):
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                with self._sub_lock:
+                    url, subscribed = self.url(), set(self.symbols)
+                tr = self.transport_factory(url)
+                with self._sub_lock:
+                    self._transport = tr
+                    self._subscribed = subscribed
+                    # a csatlakozás alatt érkezett set_symbols() változásai
+                    self._resubscribe(tr)
+                # előbb feliratkozunk, utána pótolunk -> nem marad ki gyertya
+                self.backfill()
+                delay = self.reconnect_delay
+                while not self._stop.is_set():
+                    self.handle_message(self._transport.recv())
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                if self._reconnect:        # set_symbols(): azonnal, új URL-lel
+                    self._reconnect = False
+                    continue
+                print("Stream hiba, újracsatlakozás:", e)
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            finally:
+                self._close_transport()
+
+    def start(self) -> threading.Thread:
+        t = threading.Thread(target=self.run_forever, name="kline-stream", daemon=True)
+        t.start()
+        return t
+
+    def stop(self):
+        self._stop.set()
+        self._close_transport()
+
+    def _close_transport(self):
+        tr, self._transport = self._transport, None
+        if tr is not None:
+            try:
+                tr.close()
+            except Exception:
+                pass
@@ -0,0 +1,152 @@
+import threading
+import time
+from bisect import bisect_left
+
+METRICS_ENABLED = True         # False: a timer / inc / observe azonnal visszatér
+
+# Hisztogram bucket határok (mp), Prometheus `le` értékek
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_histograms = {}   # (név, címkék) -> [bucket darabszámok, összeg, darab]
+_counters = {}     # (név, címkék) -> érték
+_gauges = {}       # név -> fn
+_help = {}         # név -> leírás
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+def describe(name: str, text: str):
+    """# HELP sor egy metrikához."""
+    _help[name] = text
+
+
+def observe(name: str, seconds: float, **labels):
+    """Egy időmérés hozzáadása a `name` hisztogramhoz."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    i = bisect_left(BUCKETS, seconds)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        h[0][i] += 1
+        h[1] += seconds
+        h[2] += 1
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Számláló növelése."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def gauge(name: str, fn, text: str = ""):
+    """Pillanatnyi érték, a fn()-t csak kiíráskor hívjuk (pl. weight_limiter.used)."""
+    _gauges[name] = fn
+    if text:
+        _help[name] = text
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "t0")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0, **self.labels)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def timer(name: str, **labels):
+    """with metrics.timer("cryptobot_stage_seconds", stage="get_data", symbol=sym): ..."""
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _Timer(name, labels)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# ---- Prometheus szöveges formátum (text/plain; version=0.0.4) ----
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    esc = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, esc)) + "}"
+
+
+def _fmt_value(v) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def render() -> str:
+    with _lock:
+        hists = {k: (list(v[0]), v[1], v[2]) for k, v in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name in seen:
+            return
+        seen.add(name)
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), (buckets, total, count) in sorted(hists.items()):
+        header(name, "histogram")
+        acc = 0
+        for le, n in zip(BUCKETS + (float("inf"),), buckets):
+            acc += n
+            lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', _fmt_value(le))])} {acc}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(total)}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter")
+        lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+    for name, fn in sorted(_gauges.items()):
+        try:
+            value = fn()
+        except Exception:
+            continue
+        header(name, "gauge")
+        lines.append(f"{name} {_fmt_value(value)}")
+
+    return "\n".join(lines) + "\n"
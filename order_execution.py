@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+import hashlib
+import hmac
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal, ROUND_DOWN
+from pathlib import Path
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+BASE_URL = "https://api.binance.com"
+STATE_PATH = Path(__file__).with_name("live_state.json")
+
+POOL_SIZE = 8                  # HTTP keep-alive kapcsolatok (requests.Session pool)
+RECV_WINDOW = 5000             # ms
+REQUEST_TIMEOUT = 5            # mp
+TIME_SYNC_SECONDS = 600        # ennyi mp-enként igazítjuk a helyi órát a szerverhez
+FILTERS_REFRESH_SECONDS = 3600 # exchangeInfo szűrők háttér frissítése
+ORDER_WORKERS = 2              # párhuzamos megbízás küldők (egy lassú válasz ne fogja a többit)
+ORDER_QUEUE_SIZE = 100
+ORDER_SIZE = 100.0             # USDC / BUY (quoteOrderQty)
+
+# Binance request weight (REQUEST_WEIGHT keret, 1 perces ablak)
+ORDER_WEIGHT = 1               # POST /api/v3/order
+QUERY_ORDER_WEIGHT = 4         # GET /api/v3/order
+MY_TRADES_WEIGHT = 20          # GET /api/v3/myTrades (orderId-val)
+EXCHANGE_INFO_WEIGHT = 20      # GET /api/v3/exchangeInfo
+TIME_WEIGHT = 1                # GET /api/v3/time
+
+metrics.describe("cryptobot_order_latency_seconds", "Jelzés váltástól a megbízás visszaigazolásáig")
+metrics.describe("cryptobot_order_request_seconds", "Aláírt Binance REST hívások ideje")
+metrics.describe("cryptobot_orders_total", "Elküldött megbízások (status: FILLED, NEW, ..., error, rejected, unknown)")
+
+# egy megbízás kimenete (_execute)
+FILLED = "filled"              # teljesült (teszt módban: elfogadták), a pozíció frissült
+REJECTED = "rejected"          # biztosan nem jött létre: ugyanaz a jelzés újra próbálkozhat
+UNKNOWN = "unknown"            # lehet, hogy teljesült (timeout, 5xx, megszakadt kapcsolat)
+
+
+class BinanceAPIError(Exception):
+    def __init__(self, status: int, code, msg: str):
+        super().__init__(f"HTTP {status}, code {code}: {msg}")
+        self.status = status
+        self.code = code
+        self.msg = msg
+
+
+def outcome_unknown(e: Exception) -> bool:
+    """
+    A Binance a 4xx választ biztosan nem hajtotta végre; 5xx-nél, időtúllépésnél
+    vagy megszakadt kapcsolatnál a megbízás akár teljesülhetett is.
+    """
+    return not (isinstance(e, BinanceAPIError) and e.status < 500)
+
+
+class SignedClient:
+    """
+    Tartós, kapcsolat poolos (keep-alive) Binance REST kliens HMAC-SHA256
+    aláírással. A helyi óra eltérését a szerveridőhöz igazítjuk, a weight-et
+    (ha van) a közös WeightLimiterből foglaljuk. base_url-lel lokális mock
+    szerverre is irányítható.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, base_url: str = BASE_URL,
+                 limiter=None, pool_size: int = POOL_SIZE, timeout: float = REQUEST_TIMEOUT):
+        self.api_key = api_key
+        self._secret = api_secret.encode()
+        self.base_url = base_url.rstrip("/")
+        self.limiter = limiter
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"X-MBX-APIKEY": api_key})
+        self._offset = 0           # szerver idő - helyi idő (ms)
+        self._synced_at = None
+
+    def _request(self, method: str, path: str, params: dict = None, signed: bool = False, weight: int = 1):
+        params = dict(params or {})
+        if signed:
+            if self._synced_at is None or time.monotonic() - self._synced_at > TIME_SYNC_SECONDS:
+                self.sync_time()
+            params["timestamp"] = int(time.time() * 1000 + self._offset)
+            params["recvWindow"] = RECV_WINDOW
+            query = urlencode(params)
+            query += "&signature=" + hmac.new(self._secret, query.encode(), hashlib.sha256).hexdigest()
+        else:
+            query = urlencode(params)
+        if self.limiter is not None:
+            self.limiter.acquire(weight)
+        url = f"{self.base_url}{path}" + (f"?{query}" if query else "")
+        with metrics.timer("cryptobot_order_request_seconds", endpoint=path):
+            r = self.session.request(method, url, timeout=self.timeout)
+        if r.status_code >= 400:
+            try:
+                err = r.json()
+            except ValueError:
+                err = {}
+            raise BinanceAPIError(r.status_code, err.get("code"), err.get("msg", r.text[:200]))
+        return r.json()
+
+    def sync_time(self):
+        t0 = time.time() * 1000
+        server = self._request("GET", "/api/v3/time", weight=TIME_WEIGHT)["serverTime"]
+        t1 = time.time() * 1000
+        self._offset = server - (t0 + t1) / 2
+        self._synced_at = time.monotonic()
+
+    def exchange_info(self, symbols=None) -> dict:
+        params = {"symbols": json.dumps(list(symbols), separators=(",", ":"))} if symbols else None
+        return self._request("GET", "/api/v3/exchangeInfo", params, weight=EXCHANGE_INFO_WEIGHT)
+
+    def new_order(self, symbol: str, side: str, test: bool = False, **params) -> dict:
+        """MARKET megbízás: quantity vagy quoteOrderQty (str, már a szűrőkre kerekítve)."""
+        path = "/api/v3/order/test" if test else "/api/v3/order"
+        params = {"symbol": symbol, "side": side, "type": "MARKET", "newOrderRespType": "FULL", **params}
+        return self._request("POST", path, params, signed=True, weight=ORDER_WEIGHT)
+
+    def get_order(self, symbol: str, client_order_id: str) -> dict:
+        """Megbízás lekérdezése a saját newClientOrderId alapján (-2013: nincs ilyen)."""
+        params = {"symbol": symbol, "origClientOrderId": client_order_id}
+        return self._request("GET", "/api/v3/order", params, signed=True, weight=QUERY_ORDER_WEIGHT)
+
+    def my_trades(self, symbol: str, order_id: int) -> list:
+        """Egy megbízás kötései (jutalék a lekérdezett megbízáshoz, aminek nincs fills mezője)."""
+        params = {"symbol": symbol, "orderId": order_id}
+        return self._request("GET", "/api/v3/myTrades", params, signed=True, weight=MY_TRADES_WEIGHT)
+
+    def close(self):
+        self.session.close()
+
+
+# ---- exchangeInfo szűrők ----
+
+def _step_str(value: Decimal, step: Decimal) -> str:
+    """Lefelé kerekítés a lépésközre, tudományos jelölés nélkül."""
+    if step > 0:
+        value = (value / step).to_integral_value(rounding=ROUND_DOWN) * step
+    return format(value.normalize(), "f")
+
+
+class SymbolFilters:
+    """Egy szimbólum kereskedési szabályai (LOT_SIZE, MARKET_LOT_SIZE, PRICE_FILTER, NOTIONAL)."""
+
+    def __init__(self, info: dict):
+        self.symbol = info["symbol"]
+        self.base_asset = info.get("baseAsset", "")
+        self.quote_asset = info.get("quoteAsset", "")
+        self.base_precision = int(info.get("baseAssetPrecision", 8))
+        self.quote_precision = int(info.get("quoteAssetPrecision", info.get("quotePrecision", 8)))
+        self.trading = info.get("status", "TRADING") == "TRADING"
+        f = {x["filterType"]: x for x in info.get("filters", [])}
+        lot = f.get("MARKET_LOT_SIZE") or {}
+        if Decimal(lot.get("stepSize", "0")) == 0:
+            lot = f.get("LOT_SIZE", {})      # MARKET_LOT_SIZE stepSize 0 = a LOT_SIZE érvényes
+        self.step = Decimal(lot.get("stepSize", "0"))
+        self.min_qty = Decimal(lot.get("minQty", "0"))
+        self.max_qty = Decimal(lot.get("maxQty", "0"))
+        self.tick = Decimal(f.get("PRICE_FILTER", {}).get("tickSize", "0"))
+        notional = f.get("NOTIONAL") or f.get("MIN_NOTIONAL") or {}
+        self.min_notional = Decimal(notional.get("minNotional", "0"))
+
+    def quantity(self, qty) -> str:
+        """Eladási mennyiség a lépésközre kerekítve; None, ha minQty alatt van."""
+        q = Decimal(str(qty))
+        if self.max_qty > 0:
+            q = min(q, self.max_qty)
+        s = _step_str(q, self.step)
+        return s if Decimal(s) >= self.min_qty and Decimal(s) > 0 else None
+
+    def quote_qty(self, quote) -> str:
+        """quoteOrderQty a quote eszköz pontosságára kerekítve; None, ha minNotional alatt van."""
+        s = _step_str(Decimal(str(quote)), Decimal(1).scaleb(-self.quote_precision))
+        return s if Decimal(s) >= self.min_notional and Decimal(s) > 0 else None
+
+    def notional_ok(self, qty: str, price: float) -> bool:
+        return Decimal(qty) * Decimal(str(price)) >= self.min_notional
+
+    def price(self, price) -> str:
+        return _step_str(Decimal(str(price)), self.tick)
+
+
+class FilterCache:
+    """
+    SymbolFilters szimbólumonként, előre letöltve; háttérszál frissíti
+    FILTERS_REFRESH_SECONDS-enként, így megbízáskor nincs exchangeInfo hívás.
+    """
+
+    def __init__(self, client: SignedClient, symbols=(), refresh_seconds: float = FILTERS_REFRESH_SECONDS):
+        self.client = client
+        self.symbols = set(symbols)
+        self.refresh_seconds = refresh_seconds
+        self._filters = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self.updated_at = None
+
+    def refresh(self):
+        symbols = sorted(self.symbols)
+        if not symbols:
+            return
+        info = self.client.exchange_info(symbols)
+        filters = {s["symbol"]: SymbolFilters(s) for s in info.get("symbols", [])}
+        with self._lock:
+            self._filters.update(filters)
+        self.updated_at = time.time()
+
+    def get(self, symbol: str) -> SymbolFilters:
+        with self._lock:
+            f = self._filters.get(symbol)
+        if f is None:
+            # új szimbólum (pl. watchlist bővült): egyszeri szinkron letöltés
+            self.symbols.add(symbol)
+            self.refresh()
+            with self._lock:
+                f = self._filters.get(symbol)
+        return f
+
+    def set_symbols(self, symbols):
+        """Új szimbólumoknál a háttérszál azonnal frissít (a hívót nem blokkolja)."""
+        missing = set(symbols) - self.symbols
+        self.symbols = set(symbols)
+        if missing:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Hiba az exchangeInfo frissítésénél:", e)
+
+    def start(self):
+        self.refresh()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="exchange-info", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+# ---- megbízás sor ----
+
+class LiveExecutor:
+    """
+    Éles végrehajtás az auto_trade szimbólumokra, long-only (mint a papír
+    kereskedés): jelzés VÁLTÁSKOR BUY -> MARKET vétel ORDER_SIZE USDC-ért
+    (quoteOrderQty), SELL -> a vételből kapott teljes mennyiség eladása.
+
+    submit() nem blokkol (a jelzés szálán hívjuk, amint a szimbólum jelzése
+    elkészült); a megbízásokat ORDER_WORKERS szál küldi a poolos kliensen,
+    az előre letöltött szűrőkkel. A pozíciók live_state.json-ba mentődnek.
+
+    Egy váltás egy newClientOrderId-t kap, az újrapróbálások is ezt küldik.
+    Ismeretlen kimenetnél (timeout, 5xx) a megbízást ezzel lekérdezzük és a
+    teljesülést könyveljük; amíg ez nem sikerül, a szimbólumra nem megy új
+    megbízás (a lekérdezést a következő körök ismétlik, újraindítás után is).
+    """
+
+    def __init__(self, client: SignedClient, symbols=(), order_size: float = ORDER_SIZE,
+                 filters: FilterCache = None, state_path: Path = STATE_PATH, test: bool = False,
+                 workers: int = ORDER_WORKERS, queue_size: int = ORDER_QUEUE_SIZE):
+        self.client = client
+        self.symbols = set(symbols)
+        self.order_size = order_size
+        self.filters = filters or FilterCache(client, symbols)
+        self.state_path = Path(state_path)
+        self.test = test
+        self.workers = workers
+        self.positions = {}        # symbol -> {"qty", "entry_price", "cost", "order_id", "opened_at"}
+        self._last = {}            # symbol -> utolsó látott jelzés
+        self._pending = set()      # symbolok, amikre megbízás van úton
+        self._orders = {}          # symbol -> (side, newClientOrderId) az aktuális váltáshoz
+        self._unknown = set()      # symbolok, amiknek a megbízás kimenete még ismeretlen
+        self._deferred = {}        # symbol -> (t0, side, price): úton lévő megbízás alatt jött legutolsó jelzés
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self.load()
+
+    # ---- állapot ----
+
+    def load(self):
+        if self.state_path.exists():
+            try:
+                state = json.loads(self.state_path.read_text())
+                self.positions = state.get("positions", {})
+                for sym, (side, cid) in state.get("unknown_orders", {}).items():
+                    self._orders[sym] = (side, cid)
+                    self._unknown.add(sym)
+            except Exception as e:
+                print("Hiba az éles állapot betöltésénél:", e)
+
+    def _save(self):
+        """A lock alatt hívjuk."""
+        unknown = {sym: list(self._orders[sym]) for sym in self._unknown}
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"positions": self.positions, "unknown_orders": unknown}, indent=2))
+        tmp.replace(self.state_path)
+
+    def set_symbols(self, symbols):
+        self.symbols = set(symbols)
+        self.filters.set_symbols(symbols)
+
+    # ---- jelzés -> megbízás ----
+
+    def submit(self, signals):
+        """Nem blokkol: csak a jelzés váltásokból lesz megbízás."""
+        t0 = time.perf_counter()
+        for s in signals:
+            sym = s.get("symbol")
+            if sym in self.symbols:
+                with self._lock:
+                    self._decide(t0, sym, s.get("signal"), s.get("price"))
+
+    def _decide(self, t0: float, sym: str, side: str, price):
+        """A lock alatt hívjuk: a jelzésből lesz-e megbízás (és sorba tétele)."""
+        if sym in self._pending:
+            # úton lévő megbízás alatt nem döntünk: a legutolsó jelzést a
+            # megbízás végén (_run) dolgozzuk fel
+            self._deferred[sym] = (t0, side, price)
+            return
+        if sym in self._unknown:
+            # előbb az ismeretlen kimenetű megbízást kérdezzük le (ugyanazzal az id-vel)
+            self._pending.add(sym)
+            self._queue_order(t0, sym, self._orders[sym][0], price, None)
+            return
+        if side == self._last.get(sym):
+            return
+        if not ((side == "BUY" and sym not in self.positions)
+                or (side == "SELL" and sym in self.positions)):
+            self._last[sym] = side      # nincs teendő (WAIT / már van / nincs pozíció)
+            return
+        prev = self._last.get(sym)
+        # sorba tett megbízás = kezelt váltás; biztosan elutasított megbízásnál
+        # _run törli, így ugyanaz a jelzés a következő körben újra próbálkozik
+        self._last[sym] = side
+        self._pending.add(sym)
+        order = self._orders.get(sym)
+        if order is None or order[0] != side:
+            # új váltás: új id; elutasítás utáni újrapróbálás: a régi
+            self._orders[sym] = (side, f"cb-{sym}-{side[0]}-{int(time.time() * 1000)}")
+        self._queue_order(t0, sym, side, price, prev)
+
+    def _queue_order(self, t0: float, sym: str, side: str, price, prev):
+        """A lock alatt hívjuk; teli sornál visszaállítjuk a _last-ot (prev)."""
+        try:
+            self._queue.put_nowait((t0, sym, side, price))
+        except queue.Full:
+            self._pending.discard(sym)
+            if sym not in self._unknown:
+                if prev is None:
+                    self._last.pop(sym, None)
+                else:
+                    self._last[sym] = prev
+            print(f"Hiba {sym} megbízásnál: a megbízás sor tele")
+            metrics.inc("cryptobot_orders_total", symbol=sym, side=side, status="dropped")
+
+    def _lookup(self, sym: str, client_order_id: str):
+        """A megbízás a tőzsdén (fills-szel), vagy None, ha nem jött létre. Hibánál kivétel."""
+        try:
+            resp = self.client.get_order(sym, client_order_id)
+        except BinanceAPIError as e:
+            if e.code == -2013:        # Order does not exist.
+                return None
+            raise
+        if float(resp.get("executedQty", 0)) > 0:
+            resp["fills"] = [{"commission": t["commission"], "commissionAsset": t["commissionAsset"]}
+                             for t in self.client.my_trades(sym, resp["orderId"])]
+        return resp
+
+    def _resolve(self, sym: str, side: str, client_order_id: str, f) -> str:
+        """Ismeretlen kimenetű megbízás: lekérdezés, teljesülésnél könyvelés."""
+        try:
+            resp = self._lookup(sym, client_order_id)
+        except Exception as e:
+            print(f"Hiba {sym} {side} megbízás lekérdezésénél (a kimenet továbbra is ismeretlen):", e)
+            return UNKNOWN
+        with self._lock:
+            self._unknown.discard(sym)
+            if resp is None:
+                self._save()
+        if resp is None:
+            return REJECTED
+        print(f"{sym} {side} megbízás a lekérdezés szerint: {resp.get('status')}")
+        return FILLED if self._apply_fill(sym, side, resp, f) else REJECTED
+
+    def _execute(self, t0: float, sym: str, side: str, price) -> str:
+        """FILLED / REJECTED / UNKNOWN (teszt módban az elfogadott megbízás FILLED)."""
+        with self._lock:
+            client_order_id = self._orders[sym][1]
+            unknown = sym in self._unknown
+        f = self.filters.get(sym)
+        if unknown:
+            if f is None:
+                print(f"Hiba {sym} megbízás lekérdezésénél: nincs exchangeInfo")
+                return UNKNOWN
+            return self._resolve(sym, side, client_order_id, f)
+        if f is None or not f.trading:
+            print(f"Hiba {sym} megbízásnál: nincs kereskedhető exchangeInfo")
+            metrics.inc("cryptobot_orders_total", symbol=sym, side=side, status="rejected")
+            return REJECTED
+        if side == "BUY":
+            quote = f.quote_qty(self.order_size)
+            if quote is None:
+                print(f"Hiba {sym} megbízásnál: {self.order_size} a minNotional ({f.min_notional}) alatt")
+                metrics.inc("cryptobot_orders_total", symbol=sym, side=side, status="rejected")
+                return REJECTED
+            params = {"quoteOrderQty": quote}
+        else:
+            qty = f.quantity(self.positions[sym]["qty"])
+            if qty is None or (price is not None and not f.notional_ok(qty, price)):
+                print(f"Hiba {sym} megbízásnál: a pozíció ({self.positions[sym]['qty']}) minQty / minNotional alatt")
+                metrics.inc("cryptobot_orders_total", symbol=sym, side=side, status="rejected")
+                return REJECTED
+            params = {"quantity": qty}
+        params["newClientOrderId"] = client_order_id
+
+        try:
+            resp = self.client.new_order(sym, side, test=self.test, **params)
+        except Exception as e:
+            print(f"Hiba {sym} {side} megbízásnál:", e)
+            if self.test or not outcome_unknown(e):
+                metrics.inc("cryptobot_orders_total", symbol=sym, side=side, status="error")
+                return REJECTED
+            metrics.inc("cryptobot_orders_total", symbol=sym, side=side, status="unknown")
+            with self._lock:
+                self._unknown.add(sym)
+                self._save()
+            return self._resolve(sym, side, client_order_id, f)
+        metrics.observe("cryptobot_order_latency_seconds", time.perf_counter() - t0, symbol=sym, side=side)
+        status = resp.get("status", "TEST" if self.test else "UNKNOWN")
+        metrics.inc("cryptobot_orders_total", symbol=sym, side=side, status=status)
+        if self.test:
+            return FILLED
+        return FILLED if self._apply_fill(sym, side, resp, f) else REJECTED
+
+    def _apply_fill(self, sym: str, side: str, resp: dict, f: SymbolFilters) -> bool:
+        executed = float(resp.get("executedQty", 0))
+        quote = float(resp.get("cummulativeQuoteQty", 0))
+        # a base eszközben levont jutalék nem eladható
+        fee_base = sum(float(x["commission"]) for x in resp.get("fills", [])
+                       if x.get("commissionAsset") == f.base_asset)
+        with self._lock:
+            if side == "BUY":
+                if executed > 0:
+                    self.positions[sym] = {
+                        "qty": executed - fee_base,
+                        "entry_price": quote / executed,
+                        "cost": quote,
+                        "order_id": resp.get("orderId"),
+                        "opened_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                    }
+            else:
+                pos = self.positions.get(sym)
+                if pos is not None:
+                    left = pos["qty"] - executed
+                    if f.quantity(left) is None:
+                        self.positions.pop(sym)
+                    else:
+                        pos["qty"] = left
+            self._save()
+        return executed > 0
+
+    # ---- szálak ----
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            t0, sym, side, price = item
+            result = REJECTED
+            try:
+                result = self._execute(t0, sym, side, price)
+            except Exception as e:
+                print(f"Hiba {sym} megbízásnál:", e)
+            finally:
+                with self._lock:
+                    self._pending.discard(sym)
+                    if result == FILLED:
+                        self._orders.pop(sym, None)
+                    elif result == REJECTED and self._last.get(sym) == side:
+                        self._last.pop(sym)     # újrapróbálás a következő azonos jelzésnél
+                    # UNKNOWN: a _last marad, a következő kör újra lekérdezi
+                    deferred = self._deferred.pop(sym, None)
+                    if deferred is not None:
+                        # a megbízás alatt jött legutolsó jelzés (a _pending így nem ürül ki közben)
+                        self._decide(deferred[0], sym, deferred[1], deferred[2])
+
+    def start(self):
+        self.filters.start()
+        self.client.sync_time()
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._run, name=f"order-{len(self._threads)}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout: float = 5):
+        """A sorban lévő megbízásokat még elküldjük."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+        self.filters.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    from config import API_KEY, API_SECRET
+
+    parser = argparse.ArgumentParser(description="Éles végrehajtás: szűrők / teszt megbízás.")
+    parser.add_argument("symbols", nargs="+", help="pl. BTCUSDC ETHUSDC")
+    parser.add_argument("--base-url", default=BASE_URL, help="pl. lokális mock szerver")
+    parser.add_argument("--test-order", choices=["BUY", "SELL"],
+                        help="/api/v3/order/test hívás (nem teljesül) és a késleltetés kiírása")
+    parser.add_argument("--quantity", type=float, help="SELL teszt mennyiség")
+    args = parser.parse_args()
+
+    cl = SignedClient(API_KEY, API_SECRET, base_url=args.base_url)
+    fc = FilterCache(cl, args.symbols).start()
+    for sym in args.symbols:
+        f = fc.get(sym)
+        if f is None:
+            print(f"{sym}: nincs ilyen szimbólum")
+            continue
+        print(f"{sym}: step {f.step}  minQty {f.min_qty}  tick {f.tick}  minNotional {f.min_notional}  "
+              f"({f.base_asset}/{f.quote_asset})")
+        if args.test_order:
+            params = ({"quoteOrderQty": f.quote_qty(ORDER_SIZE)} if args.test_order == "BUY"
+                      else {"quantity": f.quantity(args.quantity or 0)})
+            t0 = time.perf_counter()
+            try:
+                cl.new_order(sym, args.test_order, test=True, **params)
+                print(f"  teszt {args.test_order} OK ({(time.perf_counter() - t0) * 1000:.1f} ms)", params)
+            except Exception as e:
+                print("  Hiba:", e)
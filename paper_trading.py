@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import metrics
+
+BASE_DIR = Path(__file__).parent
+STATE_PATH = BASE_DIR / "paper_state.json"
+TRADES_PATH = BASE_DIR / "paper_trades.csv"
+
+START_BALANCE = 1000.0         # USDC
+ORDER_SIZE = 100.0             # USDC / BUY (ha kevesebb a cash, annyi)
+FEE = 0.001                    # egyirányú jutalék (0.1%)
+SLIPPAGE_BPS = 5               # gyertya modell: ennyi bázispont csúszás a jel árához képest
+QUEUE_SIZE = 1000              # ennyi jelzés kör várhat feldolgozásra (teli sornál: lásd submit())
+STATE_VERSION = 1
+
+TRADE_COLUMNS = ["timestamp", "symbol", "side", "qty", "price", "ref_price", "fee", "cash", "pnl"]
+
+metrics.describe("cryptobot_paper_latency_seconds", "Jelzés beküldésétől a szimulált teljesülésig")
+metrics.describe("cryptobot_paper_signals_total", "Feldolgozott jelzések (auto_trade szimbólumok)")
+metrics.describe("cryptobot_paper_orders_total", "Szimulált market megbízások")
+metrics.describe("cryptobot_paper_dropped_total", "Teli sor miatt eldobott / összevont jelzés körök")
+
+TRADE_SIDES = ("BUY", "SELL")
+
+
+class CandleFillModel:
+    """
+    Teljesülés a jel árán (az utolsó gyertya close) + csúszás:
+    BUY drágábban, SELL olcsóbban `slippage_bps` bázisponttal.
+    """
+
+    def __init__(self, slippage_bps: float = SLIPPAGE_BPS):
+        self.slippage = slippage_bps / 10_000
+
+    def fill(self, symbol: str, side: str, ref_price: float, qty: float = None, quote: float = None) -> float:
+        return ref_price * (1 + self.slippage) if side == "BUY" else ref_price * (1 - self.slippage)
+
+
+class BookFillModel:
+    """
+    Teljesülés az order book alapján: a megbízás mennyiségét végigvezetjük a
+    szinteken (Spot.depth), az ár a súlyozott átlag. Ha a book nem elég mély
+    vagy a lekérés hibás, a gyertya modellre esünk vissza.
+    """
+
+    def __init__(self, client, depth: int = 100, fallback: CandleFillModel = None):
+        self.client = client
+        self.depth = depth
+        self.fallback = fallback or CandleFillModel()
+
+    def fill(self, symbol: str, side: str, ref_price: float, qty: float = None, quote: float = None) -> float:
+        try:
+            book = self.client.depth(symbol, limit=self.depth)
+            levels = [(float(p), float(q)) for p, q in (book["asks"] if side == "BUY" else book["bids"])]
+        except Exception as e:
+            print(f"Paper: order book hiba {symbol}:", e)
+            levels = []
+        cost = filled = 0.0
+        for price, size in levels:
+            if quote is not None:
+                take = min(size, (quote - cost) / price)
+            else:
+                take = min(size, qty - filled)
+            cost += take * price
+            filled += take
+            if (quote is not None and cost >= quote * (1 - 1e-12)) or (qty is not None and filled >= qty * (1 - 1e-12)):
+                return cost / filled
+        return self.fallback.fill(symbol, side, ref_price, qty, quote)
+
+
+def _coalesce(rounds):
+    """
+    Jelzés körök összevonása egy körré (sorrendben, a legrégebbi elöl):
+    szimbólumonként a legutolsó BUY/SELL jelzés, ha volt, különben a legutolsó
+    jelzés. Az időbélyeg a legrégebbi kör beküldése (késleltetés metrikához).
+    """
+    merged = {}
+    for _, signals in rounds:
+        for s in signals:
+            sym = s["symbol"]
+            if s.get("signal") in TRADE_SIDES or merged.get(sym, {}).get("signal") not in TRADE_SIDES:
+                merged[sym] = s
+    return rounds[0][0], list(merged.values())
+
+
+class PaperTrader:
+    """
+    Papír kereskedés az auto_trade szimbólumokra, long-only (mint a backtest):
+    BUY jelzésnél flat állapotból ORDER_SIZE USDC-ért veszünk, SELL-nél
+    az egész pozíciót eladjuk.
+
+    A jelzés út nem vár rá: submit() csak sorba teszi a kört (teli sornál
+    BUY/SELL nélküli kört eldob, különben összevon, lásd submit()), a teljesítést, a perzisztálást (paper_state.json,
+    atomikus csere) és a kötés logot (paper_trades.csv) külön szál végzi.
+    """
+
+    def __init__(self, symbols=(), fill_model=None, state_path: Path = STATE_PATH,
+                 trades_path: Path = TRADES_PATH, start_balance: float = START_BALANCE,
+                 order_size: float = ORDER_SIZE, fee: float = FEE, queue_size: int = QUEUE_SIZE,
+                 now=None):
+        self.symbols = set(symbols)
+        self.fill_model = fill_model or CandleFillModel()
+        self.state_path = Path(state_path)
+        self.trades_path = Path(trades_path)
+        self.order_size = order_size
+        self.fee = fee
+        self.now = now or datetime.utcnow    # visszajátszáskor a szimulált óra utcnow-ja
+        self.cash = start_balance
+        self.start_balance = start_balance
+        self.positions = {}    # symbol -> {"qty", "entry_price", "cost", "opened_at"}
+        self.last_prices = {}
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.load()
+
+    # ---- állapot ----
+
+    def load(self):
+        if not self.state_path.exists():
+            return
+        try:
+            state = json.loads(self.state_path.read_text())
+        except Exception as e:
+            print("Paper: hibás állapot fájl, üres állapottal indulunk:", e)
+            return
+        if state.get("version") != STATE_VERSION:
+            print("Paper: ismeretlen állapot verzió, üres állapottal indulunk")
+            return
+        self.cash = state["cash"]
+        self.start_balance = state.get("start_balance", self.start_balance)
+        self.positions = state.get("positions", {})
+        self.last_prices = state.get("last_prices", {})
+
+    def _save(self):
+        state = {
+            "version": STATE_VERSION,
+            "updated_at": self.now().isoformat(timespec="seconds") + "Z",
+            "start_balance": self.start_balance,
+            "cash": self.cash,
+            "positions": self.positions,
+            "last_prices": self.last_prices,
+        }
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, indent=2))
+        os.replace(tmp, self.state_path)
+
+    def _log_trade(self, row: dict):
+        header = not self.trades_path.exists()
+        with self.trades_path.open("a", encoding="utf-8") as f:
+            if header:
+                f.write(",".join(TRADE_COLUMNS) + "\n")
+            f.write(",".join(str(row[c]) for c in TRADE_COLUMNS) + "\n")
+
+    def equity(self) -> float:
+        with self._lock:
+            return self.cash + sum(p["qty"] * self.last_prices.get(sym, p["entry_price"])
+                                   for sym, p in self.positions.items())
+
+    # ---- jelzések ----
+
+    def set_symbols(self, symbols):
+        """Az auto_trade szimbólumok (watchlist újratöltéskor frissíthető)."""
+        self.symbols = set(symbols)
+
+    def submit(self, signals):
+        """
+        Nem blokkol: a kör a feldolgozó szál sorába kerül. Teli sornál egy
+        megbízást nem jelentő (csak WAIT) kört eldobunk; BUY/SELL-t tartalmazót
+        nem: ilyenkor a várakozó körök és az új egyetlen körré olvadnak,
+        szimbólumonként a legutolsó BUY/SELL jelzéssel (így SELL nem vész el).
+        """
+        item = (time.perf_counter(), [s for s in signals if s.get("symbol") in self.symbols])
+        if not item[1]:
+            return
+        try:
+            self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+        if not any(s.get("signal") in TRADE_SIDES for s in item[1]):
+            self._dropped(1)
+            return
+        while True:
+            rounds = []
+            while True:
+                try:
+                    rounds.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rounds.append(item)
+            item = _coalesce(rounds)
+            self._dropped(len(rounds) - 1)
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+
+    def _dropped(self, n: int):
+        if n > 0:
+            self.dropped += n
+            metrics.inc("cryptobot_paper_dropped_total", n)
+
+    def process(self, signals, submitted_at: float = None):
+        """Egy jelzés kör feldolgozása (a szálból, vagy tesztben közvetlenül)."""
+        changed = False
+        with self._lock:
+            for s in signals:
+                sym = s["symbol"]
+                price = s.get("price")
+                if price is None:
+                    continue
+                self.last_prices[sym] = price
+                metrics.inc("cryptobot_paper_signals_total", symbol=sym)
+                side = s.get("signal")
+                if side == "BUY" and sym not in self.positions:
+                    changed |= self._buy(sym, price)
+                elif side == "SELL" and sym in self.positions:
+                    changed |= self._sell(sym, price)
+                else:
+                    continue
+                if submitted_at is not None:
+                    metrics.observe("cryptobot_paper_latency_seconds",
+                                    time.perf_counter() - submitted_at, symbol=sym)
+            if changed:
+                self._save()
+        return changed
+
+    def _buy(self, sym: str, ref_price: float) -> bool:
+        quote = min(self.order_size, self.cash)
+        if quote <= 0:
+            return False
+        price = self.fill_model.fill(sym, "BUY", ref_price, quote=quote)
+        fee = quote * self.fee
+        qty = (quote - fee) / price
+        self.cash -= quote
+        self.positions[sym] = {
+            "qty": qty,
+            "entry_price": price,
+            "cost": quote,
+            "opened_at": self.now().isoformat(timespec="seconds") + "Z",
+        }
+        metrics.inc("cryptobot_paper_orders_total", symbol=sym, side="BUY")
+        self._log_trade({"timestamp": self.now().isoformat(), "symbol": sym, "side": "BUY",
+                         "qty": qty, "price": price, "ref_price": ref_price, "fee": fee,
+                         "cash": self.cash, "pnl": ""})
+        return True
+
+    def _sell(self, sym: str, ref_price: float) -> bool:
+        pos = self.positions.pop(sym)
+        qty = pos["qty"]
+        price = self.fill_model.fill(sym, "SELL", ref_price, qty=qty)
+        gross = qty * price
+        fee = gross * self.fee
+        self.cash += gross - fee
+        pnl = gross - fee - pos["cost"]
+        metrics.inc("cryptobot_paper_orders_total", symbol=sym, side="SELL")
+        self._log_trade({"timestamp": self.now().isoformat(), "symbol": sym, "side": "SELL",
+                         "qty": qty, "price": price, "ref_price": ref_price, "fee": fee,
+                         "cash": self.cash, "pnl": pnl})
+        return True
+
+    # ---- szál ----
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                submitted_at, signals = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self.process(signals, submitted_at)
+            except Exception as e:
+                print("Paper trading hiba:", e)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="paper-trader", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, drain: bool = True):
+        """Leállítás; drain=True: a sorban maradt köröket még feldolgozzuk."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        while drain:
+            try:
+                submitted_at, signals = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self.process(signals, submitted_at)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Papír kereskedés állapota.")
+    parser.add_argument("--reset", action="store_true", help="Állapot és kötés log törlése")
+    args = parser.parse_args()
+
+    if args.reset:
+        for p in (STATE_PATH, TRADES_PATH):
+            if p.exists():
+                p.unlink()
+        print("Papír kereskedés állapot törölve.")
+        raise SystemExit(0)
+
+    trader = PaperTrader()
+    eq = trader.equity()
+    print("===== PAPÍR KERESKEDÉS =====")
+    print(f"Cash:                {trader.cash:.2f} USDC")
+    print(f"Equity (utolsó ár):  {eq:.2f} USDC ({(eq / trader.start_balance - 1) * 100:.2f} %)")
+    print("Nyitott pozíciók:")
+    if not trader.positions:
+        print(" - nincs")
+    for sym, p in trader.positions.items():
+        last = trader.last_prices.get(sym, p["entry_price"])
+        print(f" - {sym:<10} qty: {p['qty']:.6f}  belépő: {p['entry_price']:.4f}  utolsó: {last:.4f}  "
+              f"nyitva: {p['opened_at']}")
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import deque
+
+import metrics
+
+# Binance spot REQUEST_WEIGHT limit (1 perces ablak)
+REQUEST_WEIGHT_LIMIT = 6000
+# Ennyit engedünk magunknak belőle (a dashboard / más kliensek is fogyasztanak)
+REQUEST_WEIGHT_BUDGET = int(REQUEST_WEIGHT_LIMIT * 0.8)
+
+KLINES_WEIGHT = 2        # GET /api/v3/klines
+TICKER_24HR_WEIGHT = 80  # GET /api/v3/ticker/24hr, minden szimbólum (symbol nélkül)
+
+
+def ticker_24hr_weight(symbols=None, symbol=None) -> int:
+    """1-20 szimbólum: 2, 21-100: 40, 101+ vagy mind: 80 (egy symbol: 2)."""
+    if symbol:
+        return 2
+    if not symbols:
+        return TICKER_24HR_WEIGHT
+    n = len(symbols)
+    return 2 if n <= 20 else 40 if n <= 100 else TICKER_24HR_WEIGHT
+
+
+metrics.describe("cryptobot_binance_throttle_seconds", "Várakozás a kliens oldali weight keretre")
+metrics.describe("cryptobot_binance_weight_total", "Elküldött kérések request weight összege")
+metrics.describe("cryptobot_binance_request_seconds", "Binance REST hívások ideje")
+metrics.describe("cryptobot_binance_errors_total", "Sikertelen Binance REST hívások")
+
+
+class WeightLimiter:
+    """
+    Kliens oldali request weight számlálás csúszó 60 mp-es ablakban.
+    acquire() blokkol, ha a kérés túllépné a keretet, amíg a legrégebbi
+    kérések ki nem esnek az ablakból.
+    """
+
+    def __init__(self, budget: int = REQUEST_WEIGHT_BUDGET, window: float = 60.0):
+        self.budget = budget
+        self.window = window
+        self._events = deque()   # (monotonic idő, weight)
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        while self._events and now - self._events[0][0] >= self.window:
+            _, w = self._events.popleft()
+            self._used -= w
+
+    def acquire(self, weight: int):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._purge(now)
+                if self._used + weight <= self.budget or not self._events:
+                    self._events.append((now, weight))
+                    self._used += weight
+                    return
+                wait = self.window - (now - self._events[0][0])
+            time.sleep(max(wait, 0.01))
+
+    def used(self) -> int:
+        """Az utolsó 60 mp-ben elhasznált weight."""
+        with self._lock:
+            self._purge(time.monotonic())
+            return self._used
+
+
+class RateLimitedClient:
+    """Spot kliens csomagoló: minden klines / ticker_24hr hívás előtt weight-et foglal."""
+
+    def __init__(self, client, limiter: WeightLimiter):
+        self._client = client
+        self._limiter = limiter
+
+    def _call(self, endpoint: str, weight: int, label: str, fn, *args, **kwargs):
+        with metrics.timer("cryptobot_binance_throttle_seconds", endpoint=endpoint):
+            self._limiter.acquire(weight)
+        metrics.inc("cryptobot_binance_weight_total", weight, endpoint=endpoint)
+        try:
+            with metrics.timer("cryptobot_binance_request_seconds", endpoint=endpoint, symbol=label):
+                return fn(*args, **kwargs)
+        except Exception:
+            metrics.inc("cryptobot_binance_errors_total", endpoint=endpoint, symbol=label)
+            raise
+
+    def klines(self, symbol, interval, **kwargs):
+        return self._call("klines", KLINES_WEIGHT, symbol, self._client.klines, symbol, interval, **kwargs)
+
+    def ticker_24hr(self, symbol=None, symbols=None, **kwargs):
+        weight = ticker_24hr_weight(symbols, symbol)
+        return self._call("ticker_24hr", weight, symbol or "all", self._client.ticker_24hr,
+                          symbol=symbol, symbols=symbols, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
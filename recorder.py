@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+import gzip
+import json
+import struct
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from pathlib import Path
+
+from kline_stream import kline_from_stream, RECV_TIMEOUT
+from serialize import dumps
+
+RECORD_DIR = Path(__file__).with_name("recordings")
+RECORD_MAGIC = b"CBR1"
+FLUSH_SECONDS = 5              # ennyi mp-enként a gzip puffert is kiírjuk (olvasható marad)
+
+# Fájl formátum: gzip folyam, benne b"CBR1", majd rekordonként
+#   u32 hossz (little-endian) + JSON:
+#   {"t": fogadás ideje (ms), "src": "rest", "symbol", "interval", "params", "data": [klines]}
+#   {"t": ..., "src": "ws", "msg": nyers stream üzenet}
+# Újranyitáskor új gzip tag kerül a végére (a gzip ezt egy folyamként olvassa).
+
+
+class Recorder:
+    """Append-only, tömörített, hossz prefixes rekord fájl (szálbiztos)."""
+
+    def __init__(self, path: Path, flush_seconds: float = FLUSH_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        self._f = gzip.open(self.path, "ab", compresslevel=6)
+        if new:
+            self._f.write(RECORD_MAGIC)
+        self.flush_seconds = flush_seconds
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, src: str, **fields):
+        payload = dumps({"t": time.time() * 1000, "src": src, **fields})
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.write(struct.pack("<I", len(payload)))
+            self._f.write(payload)
+            self.count += 1
+            if time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._f.flush()
+                self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+class RecordingClient:
+    """Spot kliens csomagoló: minden klines választ (a kérés paramétereivel) rögzít."""
+
+    def __init__(self, client, recorder: Recorder):
+        self._client = client
+        self._recorder = recorder
+
+    def klines(self, symbol, interval, **kwargs):
+        data = self._client.klines(symbol, interval, **kwargs)
+        self._recorder.record("rest", symbol=symbol, interval=interval, params=kwargs, data=data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class RecordingTransport:
+    """KlineStream transport csomagoló: minden nyers stream üzenetet rögzít."""
+
+    def __init__(self, transport, recorder: Recorder):
+        self._transport = transport
+        self._recorder = recorder
+
+    def recv(self):
+        raw = self._transport.recv()
+        self._recorder.record("ws", msg=raw if isinstance(raw, str) else raw.decode("utf-8"))
+        return raw
+
+    def send(self, text: str):
+        self._transport.send(text)
+
+    def close(self):
+        self._transport.close()
+
+
+def read_records(path: Path):
+    """Rekordok sorban (dict). Csonka végű fájlnál (pl. összeomlás) az utolsó teljes rekordig."""
+    with gzip.open(path, "rb") as f:
+        try:
+            if f.read(len(RECORD_MAGIC)) != RECORD_MAGIC:
+                raise ValueError(f"{path}: nem felvétel fájl")
+            while True:
+                head = f.read(4)
+                if len(head) < 4:
+                    return
+                (n,) = struct.unpack("<I", head)
+                body = f.read(n)
+                if len(body) < n:
+                    return
+                yield json.loads(body)
+        except (EOFError, gzip.BadGzipFile):
+            return
+
+
+# ---- visszajátszás ----
+
+class SimClock:
+    """
+    Szimulált óra (ms). speed=100: 100x valós idő; speed=None: csak
+    advance_to() lépteti (determinisztikus, "amilyen gyorsan csak lehet").
+    """
+
+    def __init__(self, start_ms: float, speed: float = None):
+        self.speed = speed
+        self._base = start_ms
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        with self._lock:
+            if self.speed is None:
+                return self._base
+            return self._base + (time.monotonic() - self._t0) * 1000 * self.speed
+
+    def advance_to(self, t_ms: float):
+        with self._lock:
+            if self.speed is None:
+                self._base = max(self._base, t_ms)
+
+    def utcnow(self) -> datetime:
+        return datetime.utcfromtimestamp(self.now() / 1000)
+
+    def sleep(self, seconds: float):
+        """Szimulált idő szerinti alvás (valós időben seconds / speed)."""
+        if self.speed is None:
+            self.advance_to(self.now() + seconds * 1000)
+        else:
+            time.sleep(seconds / self.speed)
+
+
+class _Book:
+    """Egy (symbol, interval) gyertyái a szimulált időpontig látott legfrissebb változatban."""
+
+    def __init__(self):
+        self.events = []       # (t, kline) fogadási idő szerint
+        self.cursor = 0
+        self.open_times = []
+        self.rows = {}
+
+    def advance(self, now: float):
+        while self.cursor < len(self.events) and self.events[self.cursor][0] <= now:
+            _, k = self.events[self.cursor]
+            ot = int(k[0])
+            if ot not in self.rows:
+                insort(self.open_times, ot)
+            self.rows[ot] = k
+            self.cursor += 1
+
+
+class Replay:
+    """
+    Felvétel visszajátszása szimulált idővel.
+
+    - client: a binance.spot.Spot.klines() interfészét adja; mindig azt
+      látja, amit élesben a szimulált időpontig a bot is látott (REST
+      válaszok + stream üzenetek gyertyánként legfrissebb változata),
+      a lekérés paramétereitől függetlenül.
+    - transport(url): KlineStream transport_factory, a rögzített stream
+      üzeneteket adja vissza a szimulált idő szerint ütemezve.
+    """
+
+    def __init__(self, path: Path, speed: float = 100.0, start_ms: float = None):
+        self.path = Path(path)
+        self._books = {}
+        self._messages = []    # (t, stream név, nyers üzenet)
+        first = None
+        for rec in read_records(self.path):
+            t = rec["t"]
+            first = t if first is None else min(first, t)
+            if rec["src"] == "rest":
+                book = self._book(rec["symbol"], rec["interval"])
+                book.events.extend((t, k) for k in rec["data"])
+            elif rec["src"] == "ws":
+                msg = json.loads(rec["msg"])
+                data = msg.get("data", msg)
+                if data.get("e") == "kline":
+                    k = data["k"]
+                    self._book(data["s"], k["i"]).events.append((t, kline_from_stream(k)))
+                self._messages.append((t, msg.get("stream", ""), rec["msg"]))
+        for book in self._books.values():
+            book.events.sort(key=lambda e: e[0])
+        self._messages.sort(key=lambda m: m[0])
+        self.start_ms = start_ms if start_ms is not None else (first or time.time() * 1000)
+        self.end_ms = max([b.events[-1][0] for b in self._books.values() if b.events]
+                          + [m[0] for m in self._messages[-1:]] + [self.start_ms])
+        self.clock = SimClock(self.start_ms, speed)
+        self._msg_cursor = 0
+        self._lock = threading.Lock()
+
+    def _book(self, symbol: str, interval: str) -> _Book:
+        key = (symbol.upper(), interval)
+        book = self._books.get(key)
+        if book is None:
+            book = self._books[key] = _Book()
+        return book
+
+    @property
+    def finished(self) -> bool:
+        return self.clock.now() >= self.end_ms
+
+    def symbols(self):
+        return sorted({sym for sym, _ in self._books})
+
+    # ---- Spot klines() interfész ----
+
+    def klines(self, symbol, interval, limit=500, startTime=None, endTime=None, **kwargs):
+        with self._lock:
+            book = self._books.get((symbol.upper(), interval))
+            if book is None:
+                return []
+            book.advance(self.clock.now())
+            ots = book.open_times
+            hi = bisect_right(ots, endTime) if endTime is not None else len(ots)
+            if startTime is not None:
+                lo = bisect_left(ots, startTime)
+                hi = min(hi, lo + limit)
+            else:
+                lo = max(hi - limit, 0)
+            return [list(book.rows[ot]) for ot in ots[lo:hi]]
+
+    # ---- KlineStream transport ----
+
+    def transport(self, url: str):
+        return _ReplayTransport(self, url)
+
+
+class _ReplayTransport:
+    def __init__(self, replay: Replay, url: str):
+        self.replay = replay
+        streams = url.split("streams=", 1)[1] if "streams=" in url else ""
+        self.streams = set(streams.split("/")) if streams else None
+
+    def recv(self) -> str:
+        r = self.replay
+        while True:
+            with r._lock:
+                if r._msg_cursor >= len(r._messages):
+                    msg = None
+                else:
+                    msg = r._messages[r._msg_cursor]
+            if msg is None:
+                # felvétel vége: a KlineStream timeout-ként kezeli és újracsatlakozik
+                time.sleep(min(RECV_TIMEOUT, 1.0))
+                raise TimeoutError("a felvétel véget ért")
+            t, stream, raw = msg
+            wait = t - r.clock.now()
+            if wait > 0:
+                if r.clock.speed is None:
+                    r.clock.advance_to(t)
+                else:
+                    time.sleep(wait / 1000 / r.clock.speed)
+                    continue
+            with r._lock:
+                if r._msg_cursor < len(r._messages) and r._messages[r._msg_cursor] is msg:
+                    r._msg_cursor += 1
+                else:
+                    continue
+            if self.streams is None or stream in self.streams:
+                return raw
+
+    def close(self):
+        pass
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Piaci adat felvétel infó.")
+    parser.add_argument("path", type=Path, help="Felvétel fájl (.cbrec)")
+    args = parser.parse_args()
+
+    counts = {"rest": 0, "ws": 0}
+    first = last = None
+    symbols = set()
+    for rec in read_records(args.path):
+        counts[rec["src"]] = counts.get(rec["src"], 0) + 1
+        first = rec["t"] if first is None else min(first, rec["t"])
+        last = rec["t"] if last is None else max(last, rec["t"])
+        if rec["src"] == "rest":
+            symbols.add(rec["symbol"])
+    if first is None:
+        print("Üres felvétel.")
+    else:
+        span = (last - first) / 1000
+        print(f"{args.path}: {counts['rest']} REST válasz, {counts['ws']} stream üzenet, "
+              f"{span:.0f} mp ({datetime.utcfromtimestamp(first / 1000)} – "
+              f"{datetime.utcfromtimestamp(last / 1000)} UTC)")
+        print("Szimbólumok:", ", ".join(sorted(symbols)) or "-")
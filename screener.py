@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+import time
+
+import metrics
+import trading_bot as tb
+from candle_cache import drop_cache
+from indicators import drop_state
+from snapshot import summarize
+from watchlist import load_watchlist
+
+QUOTE_ASSET = "USDC"
+MIN_QUOTE_VOLUME = 1_000_000   # 24h forgalom (quote eszközben), ez alatt kiesik
+SHORTLIST = 50                 # ennyi pár kap RSI/EMA számolást
+SCREEN_BY = "volume"           # "volume": 24h forgalom, "volatility": 24h high-low sáv %
+SCREEN_WORKERS = 16            # párhuzamos gyertya lekérés (a weight limiter úgyis fog)
+# stabil / fiat bázisú párok: nincs értelme RSI/EMA jelzésnek
+EXCLUDE_BASES = {"USDT", "FDUSD", "TUSD", "USDP", "DAI", "BUSD", "EUR", "EURI", "USDE", "PAX"}
+
+_SIGNAL_ORDER = {"BUY": 0, "SELL": 1, "WAIT": 2}
+
+
+def _float(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def fetch_tickers(quote: str = QUOTE_ASSET):
+    """
+    Egyetlen 24h ticker snapshot az összes párra (weight 80, MINI: kisebb válasz),
+    a `quote` párokra szűrve: [{symbol, last, quote_volume, change_pct, range_pct, trades}].
+    """
+    with metrics.timer("cryptobot_stage_seconds", stage="screen_tickers", symbol="all"):
+        raw = tb._rest_client().ticker_24hr(type="MINI")
+    out = []
+    for t in raw:
+        sym = t["symbol"]
+        if not sym.endswith(quote) or sym[:-len(quote)] in EXCLUDE_BASES:
+            continue
+        last = _float(t.get("lastPrice"))
+        open_ = _float(t.get("openPrice"))
+        high = _float(t.get("highPrice"))
+        low = _float(t.get("lowPrice"))
+        trades = int(t.get("count") or 0)
+        if last <= 0 or trades == 0:
+            continue          # nem kereskedett / felfüggesztett pár
+        out.append({
+            "symbol": sym,
+            "last": last,
+            "quote_volume": _float(t.get("quoteVolume")),
+            "change_pct": (last / open_ - 1) * 100 if open_ > 0 else 0.0,
+            "range_pct": (high / low - 1) * 100 if low > 0 else 0.0,
+            "trades": trades,
+        })
+    return out
+
+
+def prefilter(tickers, by: str = SCREEN_BY, top: int = SHORTLIST,
+              min_quote_volume: float = MIN_QUOTE_VOLUME):
+    """Forgalom alatti párok ki, a maradék `by` szerint csökkenőben, az első `top`."""
+    key = {"volume": "quote_volume", "volatility": "range_pct"}[by]
+    liquid = [t for t in tickers if t["quote_volume"] >= min_quote_volume]
+    liquid.sort(key=lambda t: t[key], reverse=True)
+    return liquid[:top]
+
+
+def rank(signals, tickers):
+    """
+    BUY elöl (legalacsonyabb RSI először), aztán SELL (legmagasabb RSI),
+    végül WAIT; azonos jelzésen belül a nagyobb forgalom előrébb.
+    """
+    by_sym = {t["symbol"]: t for t in tickers}
+    rows = []
+    for s in signals:
+        row = summarize(s)
+        row.update({k: v for k, v in by_sym[s["symbol"]].items() if k != "symbol"})
+        rows.append(row)
+
+    def key(r):
+        rsi = r["rsi"] if r["rsi"] == r["rsi"] else 50.0     # NaN (kevés gyertya) -> semleges
+        side = r["signal"]
+        return (_SIGNAL_ORDER.get(side, 3), rsi if side == "BUY" else -rsi if side == "SELL" else 0,
+                -r["quote_volume"])
+
+    rows.sort(key=key)
+    for i, r in enumerate(rows, 1):
+        r["rank"] = i
+    return rows
+
+
+class Screener:
+    """
+    Piaci screener: 1 bulk ticker hívás -> előszűrés -> get_signal csak a
+    rövid listára (a cache / inkrementális indikátor úton, így a második
+    körtől párosként csak az új gyertyák jönnek) -> rangsor.
+    A rövid listáról kiesett (és watchlisten nem lévő) párok cache-e törlődik.
+    """
+
+    def __init__(self, quote: str = QUOTE_ASSET, by: str = SCREEN_BY, top: int = SHORTLIST,
+                 min_quote_volume: float = MIN_QUOTE_VOLUME, interval: str = tb.HISTORY_INTERVAL,
+                 limit: int = tb.HISTORY_LIMIT, max_workers: int = SCREEN_WORKERS):
+        self.quote = quote
+        self.by = by
+        self.top = top
+        self.min_quote_volume = min_quote_volume
+        self.interval = interval
+        self.limit = limit
+        self.max_workers = max_workers
+        self._shortlist = set()
+        self.last_seconds = 0.0
+        self.last_counts = (0, 0, 0)     # ticker / rövid lista / kész jelzés
+
+    def scan(self):
+        t0 = time.perf_counter()
+        tickers = fetch_tickers(self.quote)
+        short = prefilter(tickers, self.by, self.top, self.min_quote_volume)
+        symbols = [t["symbol"] for t in short]
+
+        keep = set(load_watchlist()[0])
+        for sym in self._shortlist - set(symbols) - keep:
+            drop_cache(sym, self.interval)
+            drop_state(sym)
+        self._shortlist = set(symbols)
+
+        with metrics.timer("cryptobot_stage_seconds", stage="screen_signals", symbol="all"):
+            signals = tb.get_all_signals(interval=self.interval, limit=self.limit,
+                                         max_workers=self.max_workers, symbols=symbols, log=False)
+        self.last_seconds = time.perf_counter() - t0
+        self.last_counts = (len(tickers), len(symbols), len(signals))
+        return rank(signals, short)
+
+
+def print_ranking(rows, counts, seconds, show: int = 20):
+    print(f"===== SCREENER ({counts[0]} pár -> {counts[1]} rövid lista -> {counts[2]} jelzés, "
+          f"{seconds:.2f} mp) =====")
+    print(f"{'#':>3}  {'Symbol':<12}{'Jelzés':<7}{'RSI':>7}{'EMA9/21 %':>11}{'24h %':>8}"
+          f"{'Sáv %':>8}{'Forgalom':>16}")
+    for r in rows[:show]:
+        trend = (r["ema9"] / r["ema21"] - 1) * 100 if r["ema21"] else 0.0
+        print(f"{r['rank']:>3}  {r['symbol']:<12}{r['signal']:<7}{r['rsi']:>7.2f}{trend:>11.3f}"
+              f"{r['change_pct']:>8.2f}{r['range_pct']:>8.2f}{r['quote_volume']:>16,.0f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Piaci screener: bulk 24h ticker + RSI/EMA a rövid listán.")
+    parser.add_argument("--quote", default=QUOTE_ASSET, help="Quote eszköz (alap: USDC)")
+    parser.add_argument("--by", choices=["volume", "volatility"], default=SCREEN_BY,
+                        help="Előszűrés: 24h forgalom vagy 24h high-low sáv")
+    parser.add_argument("--top", type=int, default=SHORTLIST, help="Rövid lista mérete")
+    parser.add_argument("--min-volume", type=float, default=MIN_QUOTE_VOLUME,
+                        help="Minimum 24h forgalom (quote eszközben)")
+    parser.add_argument("--show", type=int, default=20, help="Ennyi sort írunk ki")
+    parser.add_argument("--loop", action="store_true", help=f"Ismétlés {tb.POLL_SECONDS} mp-enként")
+    args = parser.parse_args()
+
+    sc = Screener(args.quote, args.by, args.top, args.min_volume)
+    while True:
+        try:
+            rows = sc.scan()
+            print_ranking(rows, sc.last_counts, sc.last_seconds, args.show)
+        except Exception as e:
+            print("Screener hiba:", e)
+        if not args.loop:
+            break
+        time.sleep(max(tb.POLL_SECONDS - sc.last_seconds, 0))
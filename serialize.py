@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:     # opcionális: nélküle a sima json + numpy átalakítás fut
+    orjson = None
+
+# "HH:MM" címkék a nap minden percére (UTC), gyertyánként csak indexelünk
+_MINUTE_LABELS = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60))
+
+
+def time_labels(open_times) -> list:
+    """open_time (ms) tömb -> "HH:MM" címkék (ugyanaz, mint a strftime, pandas nélkül)"""
+    minutes = (np.asarray(open_times, dtype=np.int64) // 60_000) % (24 * 60)
+    return [_MINUTE_LABELS[m] for m in minutes.tolist()]
+
+
+def _nan_to_none(values: list) -> list:
+    return [None if v != v else v for v in values]
+
+
+def _default(obj):
+    """json fallback: numpy tömbök / skalárok (NaN -> null)"""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f":
+            return _nan_to_none(obj.tolist())
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        v = obj.item()
+        return None if v != v else v
+    raise TypeError(f"{type(obj).__name__} nem JSON szerializálható")
+
+
+def dumps(obj) -> bytes:
+    """
+    Kompakt JSON bytes. A numpy tömbök közvetlenül szerializálódnak, a NaN
+    (tömbben és skalárként is) null lesz. orjson-nal natívan, nélküle
+    json + tolist fallback.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_clean_nan(obj), separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def _clean_nan(obj):
+    """Python float NaN -> None (a json modul különben NaN-t írna, ami nem érvényes JSON)"""
+    if isinstance(obj, float) and obj != obj:
+        return None
+    if isinstance(obj, dict):
+        return {k: _clean_nan(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clean_nan(v) for v in obj]
+    return obj
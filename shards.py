@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+import multiprocessing as mp
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import metrics
+from serialize import time_labels
+
+SHM_NAME = "cryptobot_signals"
+SHARDS = os.cpu_count() or 1   # alapból annyi worker folyamat, ahány mag
+MAX_SYMBOLS = 256              # tábla sorok (watchlist bővülhet futás közben is)
+MAX_SHARDS = 64
+HISTORY_POINTS = 1000          # history pontok / szimbólum (Binance klines limit max)
+TABLE_VERSION = 3
+
+HEARTBEAT_SECONDS = 5          # a shard ennyi mp-enként jelzi, hogy él (és nézi a kiosztását)
+HEARTBEAT_TIMEOUT = 120        # ennyi csend után a supervisor újraindítja (beragadt shard)
+RESTART_DELAY = 1.0            # újraindítás előtti várakozás, összeomlásonként duplázva
+MAX_RESTART_DELAY = 60.0
+STABLE_SECONDS = 300           # ennyi hibátlan futás után a várakozás visszaáll
+DISPATCH_SECONDS = 0.25        # a supervisor ilyen sűrűn nézi a táblát (végrehajtásnak)
+READ_RETRIES = 1000            # seqlock: ennyiszer próbáljuk újra a közben írt sort
+
+metrics.describe("cryptobot_shard_restarts_total", "Újraindított shard folyamatok (összeomlás / beragadás)")
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("slots", "<u4"),
+    ("count", "<u4"),                      # használt sorok (a legmagasabb foglalt sor + 1)
+    ("history", "<u4"),
+    ("shards", "<u4"),                     # szimbólumot kezelő shardok száma (weight keret elosztásához)
+    ("heartbeat", "<f8", (MAX_SHARDS,)),   # time.time() shardonként
+], align=True)
+
+# Egy sor = egy szimbólum legutolsó jelzése. seq: seqlock számláló, írás
+# közben páratlan; az olvasó addig próbálkozik, amíg két egyező páros
+# értéket nem lát a másolás előtt és után (zár nélkül, folyamatok között).
+# A seqlock egy írót feltételez soronként: a supervisor csak a kiosztást
+# (symbol / shard / order) írja, a seq-et és az adat mezőket kizárólag a sort
+# tartó shard (holder). Felszabadított sort a supervisor csak akkor ad ki
+# újra, ha az előző shard már elengedte (holder -1) vagy halott.
+SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),
+    ("symbol", "S20"),                     # kiosztás (supervisor): kié a sor
+    ("shard", "<i4"),                      # hozzárendelt shard (-1: szabad sor)
+    ("order", "<i4"),                      # helye a watchlistben (read_all sorrend)
+    ("holder", "<i4"),                     # a sort író shard (-1: senki), csak a shard állítja
+    ("data_symbol", "S20"),                # az adat szimbóluma (shard, a seqlock alatt)
+    ("n", "<i4"),                          # érvényes history pontok
+    ("updated_ms", "<i8"),
+    ("price", "<f8"),
+    ("rsi", "<f8"),
+    ("ema9", "<f8"),
+    ("ema21", "<f8"),
+    ("signal", "S4"),
+    ("signal_rsi", "S4"),
+    ("h_open_times", "<i8", (HISTORY_POINTS,)),
+    ("h_prices", "<f8", (HISTORY_POINTS,)),
+    ("h_ema9", "<f8", (HISTORY_POINTS,)),
+    ("h_ema21", "<f8", (HISTORY_POINTS,)),
+    ("h_rsi", "<f8", (HISTORY_POINTS,)),
+], align=True)
+
+_HISTORY_FIELDS = (("open_times", "h_open_times"), ("prices", "h_prices"),
+                   ("ema9", "h_ema9"), ("ema21", "h_ema21"), ("rsi", "h_rsi"))
+
+
+class SignalTable:
+    """
+    Osztott memóriás jelzés tábla (multiprocessing.shared_memory).
+    A shardok a saját soraikat írják, a supervisor és a dashboard
+    pickle / IPC nélkül, közvetlenül a memóriából olvas.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        if self.header["magic"] != b"CBST" or self.header["version"] != TABLE_VERSION:
+            raise ValueError(f"{shm.name}: ismeretlen jelzés tábla formátum")
+        slots = int(self.header["slots"])
+        self.rows = np.ndarray((slots,), SLOT_DTYPE, buffer=shm.buf, offset=HEADER_DTYPE.itemsize)
+        self._f = {name: self.rows[name] for name in SLOT_DTYPE.names}
+
+    @classmethod
+    def create(cls, name: str = SHM_NAME, slots: int = MAX_SYMBOLS) -> "SignalTable":
+        try:
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()       # előző (összeomlott) futás maradéka
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name, create=True,
+                                         size=HEADER_DTYPE.itemsize + slots * SLOT_DTYPE.itemsize)
+        header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        header[()] = (b"CBST", TABLE_VERSION, slots, 0, HISTORY_POINTS, 0, np.zeros(MAX_SHARDS))
+        rows = np.ndarray((slots,), SLOT_DTYPE, buffer=shm.buf, offset=HEADER_DTYPE.itemsize)
+        rows["shard"] = -1
+        rows["holder"] = -1
+        del header, rows
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = SHM_NAME, untrack: bool = True) -> "SignalTable":
+        """
+        untrack: külön indított folyamatban (dashboard) kell, különben 3.13 előtt
+        a resource_tracker kilépéskor törölné a más által létrehozott szegmenst.
+        A shardok a supervisor trackerét használják, nekik nem szabad.
+        """
+        shm = shared_memory.SharedMemory(name)
+        if untrack:
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return cls(shm)
+
+    def close(self):
+        self._f = self.rows = self.header = None    # a nézetek nélkül zárható
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ---- supervisor ----
+
+    def assign(self, plan: dict):
+        """
+        Sorok kiosztása {symbol: shard} szerint (a plan sorrendje a watchlist
+        sorrend); visszaad: {symbol: sor}. A megmaradt szimbólumok sora (és
+        adata) marad, a levetteké felszabadul, az újak olyan szabad sort
+        kapnak, amit egy shard sem tart. Csak a kiosztás mezőket írja: a régi
+        adatot az olvasó a data_symbol alapján hagyja ki. A shardok a saját
+        sorait owned()-dal látják.
+        """
+        f = self._f
+        current = {f["symbol"][i].decode(): i for i in range(len(self.rows)) if f["symbol"][i]}
+        for sym, i in current.items():
+            if sym not in plan:
+                f["symbol"][i] = b""
+                f["shard"][i] = -1
+        free = [i for i in range(len(self.rows)) if not f["symbol"][i] and f["holder"][i] < 0]
+        if len(plan) - len(current.keys() & plan.keys()) > len(free):
+            raise ValueError(f"{len(plan)} szimbólum, {len(free)} szabad sor a {len(self.rows)} soros "
+                             f"táblában (MAX_SYMBOLS; a most felszabadultak a következő heartbeattől)")
+        slots = {}
+        for pos, (sym, k) in enumerate(plan.items()):
+            i = current.get(sym)
+            if i is None:
+                i = free.pop(0)
+                f["shard"][i] = k
+                f["order"][i] = pos
+                f["symbol"][i] = sym.encode()
+            else:
+                f["shard"][i] = k
+                f["order"][i] = pos
+            slots[sym] = i
+        self.header["count"] = max(slots.values(), default=-1) + 1
+        return slots
+
+    def owned(self, shard: int) -> dict:
+        """A shardhoz rendelt sorok: {symbol: sor}."""
+        f = self._f
+        return {f["symbol"][i].decode(): i for i in range(int(self.header["count"]))
+                if f["shard"][i] == shard and f["symbol"][i]}
+
+    def repair(self, shard: int):
+        """
+        Leállt shard sorai (csak halott shardra, a supervisorból): az író
+        közben félbemaradt sor (páratlan seq) érvénytelen, a sorokat elengedjük.
+        """
+        f = self._f
+        seq = f["seq"]
+        for slot in np.flatnonzero(f["holder"] == shard):
+            if seq[slot] & 1:
+                f["updated_ms"][slot] = 0
+                seq[slot] += 1
+            f["holder"][slot] = -1
+
+    # ---- shard: sorok átvétele / elengedése ----
+
+    def claim(self, slot: int, shard: int):
+        self._f["holder"][slot] = shard
+
+    def release(self, slot: int, shard: int):
+        """Az írás befejeztével: a supervisor újra kiadhatja a sort."""
+        if self._f["holder"][slot] == shard:
+            self._f["holder"][slot] = -1
+
+    def set_shards(self, n: int):
+        self.header["shards"] = n
+
+    def shards(self) -> int:
+        return int(self.header["shards"])
+
+    def heartbeat(self, shard: int):
+        self.header["heartbeat"][shard] = time.time()
+
+    def last_heartbeat(self, shard: int) -> float:
+        return float(self.header["heartbeat"][shard])
+
+    # ---- shard: írás ----
+
+    def write(self, slot: int, signal: dict):
+        """Csak a sort tartó (claim) shard hívja: egyetlen író soronként."""
+        f = self._f
+        sym = signal["symbol"].encode()
+        if f["symbol"][slot] != sym:
+            return             # levették a watchlistről (a következő resync elengedi)
+        f["seq"][slot] += 1
+        try:
+            f["data_symbol"][slot] = sym
+            f["price"][slot] = signal["price"]
+            f["rsi"][slot] = signal["rsi"]
+            f["ema9"][slot] = signal["ema9"]
+            f["ema21"][slot] = signal["ema21"]
+            f["signal"][slot] = signal["signal"].encode()
+            f["signal_rsi"][slot] = signal["signal_rsi"].encode()
+            h = signal.get("history")
+            n = 0
+            if h:
+                n = min(len(h["open_times"]), HISTORY_POINTS)
+                for key, field in _HISTORY_FIELDS:
+                    f[field][slot, :n] = h[key][-n:] if n else []
+            f["n"][slot] = n
+            f["updated_ms"][slot] = int(time.time() * 1000)
+        finally:
+            f["seq"][slot] += 1
+
+    # ---- olvasás ----
+
+    def read(self, slot: int, history: bool = True):
+        """Egy sor konzisztens másolata (get_signal formában), vagy None, ha még nincs jelzés."""
+        f = self._f
+        seq = f["seq"]
+        for _ in range(READ_RETRIES):
+            s1 = int(seq[slot])
+            if s1 & 1:
+                time.sleep(0)
+                continue
+            sym = f["data_symbol"][slot]
+            if f["updated_ms"][slot] == 0 or sym != f["symbol"][slot]:
+                return None        # még nincs jelzés (vagy a sor előző szimbólumáé)
+            out = {
+                "symbol": sym.decode(),
+                "price": float(f["price"][slot]),
+                "rsi": float(f["rsi"][slot]),
+                "ema9": float(f["ema9"][slot]),
+                "ema21": float(f["ema21"][slot]),
+                "signal": f["signal"][slot].decode(),
+                "signal_rsi": f["signal_rsi"][slot].decode(),
+            }
+            if history:
+                n = int(f["n"][slot])
+                h = {key: f[field][slot, :n].copy() for key, field in _HISTORY_FIELDS}
+            updated = int(f["updated_ms"][slot])
+            if int(seq[slot]) == s1:
+                break
+        else:
+            return None      # író közben halt meg: a supervisor repair()-rel javítja
+        if history:
+            h["times"] = time_labels(h["open_times"])
+            out["history"] = {k: h[k] for k in ("open_times", "times", "prices", "ema9", "ema21", "rsi")}
+        out["updated_ms"] = updated
+        return out
+
+    def read_all(self, history: bool = True):
+        """Az összes kész jelzés watchlist sorrendben (mint a get_all_signals)."""
+        count = int(self.header["count"])
+        f = self._f
+        # az újrahasznosított sorok miatt a sor index nem a watchlist sorrend
+        slots = sorted((i for i in range(count) if f["symbol"][i]), key=lambda i: int(f["order"][i]))
+        out = []
+        for slot in slots:
+            s = self.read(slot, history)
+            if s is not None:
+                out.append(s)
+        return out
+
+
+# ---- shard folyamat ----
+
+def _shard_main(shard: int, name: str,
+                interval: str, limit: int, timeframes, mode: str, checkpoint: bool = True):
+    """
+    Egy worker folyamat: a táblában hozzá rendelt szimbólumok jelzései a
+    saját soraiba. A kiosztást HEARTBEAT_SECONDS-enként újraolvassa, így
+    watchlist változáskor csak az érintett streamek / cache-ek változnak.
+    checkpoint: saját állapot fájl (újraindításkor csak a rést kéri le).
+    A Binance weight keret IP-nként közös: a futó shardok (tábla fejléc)
+    között egyenlően osztjuk, új shard indulásakor a többiek is újraosztanak.
+    """
+    import trading_bot as tb
+    from checkpoint import Checkpointer, restore, shard_path
+    from candle_cache import drop_cache
+    from indicators import drop_state
+    from kline_stream import KlineStream
+    from timeframes import BASE_INTERVAL, BASE_LIMIT, drop_bars
+
+    table = SignalTable.attach(name, untrack=False)
+    slots = table.owned(shard)
+    for slot in slots.values():
+        table.claim(slot, shard)
+    write_lock = threading.Lock()      # stream módban a jelzés szál ír, a fő szál resync-el
+    total_budget = tb.weight_limiter.budget
+
+    def rebalance():
+        tb.weight_limiter.budget = max(total_budget // max(table.shards(), 1), 10)
+
+    rebalance()
+    table.heartbeat(shard)
+    if checkpoint:
+        restore(shard_path(shard), slots)
+        Checkpointer(shard_path(shard)).start()
+
+    def resync() -> bool:
+        rebalance()
+        now = table.owned(shard)
+        if now == slots:
+            return False
+        with write_lock:
+            for slot in now.values():
+                table.claim(slot, shard)
+            for sym, slot in slots.items():
+                if now.get(sym) != slot:
+                    table.release(slot, shard)     # innen már nem írunk bele
+            lost = slots.keys() - now.keys()
+            slots.clear()
+            slots.update(now)
+        for sym in lost:
+            drop_cache(sym)
+            drop_state(sym)
+            drop_bars(sym)
+        return True
+
+    if mode == "stream":
+        def on_update(sym, closed):
+            slot = slots.get(sym)
+            if slot is None:
+                return
+            try:
+                s = tb._compute_signal(sym, interval, limit, timeframes, refresh=False)
+            except Exception as e:
+                print(f"Hiba {sym} jelzésénél (shard {shard}):", e)
+                return
+            with write_lock:
+                slot = slots.get(sym)
+                if slot is not None:
+                    table.write(slot, s)
+
+        stream = None
+        while True:
+            changed = resync()
+            if stream is None and slots:
+                if timeframes:
+                    stream = KlineStream(list(slots), BASE_INTERVAL, BASE_LIMIT, tb._rest_client(), on_update,
+                                         transport_factory=tb._transport_factory())
+                else:
+                    stream = KlineStream(list(slots), interval, limit, tb._rest_client(), on_update,
+                                         transport_factory=tb._transport_factory())
+                stream.start()
+            elif changed and stream is not None:
+                stream.set_symbols(list(slots))
+            table.heartbeat(shard)
+            time.sleep(HEARTBEAT_SECONDS)
+    else:
+        while True:
+            t0 = time.monotonic()
+            resync()
+            for s in tb.get_all_signals(interval=interval, limit=limit, timeframes=timeframes,
+                                        symbols=list(slots), log=False):
+                slot = slots.get(s["symbol"])
+                if slot is not None:
+                    table.write(slot, s)
+            table.heartbeat(shard)
+            time.sleep(max(tb.POLL_SECONDS - (time.monotonic() - t0), 0))
+
+
+class ShardSupervisor:
+    """
+    A szimbólumokat legfeljebb `shards` worker folyamatra osztja (round-robin,
+    új szimbólum a legkevésbé terhelt / új shardra), a jelzéseket a
+    SignalTable-be gyűjti, és újraindítja a kilépett vagy HEARTBEAT_TIMEOUT
+    óta hallgató shardokat (exponenciális várakozással).
+    """
+
+    def __init__(self, symbols, shards: int = SHARDS, interval: str = "5m", limit: int = 288,
+                 timeframes=None, mode: str = "stream", name: str = SHM_NAME, checkpoint: bool = True):
+        self.symbols = list(symbols)
+        self.max_shards = max(1, min(shards, MAX_SHARDS))
+        self.n = max(1, min(self.max_shards, len(self.symbols)))
+        self.interval = interval
+        self.limit = limit
+        self.timeframes = list(timeframes) if timeframes else None
+        self.mode = mode
+        self.name = name
+        self.checkpoint = checkpoint
+        self.table = None
+        self.plan = {sym: i % self.n for i, sym in enumerate(self.symbols)}   # symbol -> shard
+        self._ctx = mp.get_context("spawn")     # a szülő szálait (executor, stream) nem örökli
+        self._procs = {}
+        self._started = {}
+        self._failures = {}
+        self._next_start = {}
+
+    def _spawn(self, k: int):
+        self.table.repair(k)     # a régi folyamat már nem fut: a sorait elengedjük
+        p = self._ctx.Process(
+            target=_shard_main, name=f"shard-{k}", daemon=True,
+            args=(k, self.name, self.interval, self.limit, self.timeframes, self.mode,
+                  self.checkpoint),
+        )
+        p.start()
+        self.table.heartbeat(k)
+        self._procs[k] = p
+        self._started[k] = time.monotonic()
+
+    def start(self):
+        self.table = SignalTable.create(self.name, max(MAX_SYMBOLS, len(self.symbols)))
+        self.table.assign(self.plan)
+        self.table.set_shards(self.active())
+        for k in range(self.n):
+            self._spawn(k)
+        return self
+
+    def active(self) -> int:
+        """Szimbólumot kezelő shardok száma (az üresen futók nem fogyasztanak weight-et)."""
+        return max(len(set(self.plan.values())), 1)
+
+    def set_symbols(self, symbols):
+        """
+        Watchlist változás: a levett szimbólumok sora felszabadul, az újak a
+        legkevésbé terhelt shardra (vagy, amíg van szabad mag, új shardra)
+        kerülnek. A futó shardok a következő heartbeatnél átveszik.
+        A shardok száma nem csökken: a megmaradt szimbólumokat nem mozgatjuk
+        (cache / stream / checkpoint újraépítés nélkül), a kiürült shard
+        üresen fut tovább, és az új szimbólumok elsőként oda kerülnek. A weight
+        keretet csak a szimbólumot kezelő shardok között osztjuk el.
+        """
+        symbols = list(symbols)
+        kept = {sym: k for sym, k in self.plan.items() if sym in symbols}
+        load = {k: 0 for k in range(self.n)}
+        for k in kept.values():
+            load[k] += 1
+        plan = {}              # watchlist sorrendben (read_all ezt adja vissza)
+        for sym in symbols:
+            k = kept.get(sym)
+            if k is None:
+                if self.n < self.max_shards and min(load.values()) > 0:
+                    k = self.n
+                    self.n += 1
+                    load[k] = 0
+                else:
+                    k = min(load, key=load.get)
+                load[k] += 1
+            plan[sym] = k
+        self.symbols = symbols
+        self.plan = plan
+        self.table.assign(plan)
+        self.table.set_shards(self.active())   # a futó shardok a következő heartbeatnél újraosztják a keretet
+        for k in range(self.n):
+            if k not in self._procs:
+                self._spawn(k)
+
+    def check(self):
+        """Kilépett / beragadt shardok újraindítása."""
+        now = time.monotonic()
+        for k in range(self.n):
+            p = self._procs.get(k)
+            if p is not None and p.is_alive():
+                if time.time() - self.table.last_heartbeat(k) <= HEARTBEAT_TIMEOUT:
+                    continue
+                print(f"Hiba: shard {k} {HEARTBEAT_TIMEOUT} mp óta nem jelzett, újraindítás")
+                p.kill()
+                p.join(timeout=5)
+            if p is not None:
+                ran = now - self._started[k]
+                self._failures[k] = 0 if ran >= STABLE_SECONDS else self._failures.get(k, 0) + 1
+                delay = min(RESTART_DELAY * 2 ** max(self._failures[k] - 1, 0), MAX_RESTART_DELAY)
+                print(f"Hiba: shard {k} leállt (exitcode {p.exitcode}), újraindítás {delay:.1f} mp múlva")
+                self._procs[k] = None
+                self._next_start[k] = now + delay
+            if now >= self._next_start.get(k, 0):
+                metrics.inc("cryptobot_shard_restarts_total", shard=k)
+                self._spawn(k)
+
+    def alive(self) -> int:
+        return sum(1 for p in self._procs.values() if p is not None and p.is_alive())
+
+    def stop(self):
+        for p in self._procs.values():
+            if p is not None and p.is_alive():
+                p.terminate()
+        for p in self._procs.values():
+            if p is not None:
+                p.join(timeout=5)
+        if self.table is not None:
+            self.table.close()
+            self.table = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Osztott memóriás jelzés tábla tartalma.")
+    parser.add_argument("--name", default=SHM_NAME)
+    args = parser.parse_args()
+
+    try:
+        t = SignalTable.attach(args.name)
+    except FileNotFoundError:
+        raise SystemExit(f"Nincs '{args.name}' tábla (fut a bot --shards módban?)")
+    now = time.time() * 1000
+    for slot in range(int(t.header["count"])):
+        sym = t.rows["symbol"][slot].decode()
+        if not sym:
+            continue
+        s = t.read(slot, history=False)
+        if s is None:
+            print(f"{sym:<10} -")
+            continue
+        print(f"{sym:<10} shard {int(t.rows['shard'][slot]):>2}  {s['price']:>12.4f}  RSI {s['rsi']:6.2f}  "
+              f"{s['signal']:<4}  {(now - s['updated_ms']) / 1000:5.1f} mp")
+    t.close()
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+import atexit
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+import metrics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:     # opcionális: nélküle marad a CSV log
+    pa = None
+    pq = None
+
+try:
+    import fcntl
+except ImportError:     # Windows: nincs folyamatok közti zár, egy író folyamat legyen
+    fcntl = None
+
+BASE_DIR = Path(__file__).parent
+CSV_PATH = BASE_DIR / "signals_log.csv"
+PARQUET_DIR = BASE_DIR / "signals_log"
+
+LOG_BACKEND = "csv"            # "csv" | "parquet" | "auto" (parquet, ha van pyarrow); parquet-re
+                               # váltás előtt: python signal_log.py import-csv (különben a régi log kimarad)
+FLUSH_ROWS = 500               # parquet: ennyi sor után írunk part fájlt ...
+FLUSH_SECONDS = 30             # ... vagy ennyi idő után (sync() is ennyi időnként: part fájl / szimbólum)
+
+LOG_ASYNC = True               # háttérszálas író: a jelzés út csak sorba tesz, lemezt nem vár
+QUEUE_ROWS = 20000             # ennyi sor várhat az íróra, felette a legújabbak eldobódnak
+SYNC_ROWS = 1000               # fsync ennyi sor után ...
+SYNC_SECONDS = 5               # ... vagy ennyi idő után
+ROTATE_BYTES = 50 * 1024 * 1024  # CSV forgatás méret szerint (0 = nincs) ...
+ROTATE_DAILY = True            # ... és napváltáskor (UTC)
+RETENTION_DAYS = 30            # forgatott CSV-k / parquet napok megőrzése (0 = örökre)
+
+MERGED_KEY = b"cryptobot_merged"   # data.parquet metaadat: a beolvasztott part fájlok nevei
+COLUMNS = ["timestamp", "symbol", "price", "rsi", "ema9", "ema21", "signal_rsi", "signal_combined"]
+FLOAT_COLUMNS = ["price", "rsi", "ema9", "ema21"]
+
+metrics.describe("cryptobot_log_dropped_total", "Teli író sor miatt eldobott log sorok")
+metrics.describe("cryptobot_log_rows_total", "Lemezre írt log sorok")
+
+
+def signal_rows(results, now: datetime = None):
+    """get_signal eredmények -> log sorok (dict)"""
+    now = now or datetime.utcnow()
+    return [
+        {
+            "timestamp": now,
+            "symbol": r["symbol"],
+            "price": r["price"],
+            "rsi": r["rsi"],
+            "ema9": r["ema9"],
+            "ema21": r["ema21"],
+            "signal_rsi": r["signal_rsi"],
+            "signal_combined": r["signal"],
+        }
+        for r in results
+    ]
+
+
+def _fsync_path(path: Path, directory: bool = False):
+    """Fájl / könyvtár bejegyzés lemezre (könyvtár: az új fájlnevek is megmaradjanak)."""
+    try:
+        fd = os.open(path, os.O_RDONLY | (getattr(os, "O_DIRECTORY", 0) if directory else 0))
+    except OSError:
+        return      # közben tömörítve / törölve, vagy a rendszer nem enged könyvtárat nyitni
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _filter(df: pd.DataFrame, symbols=None, start=None, end=None) -> pd.DataFrame:
+    if symbols is not None:
+        df = df[df["symbol"].isin(list(symbols))]
+    if start is not None:
+        df = df[df["timestamp"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["timestamp"] < pd.Timestamp(end)]
+    return df
+
+
+class CsvLogBackend:
+    """
+    A régi signals_log.csv formátum (kompatibilitás / export).
+
+    A fájl nyitva marad, egy append egy írás; lemezre (fsync) csak sync()-kor.
+    Több író folyamat esetén (pl. két bot) a <név>.lock zár alatt írunk és
+    forgatunk; a más által elforgatott fájlt írás előtt észrevesszük és újranyitjuk.
+    Forgatás méret (ROTATE_BYTES) és nap (ROTATE_DAILY) szerint:
+    signals_log.<YYYYmmdd-HHMMSS>.csv (a forgatás ideje), RETENTION_DAYS-nél
+    régebbieket töröljük. read() a forgatott fájlokat is olvassa.
+    """
+
+    name = "csv"
+
+    def __init__(self, path: Path = CSV_PATH, rotate_bytes: int = ROTATE_BYTES,
+                 rotate_daily: bool = ROTATE_DAILY, retention_days: float = RETENTION_DAYS):
+        self.path = Path(path)
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+        self.retention_days = retention_days
+        self._f = None
+        self._day = None            # az aktuális fájl első sorának napja
+        self._lock = threading.Lock()
+        self._lock_file = None      # <név>.lock: több folyamat írása / forgatása egymás után
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        if self._lock_file is None:
+            self._lock_file = open(self.path.with_name(self.path.name + ".lock"), "a")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _first_day(self):
+        """Az első adatsor napja (a forgatás alapja), ha nem olvasható: az mtime napja."""
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                f.readline()
+                return datetime.fromisoformat(f.readline()[:10]).date()
+        except (OSError, ValueError):
+            return datetime.utcfromtimestamp(self.path.stat().st_mtime).date()
+
+    def _open(self):
+        self._f = self.path.open("a", encoding="utf-8")
+        if self._f.tell():
+            self._day = self._first_day()
+        else:
+            self._f.write(",".join(COLUMNS) + "\n")
+            self._f.flush()
+            self._day = None
+
+    def _current(self) -> bool:
+        """A nyitott fájl még a self.path-on van? (más folyamat forgathatta el)"""
+        try:
+            return os.fstat(self._f.fileno()).st_ino == os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return False
+
+    def _close(self):
+        if self._f is not None:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._f.close()
+            self._f = None
+
+    def rotated(self):
+        """Forgatott fájlok, időrendben."""
+        return sorted(self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"))
+
+    def _rotate(self):
+        self._close()
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        target = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        n = 1
+        while target.exists():
+            target = self.path.with_name(f"{self.path.stem}.{stamp}-{n}{self.path.suffix}")
+            n += 1
+        os.replace(self.path, target)
+        self._expire()
+
+    def _expire(self):
+        if not self.retention_days:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        for f in self.rotated():
+            try:
+                if f.stat().st_mtime < cutoff:
+                    f.unlink()
+            except OSError as e:
+                print("Hiba a régi log törlésénél:", e)
+
+    def _format(self, rows) -> str:
+        return "".join(
+            f"{r['timestamp'].isoformat()},{r['symbol']},{r['price']},"
+            f"{r['rsi']},{r['ema9']},{r['ema21']},"
+            f"{r['signal_rsi']},{r['signal_combined']}\n"
+            for r in rows
+        )
+
+    def append(self, rows):
+        # napváltáson átnyúló köteg: naponként külön darab (a forgatás a határon történik)
+        chunks = []
+        for r in rows:
+            day = r["timestamp"].date()
+            if chunks and chunks[-1][0] == day:
+                chunks[-1][1].append(r)
+            else:
+                chunks.append((day, [r]))
+        # a zár alatt: ha más folyamat közben forgatott, az új fájlt nyitjuk, és
+        # minden darab kiíródik a zár elengedése előtt (nem keverednek a sorok)
+        with self._lock, self._file_lock():
+            for day, part in chunks:
+                if self._f is not None and not self._current():
+                    self._close()
+                if self._f is None:
+                    self._open()
+                if self._day is not None and (
+                        (self.rotate_daily and day != self._day)
+                        or (self.rotate_bytes and os.fstat(self._f.fileno()).st_size >= self.rotate_bytes)):
+                    self._rotate()
+                    self._open()
+                if self._day is None:
+                    self._day = day
+                self._f.write(self._format(part))
+                self._f.flush()
+
+    def sync(self):
+        """Pufferek lemezre (fsync)."""
+        with self._lock:
+            if self._f is not None:
+                self._f.flush()
+                os.fsync(self._f.fileno())
+
+    def flush(self):
+        self.sync()
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _read_one(self, path: Path) -> pd.DataFrame:
+        # Vegyes / hibás sorok átugrása
+        try:
+            return pd.read_csv(path, on_bad_lines="skip")
+        except TypeError:
+            return pd.read_csv(path, error_bad_lines=False, warn_bad_lines=True)
+
+    def read(self, symbols=None, start=None, end=None) -> pd.DataFrame:
+        with self._lock:
+            if self._f is not None:
+                self._f.flush()
+        files = []
+        for f in self.rotated():
+            # a név a forgatás ideje: ami előtte forgott, abban csak korábbi sor van
+            try:
+                rotated_at = datetime.strptime(f.stem.split(".")[-1][:15], "%Y%m%d-%H%M%S")
+            except ValueError:
+                rotated_at = None
+            if start is not None and rotated_at is not None and rotated_at < pd.Timestamp(start):
+                continue
+            files.append(f)
+        if self.path.exists():
+            files.append(self.path)
+        if not files:
+            return pd.DataFrame(columns=COLUMNS)
+        df = pd.concat([self._read_one(f) for f in files], ignore_index=True)
+        if "timestamp" in df.columns:
+            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+        if "symbol" not in df.columns:
+            return df
+        return _filter(df, symbols, start, end)
+
+
+class ParquetLogBackend:
+    """
+    Típusos, particionált oszlopos log:
+        signals_log/date=YYYY-MM-DD/symbol=BTCUSDC/part-<ns>.parquet
+    Az írás pufferelt (FLUSH_ROWS / FLUSH_SECONDS), a lezárt napok
+    partícióit egy fájlba tömörítjük (compact). Olvasáskor csak a kért
+    szimbólumok / napok könyvtárait nyitjuk meg.
+    """
+
+    name = "parquet"
+
+    def __init__(self, root: Path = PARQUET_DIR,
+                 flush_rows: int = FLUSH_ROWS, flush_seconds: float = FLUSH_SECONDS,
+                 retention_days: float = RETENTION_DAYS):
+        if pq is None:
+            raise RuntimeError("A parquet loghoz pyarrow kell (pip install pyarrow)")
+        self.root = Path(root)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.retention_days = retention_days
+        self.schema = pa.schema([
+            ("timestamp", pa.timestamp("ms")),
+            ("symbol", pa.string()),
+            ("price", pa.float64()),
+            ("rsi", pa.float64()),
+            ("ema9", pa.float64()),
+            ("ema21", pa.float64()),
+            ("signal_rsi", pa.string()),
+            ("signal_combined", pa.string()),
+        ])
+        self._buffer = []
+        self._unsynced = set()     # kiírt, de még nem fsync-elt part fájlok
+        self._last_flush = time.monotonic()
+        self._last_day = None
+        self._lock = threading.Lock()
+
+    @property
+    def sync_seconds(self) -> float:
+        # minden sync() szimbólumonként új part fájl: az író ritkábban hívja, mint a CSV-nél
+        return self.flush_seconds
+
+    # ---- írás ----
+
+    def append(self, rows):
+        with self._lock:
+            self._buffer.extend(rows)
+            if (len(self._buffer) >= self.flush_rows
+                    or time.monotonic() - self._last_flush >= self.flush_seconds):
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def sync(self):
+        """A puffer kiírása, majd a kiírt part fájlok és könyvtáraik fsync-je."""
+        with self._lock:
+            self._flush_locked()
+            files, self._unsynced = self._unsynced, set()
+        for path in sorted(files):
+            _fsync_path(path)
+        for d in sorted({f.parent for f in files} | {f.parent.parent for f in files}):
+            _fsync_path(d, directory=True)
+
+    def close(self):
+        self.flush()
+
+    def _partition_dir(self, day: str, symbol: str) -> Path:
+        return self.root / f"date={day}" / f"symbol={symbol}"
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        df = pd.DataFrame(self._buffer, columns=COLUMNS)
+        self._buffer = []
+        # a séma ms pontosságú, a utcnow() mikroszekundumait levágjuk
+        df["timestamp"] = pd.to_datetime(df["timestamp"]).dt.floor("ms")
+        days = df["timestamp"].dt.strftime("%Y-%m-%d")
+        for (day, symbol), part in df.groupby([days, df["symbol"]], sort=False):
+            d = self._partition_dir(day, symbol)
+            d.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(part, schema=self.schema, preserve_index=False)
+            path = d / f"part-{time.time_ns()}.parquet"
+            pq.write_table(table, path)
+            self._unsynced.add(path)
+
+        # napváltáskor az előző napokat egy fájlba tömörítjük
+        today = days.iloc[-1]
+        if self._last_day is not None and today != self._last_day:
+            self.compact(before=today)
+            self.expire(today)
+        self._last_day = today
+
+    def expire(self, today: str = None):
+        """RETENTION_DAYS-nél régebbi nap partíciók törlése."""
+        if not self.retention_days or not self.root.exists():
+            return
+        today = today or datetime.utcnow().strftime("%Y-%m-%d")
+        cutoff = (pd.Timestamp(today) - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for day_dir in self.root.glob("date=*"):
+            if day_dir.name.split("=", 1)[1] < cutoff:
+                shutil.rmtree(day_dir, ignore_errors=True)
+
+    @staticmethod
+    def _merged(d: Path) -> set:
+        """A data.parquet-be már beolvasztott part fájlok nevei (a fájl metaadatából)."""
+        data = d / "data.parquet"
+        if not data.exists():
+            return set()
+        meta = pq.read_schema(data).metadata or {}
+        return set(json.loads(meta.get(MERGED_KEY, b"[]")))
+
+    def _files(self, d: Path):
+        """Egy partíció olvasandó fájljai: egy félbeszakadt tömörítés után a már
+        beolvasztott, de még nem törölt part fájlok kimaradnak."""
+        merged = self._merged(d)
+        return [f for f in sorted(d.glob("*.parquet")) if f.name not in merged]
+
+    def compact(self, before: str = None):
+        """Partíciónként a part fájlok összefűzése egy data.parquet-be (before: 'YYYY-MM-DD', kizárólagos)."""
+        for d in self._partitions():
+            day = d.parent.name.split("=", 1)[1]
+            if before is not None and day >= before:
+                continue
+            for name in self._merged(d):
+                (d / name).unlink(missing_ok=True)     # egy félbeszakadt tömörítés maradéka
+            files = self._files(d)
+            if len(files) <= 1:
+                continue
+            # csak összefűzés, deduplikálás nincs (két azonos sor is valódi lehet)
+            table = pa.concat_tables([pq.read_table(f, schema=self.schema) for f in files])
+            df = table.to_pandas().sort_values("timestamp", kind="stable")
+            parts = [f.name for f in files if f.name != "data.parquet"]
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            table = table.replace_schema_metadata({MERGED_KEY: json.dumps(parts)})
+            # egyedi tmp (több folyamat is tömöríthet), atomikus csere a data.parquet-re,
+            # csak utána töröljük a beolvasott part fájlokat (addig az olvasás és a
+            # következő tömörítés a metaadat alapján kihagyja őket)
+            tmp = d / f"data.parquet.{os.getpid()}.{time.time_ns()}.tmp"
+            pq.write_table(table, tmp)
+            _fsync_path(tmp)
+            os.replace(tmp, d / "data.parquet")
+            _fsync_path(d, directory=True)
+            for name in parts:
+                (d / name).unlink(missing_ok=True)
+
+    # ---- olvasás ----
+
+    def _partitions(self, symbols=None, start=None, end=None):
+        if not self.root.exists():
+            return []
+        start_day = pd.Timestamp(start).strftime("%Y-%m-%d") if start is not None else None
+        end_day = pd.Timestamp(end).strftime("%Y-%m-%d") if end is not None else None
+        wanted = set(symbols) if symbols is not None else None
+        out = []
+        for day_dir in sorted(self.root.glob("date=*")):
+            day = day_dir.name.split("=", 1)[1]
+            if start_day is not None and day < start_day:
+                continue
+            if end_day is not None and day > end_day:
+                continue
+            for sym_dir in sorted(day_dir.glob("symbol=*")):
+                if wanted is not None and sym_dir.name.split("=", 1)[1] not in wanted:
+                    continue
+                out.append(sym_dir)
+        return out
+
+    def read(self, symbols=None, start=None, end=None, columns=None) -> pd.DataFrame:
+        if columns is not None:
+            # a szűréshez ezek mindig kellenek
+            columns = list(dict.fromkeys(["timestamp", "symbol", *columns]))
+        files = [f for d in self._partitions(symbols, start, end) for f in self._files(d)]
+        with self._lock:
+            pending = [r for r in self._buffer if symbols is None or r["symbol"] in symbols]
+        if not files and not pending:
+            return pd.DataFrame(columns=columns or COLUMNS)
+        tables = [pq.read_table(f, schema=self.schema, columns=columns) for f in files]
+        df = pa.concat_tables(tables).to_pandas() if tables else pd.DataFrame(columns=columns or COLUMNS)
+        if pending:
+            extra = pd.DataFrame(pending, columns=COLUMNS)
+            extra["timestamp"] = pd.to_datetime(extra["timestamp"])
+            df = pd.concat([df, extra[df.columns]], ignore_index=True)
+        return _filter(df, symbols, start, end)
+
+    def export_csv(self, path: Path, symbols=None, start=None, end=None):
+        df = self.read(symbols, start, end).sort_values("timestamp")
+        df.to_csv(path, index=False, columns=COLUMNS)
+        return len(df)
+
+    def import_csv(self, path: Path = CSV_PATH):
+        """A régi CSV log betöltése a parquet store-ba (egyszeri migráció)."""
+        df = CsvLogBackend(path).read()
+        df = df.dropna(subset=["timestamp", "symbol"])
+        for col in FLOAT_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        rows = df.reindex(columns=COLUMNS).to_dict("records")
+        with self._lock:
+            self._buffer.extend(rows)
+            self._flush_locked()
+        self.compact()
+        return len(rows)
+
+
+class AsyncLogWriter:
+    """
+    Háttérszálas író egy backend elé. append() csak egy korlátos sorba tesz
+    (lock alatt egy deque bővítés), így a jelzés számolást / dashboardot
+    lassú vagy akadozó lemez nem fogja meg. Teli sornál a beérkező sorok
+    eldobódnak (dropped, cryptobot_log_dropped_total). Az író kötegenként ír,
+    fsync SYNC_ROWS sor vagy SYNC_SECONDS után (parquet: FLUSH_SECONDS, mert minden
+    sync szimbólumonként új part fájlt jelent).
+    Olvasás / export a backendre megy (a még sorban lévő sorok nélkül).
+    """
+
+    def __init__(self, backend, max_rows: int = QUEUE_ROWS,
+                 sync_rows: int = SYNC_ROWS, sync_seconds: float = None):
+        self.backend = backend
+        self.max_rows = max_rows
+        self.sync_rows = sync_rows
+        # a backend saját ritmusa (parquet: FLUSH_SECONDS), különben SYNC_SECONDS
+        self.sync_seconds = sync_seconds or getattr(backend, "sync_seconds", SYNC_SECONDS)
+        self.dropped = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="signal-log", daemon=True)
+        self._thread.start()
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def append(self, rows):
+        with self._cond:
+            room = self.max_rows - len(self._queue)
+            if room < len(rows):
+                lost = len(rows) - max(room, 0)
+                self.dropped += lost
+                metrics.inc("cryptobot_log_dropped_total", lost)
+                rows = rows[:max(room, 0)]
+            if rows:
+                self._queue.extend(rows)
+                self._cond.notify()
+
+    def _run(self):
+        unsynced = 0
+        last_sync = time.monotonic()
+        while True:
+            with self._cond:
+                if not self._queue and not self._stop:
+                    self._cond.wait(self.sync_seconds)
+                batch = list(self._queue)
+                self._queue.clear()
+                self._busy = bool(batch)
+                stop = self._stop
+            try:
+                if batch:
+                    with metrics.timer("cryptobot_stage_seconds", stage="log_write", symbol="all"):
+                        self.backend.append(batch)
+                    metrics.inc("cryptobot_log_rows_total", len(batch))
+                    unsynced += len(batch)
+                if unsynced and (stop or unsynced >= self.sync_rows
+                                 or time.monotonic() - last_sync >= self.sync_seconds):
+                    self.backend.sync()
+                    unsynced = 0
+                    last_sync = time.monotonic()
+            except Exception as e:
+                print("Logolási hiba (háttér író):", e)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+                if stop and not self._queue:
+                    return
+
+    def flush(self, timeout: float = 10.0):
+        """Megvárja, amíg a sor kiürül (legfeljebb timeout mp), aztán a backend flush."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify()
+            while (self._queue or self._busy) and time.monotonic() < deadline:
+                self._cond.wait(0.05)
+        self.backend.flush()
+
+    def close(self, timeout: float = 10.0):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self.backend.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _make_backend(kind: str):
+    if kind == "auto":
+        kind = "parquet" if pq is not None else "csv"
+    if kind != "parquet":
+        return CsvLogBackend()
+    store = ParquetLogBackend()
+    if not store._partitions() and CSV_PATH.exists():
+        print(f"Figyelem: a parquet log ({PARQUET_DIR}) üres, a korábbi {CSV_PATH.name} nincs benne "
+              f"(betöltés: python signal_log.py import-csv)")
+    return store
+
+
+def get_log_backend(kind: str = None):
+    """
+    A közös log backend (első hívásra jön létre, LOG_ASYNC esetén háttérszálas
+    íróval, kilépéskor kiürítve / flush).
+    Ha más `kind`-ot kérnek, mint a közös, külön példányt adunk (pl. backtest --log-backend).
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _make_backend(LOG_BACKEND)
+            if LOG_ASYNC:
+                _backend = AsyncLogWriter(_backend)
+                metrics.gauge("cryptobot_log_queue_rows", _backend.pending, "Író sorban váró log sorok")
+                atexit.register(_backend.close)
+            else:
+                atexit.register(_backend.flush)
+        backend = _backend
+    if kind is None or kind == backend.name or (kind == "auto" and LOG_BACKEND == "auto"):
+        return backend
+    return _make_backend(kind)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Jelzés log karbantartás (parquet store).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("compact", help="Lezárt napok partícióinak tömörítése")
+    p_exp = sub.add_parser("export-csv", help="Parquet log exportálása CSV-be")
+    p_exp.add_argument("path", type=Path)
+    p_exp.add_argument("--symbol", action="append", help="Csak ezek a szimbólumok (többször megadható)")
+    p_exp.add_argument("--start", help="Kezdő dátum (pl. 2024-01-01)")
+    p_exp.add_argument("--end", help="Záró dátum (kizárólagos)")
+    p_imp = sub.add_parser("import-csv", help="Régi signals_log.csv betöltése a parquet store-ba")
+    p_imp.add_argument("path", type=Path, nargs="?", default=CSV_PATH)
+
+    args = parser.parse_args()
+    store = ParquetLogBackend()
+    if args.cmd == "compact":
+        store.compact(before=datetime.utcnow().strftime("%Y-%m-%d"))
+    elif args.cmd == "export-csv":
+        n = store.export_csv(args.path, args.symbol, args.start, args.end)
+        print(f"{n} sor exportálva: {args.path}")
+    elif args.cmd == "import-csv":
+        n = store.import_csv(args.path)
+        print(f"{n} sor betöltve a {PARQUET_DIR} store-ba")
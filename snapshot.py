@@ -0,0 +1,130 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+from serialize import dumps
+
+REFRESH_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Egy frissítési kör eredménye, publikálás után nem módosul.
+    body: a kész JSON (bytes), etag: a jelzések tartalmából számolt hash
+    (a generated_at nincs benne: változatlan jelzéseknél csak az idő frissül,
+    a version és az etag marad, ezért HTTP-n gyenge validátorként, W/"..."
+    formában adjuk ki).
+    """
+    version: int
+    generated_at: str
+    signals: tuple
+    body: bytes
+    etag: str
+    summary_body: bytes = b""    # ugyanez history nélkül (táblázathoz)
+    summary_etag: str = ""
+    payload: bytes = b""         # a body / summary_body generated_at nélkül (újracsomagoláshoz)
+    summary_payload: bytes = b""
+
+    def find(self, symbol: str):
+        for s in self.signals:
+            if s.get("symbol") == symbol:
+                return s
+        return None
+
+
+def summarize(signal: dict) -> dict:
+    """Egy jelzés history nélkül."""
+    return {k: v for k, v in signal.items() if k != "history"}
+
+
+def _wrap(generated_at: str, key: str, payload: bytes) -> bytes:
+    head = '{"generated_at":%s,"%s":' % (json.dumps(generated_at), key)
+    return head.encode("utf-8") + payload + b"}"
+
+
+class SnapshotRefresher:
+    """
+    Egyetlen háttérszál, ami `interval` mp-enként lefuttatja a compute()-ot
+    (pl. get_all_signals) és az eredményt immutable Snapshot-ként publikálja.
+    A HTTP handlerek csak a legutolsó snapshotot olvassák, tőzsdét nem hívnak.
+    """
+
+    def __init__(self, compute, interval: float = REFRESH_SECONDS):
+        self.compute = compute
+        self.interval = interval
+        self._snapshot = None
+        self._version = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._cond = threading.Condition()
+
+    def current(self):
+        return self._snapshot
+
+    def wait_for_update(self, version: int, timeout: float):
+        """
+        Blokkol, amíg `version`-nél újabb snapshot nem lesz (vagy lejár a timeout).
+        Visszaadja a legutolsó snapshotot (ami lehet a régi is / None).
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._snapshot is not None and self._snapshot.version > version,
+                timeout,
+            )
+            return self._snapshot
+
+    def refresh_once(self):
+        signals = self.compute()
+        payload = dumps(signals)
+        etag = hashlib.sha1(payload).hexdigest()[:20]
+        prev = self._snapshot
+        generated_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        if prev is not None and prev.etag == etag:
+            # ugyanaz a tartalom: új version / SSE push nélkül, csak a generated_at friss
+            snap = replace(
+                prev,
+                generated_at=generated_at,
+                body=_wrap(generated_at, "signals", prev.payload),
+                summary_body=_wrap(generated_at, "signals", prev.summary_payload),
+            )
+            self._snapshot = snap
+            return snap
+
+        summary = dumps([summarize(s) for s in signals])
+        self._version += 1
+        snap = Snapshot(
+            version=self._version,
+            generated_at=generated_at,
+            signals=tuple(signals),
+            body=_wrap(generated_at, "signals", payload),
+            etag=etag,
+            summary_body=_wrap(generated_at, "signals", summary),
+            summary_etag=hashlib.sha1(summary).hexdigest()[:20],
+            payload=payload,
+            summary_payload=summary,
+        )
+        with self._cond:
+            self._snapshot = snap   # atomikus referencia csere
+            self._cond.notify_all()
+        return snap
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                print("Snapshot frissítési hiba:", e)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
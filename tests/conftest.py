@@ -0,0 +1,11 @@
+import pytest
+
+from mock_exchange import MockExchange
+
+
+@pytest.fixture
+def exchange():
+    """Lokális mock Binance szerver (tests/mock_exchange.py) véletlen porton."""
+    server = MockExchange().start()
+    yield server
+    server.shutdown()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Lokális Binance mock szerver (time / exchangeInfo / order / order/test /
+myTrades) az
+éles végrehajtás végponttól végpontig teszteléséhez, valódi API nélkül.
+
+Ellenőrzi az aláírást, a recvWindow-t és a LOT_SIZE / NOTIONAL szűrőket,
+a MARKET megbízásokat a beállított áron teljesíti (jutalék a kapott eszközben).
+
+    python tests/mock_exchange.py                            # szerver (8765)
+    python order_execution.py BTCUSDC --base-url http://127.0.0.1:8765 --test-order BUY
+
+A tesztek az `exchange` fixture-ön át (conftest.py), a benchmarks/bench_orders.py
+közvetlenül importálja.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+MOCK_KEY = "mock-key"
+MOCK_SECRET = "mock-secret"
+FEE = Decimal("0.001")
+
+SYMBOLS = {
+    # symbol: (base, quote, ár, stepSize, minQty, tickSize, minNotional)
+    "BTCUSDC": ("BTC", "USDC", "65000.00", "0.00001", "0.00001", "0.01", "5"),
+    "ETHUSDC": ("ETH", "USDC", "3200.00", "0.0001", "0.0001", "0.01", "5"),
+    "XRPUSDC": ("XRP", "USDC", "0.5200", "1", "1", "0.0001", "5"),
+}
+
+
+def symbol_info(sym: str) -> dict:
+    base, quote, _, step, min_qty, tick, min_notional = SYMBOLS[sym]
+    return {
+        "symbol": sym, "status": "TRADING", "baseAsset": base, "quoteAsset": quote,
+        "baseAssetPrecision": 8, "quoteAssetPrecision": 8,
+        "filters": [
+            {"filterType": "PRICE_FILTER", "minPrice": tick, "maxPrice": "1000000", "tickSize": tick},
+            {"filterType": "LOT_SIZE", "minQty": min_qty, "maxQty": "9000000", "stepSize": step},
+            {"filterType": "MARKET_LOT_SIZE", "minQty": "0", "maxQty": "9000000", "stepSize": "0"},
+            {"filterType": "NOTIONAL", "minNotional": min_notional, "applyMinToMarket": True},
+        ],
+    }
+
+
+class MockExchange(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency      # mesterséges szerver oldali késleltetés (mp)
+        self.fail_orders = 0        # ennyi következő megbízásra 503 (újrapróbálás teszt)
+        self.lose_responses = 0     # ennyi következő megbízás teljesül, de a válasz elvész (bontjuk a kapcsolatot)
+        self.orders = []
+        self.by_client_id = {}      # newClientOrderId -> megbízás válasz (GET /api/v3/order)
+        self.trades = {}            # orderId -> kötések (GET /api/v3/myTrades)
+        self.lock = threading.Lock()
+        self.next_id = 1
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="mock-exchange", daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive, mint a Binance
+    disable_nagle_algorithm = True     # fejléc + törzs külön írás: különben ~40 ms delayed ACK
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, code: int, msg: str):
+        self._send(status, {"code": code, "msg": msg})
+
+    def _signed(self, url):
+        """Az aláírt kérés paraméterei; hibánál a választ már elküldtük és None-t adunk."""
+        if self.headers.get("X-MBX-APIKEY") != MOCK_KEY:
+            return self._error(401, -2015, "Invalid API-key, IP, or permissions for action.")
+        query, _, signature = url.query.rpartition("&signature=")
+        expected = hmac.new(MOCK_SECRET.encode(), query.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(signature, expected):
+            return self._error(400, -1022, "Signature for this request is not valid.")
+        p = dict(parse_qsl(query))
+        if abs(int(time.time() * 1000) - int(p["timestamp"])) > int(p.get("recvWindow", 5000)):
+            return self._error(400, -1021, "Timestamp for this request is outside of the recvWindow.")
+        if p.get("symbol") not in SYMBOLS:
+            return self._error(400, -1121, "Invalid symbol.")
+        return p
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        if url.path == "/api/v3/order":
+            p = self._signed(url)
+            if p is None:
+                return
+            with self.server.lock:
+                order = self.server.by_client_id.get(p.get("origClientOrderId"))
+            if order is None or order["symbol"] != p["symbol"]:
+                return self._error(400, -2013, "Order does not exist.")
+            return self._send(200, {k: v for k, v in order.items() if k != "fills"})
+        if url.path == "/api/v3/myTrades":
+            p = self._signed(url)
+            if p is None:
+                return
+            with self.server.lock:
+                trades = self.server.trades.get(int(p.get("orderId", 0)), [])
+            return self._send(200, trades)
+        if url.path == "/api/v3/time":
+            return self._send(200, {"serverTime": int(time.time() * 1000)})
+        if url.path == "/api/v3/exchangeInfo":
+            syms = json.loads(params["symbols"]) if "symbols" in params else list(SYMBOLS)
+            unknown = [s for s in syms if s not in SYMBOLS]
+            if unknown:
+                return self._error(400, -1121, "Invalid symbol.")
+            return self._send(200, {"serverTime": int(time.time() * 1000),
+                                    "symbols": [symbol_info(s) for s in syms]})
+        self._error(404, -1, "Not found")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if url.path not in ("/api/v3/order", "/api/v3/order/test"):
+            return self._error(404, -1, "Not found")
+        p = self._signed(url)
+        if p is None:
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        with self.server.lock:
+            fail = self.server.fail_orders > 0
+            if fail:
+                self.server.fail_orders -= 1
+        if fail:
+            return self._error(503, -1001, "Internal error; unable to process your request.")
+
+        base, quote, price, step, min_qty, _, min_notional = SYMBOLS[p["symbol"]]
+        price, step = Decimal(price), Decimal(step)
+        if "quoteOrderQty" in p:
+            qty = (Decimal(p["quoteOrderQty"]) / price / step).to_integral_value(rounding="ROUND_DOWN") * step
+        else:
+            qty = Decimal(p["quantity"])
+            if qty % step:
+                return self._error(400, -1013, "Filter failure: LOT_SIZE")
+        if qty < Decimal(min_qty):
+            return self._error(400, -1013, "Filter failure: LOT_SIZE")
+        if qty * price < Decimal(min_notional):
+            return self._error(400, -1013, "Filter failure: NOTIONAL")
+        if url.path.endswith("/test"):
+            return self._send(200, {})
+
+        got_asset, got = (base, qty) if p["side"] == "BUY" else (quote, qty * price)
+        fill = {"price": str(price), "qty": str(qty), "commission": str(got * FEE), "commissionAsset": got_asset}
+        with self.server.lock:
+            order_id = self.server.next_id
+            self.server.next_id += 1
+            self.server.orders.append(p)
+            order = {
+                "symbol": p["symbol"], "orderId": order_id, "clientOrderId": p.get("newClientOrderId", ""),
+                "transactTime": int(time.time() * 1000), "price": "0", "origQty": str(qty),
+                "executedQty": str(qty), "cummulativeQuoteQty": str(qty * price), "status": "FILLED",
+                "type": "MARKET", "side": p["side"], "fills": [fill],
+            }
+            self.server.by_client_id[order["clientOrderId"]] = order
+            self.server.trades[order_id] = [{"symbol": p["symbol"], "id": order_id, "orderId": order_id,
+                                             "quoteQty": str(qty * price), **fill}]
+            lose = self.server.lose_responses > 0
+            if lose:
+                self.server.lose_responses -= 1
+        if lose:
+            self.close_connection = True    # a megbízás teljesült, a kliens csak megszakadt kapcsolatot lát
+            return
+        self._send(200, order)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokális Binance mock szerver.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Szerver oldali késleltetés (mp)")
+    args = parser.parse_args()
+
+    srv = MockExchange(args.port, args.latency)
+    print(f"Mock Binance: {srv.url} (API key: {MOCK_KEY}, secret: {MOCK_SECRET})")
+    srv.serve_forever()
@@ -0,0 +1,102 @@
+"""LiveExecutor végponttól végpontig a lokális mock Binance szerver ellen."""
+import time
+
+import pytest
+
+from mock_exchange import MOCK_KEY, MOCK_SECRET, SYMBOLS
+from order_execution import SignedClient, LiveExecutor, FilterCache
+
+SYM = "BTCUSDC"
+PRICE = float(SYMBOLS[SYM][2])
+
+
+@pytest.fixture
+def executor(exchange, tmp_path):
+    client = SignedClient(MOCK_KEY, MOCK_SECRET, base_url=exchange.url)
+    ex = LiveExecutor(client, [SYM], filters=FilterCache(client, [SYM]),
+                      state_path=tmp_path / "live_state.json").start()
+    yield ex
+    ex.stop()
+
+
+def signal(side):
+    return [{"symbol": SYM, "signal": side, "price": PRICE}]
+
+
+def wait_idle(ex, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while SYM in ex._pending:
+        assert time.monotonic() < deadline, "a megbízás nem ért véget"
+        time.sleep(0.001)
+
+
+def test_buy_then_sell(exchange, executor):
+    executor.submit(signal("BUY"))
+    wait_idle(executor)
+    pos = executor.positions[SYM]
+    # 100 USDC / 65000, lépésközre lefelé kerekítve, a base jutalék nélkül
+    assert pos["qty"] == pytest.approx(0.00153 * 0.999)
+    assert pos["entry_price"] == pytest.approx(PRICE)
+    assert [o["side"] for o in exchange.orders] == ["BUY"]
+
+    executor.submit(signal("BUY"))          # nincs váltás: nincs új megbízás
+    executor.submit(signal("SELL"))
+    wait_idle(executor)
+    assert SYM not in executor.positions
+    assert [o["side"] for o in exchange.orders] == ["BUY", "SELL"]
+    assert exchange.orders[1]["quantity"] == "0.00152"
+
+
+def test_signal_change_during_pending_order_is_not_lost(exchange, executor):
+    exchange.latency = 0.2
+    executor.submit(signal("BUY"))
+    executor.submit(signal("WAIT"))         # a BUY még úton van: a legutolsó jelzés számít
+    executor.submit(signal("SELL"))
+    wait_idle(executor)                     # a BUY után a SELL is lefut, új kör nélkül
+    assert SYM not in executor.positions
+    assert [o["side"] for o in exchange.orders] == ["BUY", "SELL"]
+
+
+def test_failed_order_is_retried(exchange, executor):
+    exchange.fail_orders = 1
+    executor.submit(signal("BUY"))
+    wait_idle(executor)
+    assert SYM not in executor.positions
+
+    executor.submit(signal("BUY"))          # ugyanaz a jelzés: újra próbálkozik
+    wait_idle(executor)
+    assert SYM in executor.positions
+    assert [o["side"] for o in exchange.orders] == ["BUY"]
+
+
+def test_lost_response_is_resolved_without_second_order(exchange, executor):
+    exchange.lose_responses = 1             # teljesül, de a kliens csak megszakadt kapcsolatot lát
+    executor.submit(signal("BUY"))
+    wait_idle(executor)
+    assert SYM in executor.positions        # a lekérdezett megbízásból könyvelve
+    assert executor.positions[SYM]["qty"] == pytest.approx(0.00153 * 0.999)
+
+    executor.submit(signal("BUY"))          # ugyanaz a jelzés: nincs második vétel
+    wait_idle(executor)
+    assert [o["side"] for o in exchange.orders] == ["BUY"]
+
+
+def test_unknown_outcome_blocks_new_orders_until_resolved(exchange, executor, monkeypatch):
+    exchange.lose_responses = 1
+
+    def down(*args, **kwargs):
+        raise ConnectionError("a lekérdezés sem megy át")
+    monkeypatch.setattr(executor.client, "get_order", down)
+    executor.submit(signal("BUY"))
+    wait_idle(executor)
+    assert SYM not in executor.positions and SYM in executor._unknown
+
+    executor.submit(signal("BUY"))          # még mindig ismeretlen: csak lekérdezés, új megbízás nem
+    wait_idle(executor)
+    assert len(exchange.orders) == 1
+
+    monkeypatch.undo()
+    executor.submit(signal("WAIT"))
+    wait_idle(executor)
+    assert SYM in executor.positions and SYM not in executor._unknown
+    assert len(exchange.orders) == 1
@@ -0,0 +1,163 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+from kline_archive import interval_ms
+
+BASE_INTERVAL = "1m"           # ebből építjük a nagyobb idősíkokat
+BASE_LIMIT = 1000              # 1m alap gyertyák száma (egy REST kérés max limitje)
+
+
+def _bucket(open_time: int, step: int) -> int:
+    return open_time - open_time % step
+
+
+class TimeframeBars:
+    """
+    Egy (symbol, interval) idősík OHLCV gyertyái az 1m alap gyertyákból.
+
+    Csak az új lezárt alap gyertyákat dolgozzuk fel (O(1) / gyertya): a
+    folyamatban lévő nagy gyertyát (`cur`) bővítjük, és amikor az alap
+    gyertya a következő időszakba esik, lezárjuk. A lezárt nagy gyertyák
+    `limit` hosszan megmaradnak akkor is, ha az alap gyertyák már kiestek
+    a cache-ből, így pl. 1h-n is nő a history a futás alatt.
+    Gyertya forma: [open_time, o, h, l, c, v, close_time] (float árak).
+    """
+
+    def __init__(self, interval: str, limit: int, base_interval: str = BASE_INTERVAL):
+        self.interval = interval
+        self.limit = limit
+        self.step = interval_ms(interval)
+        self.base_step = interval_ms(base_interval)
+        if self.step % self.base_step:
+            raise ValueError(f"{interval} nem többszöröse az alap {base_interval} idősíknak")
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.bars = deque(maxlen=self.limit)    # lezárt nagy gyertyák
+        self.cur = None                         # folyamatban lévő, csak lezárt alap gyertyákból
+        self.last_base = None                   # utolsó feldolgozott lezárt alap open_time
+
+    def _new_bar(self, row, bucket):
+        _, o, h, l, c, v = row
+        return [bucket, o, h, l, c, v, bucket + self.step - 1]
+
+    def _merge_into(self, bar, row):
+        _, _, h, l, c, v = row
+        if h > bar[2]:
+            bar[2] = h
+        if l < bar[3]:
+            bar[3] = l
+        bar[4] = c
+        bar[5] += v
+
+    def _roll(self, bucket):
+        """A `cur` lezárása, ha az új alap gyertya már másik időszakba esik."""
+        if self.cur is not None and self.cur[0] != bucket:
+            self.bars.append(self.cur)
+            self.cur = None
+
+    def _add(self, row):
+        bucket = _bucket(row[0], self.step)
+        self._roll(bucket)
+        if self.cur is None:
+            # újrakezdéskor a csonka első időszakot kihagyjuk (nem teljes OHLCV)
+            if not self.bars and row[0] != bucket:
+                return
+            self.cur = self._new_bar(row, bucket)
+        else:
+            self._merge_into(self.cur, row)
+
+    def checkpoint(self):
+        """Lezárt + folyamatban lévő nagy gyertyák és az utolsó alap open_time mentéshez."""
+        with self.lock:
+            return {
+                "bars": np.array(list(self.bars), dtype=np.float64).reshape(-1, 7),
+                "cur": np.array([] if self.cur is None else [self.cur], dtype=np.float64).reshape(-1, 7),
+                "last_base": np.array([-1 if self.last_base is None else self.last_base], dtype=np.int64),
+            }
+
+    def restore(self, data: dict) -> bool:
+        last_base = int(data["last_base"][0])
+        if last_base < 0:
+            return False
+
+        def bar(row):
+            ot, o, h, l, c, v, ct = row.tolist()
+            return [int(ot), o, h, l, c, v, int(ct)]
+
+        with self.lock:
+            self.reset()
+            self.bars.extend(bar(r) for r in data["bars"])
+            self.cur = bar(data["cur"][0]) if len(data["cur"]) else None
+            self.last_base = last_base
+        return True
+
+    def sync(self, cols):
+        """
+        Igazítás az alap gyertyákhoz (CandleCache oszlop nézetek:
+        open_time, open, high, low, close, volume; az utolsó gyertya nyitott).
+        Visszaadja a nagy gyertyákat: lezártak + a nyitott utolsó (ideiglenes).
+        Ha az alap sor nem folytatása az eddigieknek (rés / újratöltés),
+        elölről építjük.
+        """
+        times = cols["open_time"]
+        if not len(times):
+            return []
+        closed = len(times) - 1
+        with self.lock:
+            start = 0
+            if self.last_base is not None:
+                i = closed - 1
+                while i >= 0 and times[i] > self.last_base:
+                    i -= 1
+                if i >= 0 and times[i] == self.last_base:
+                    start = i + 1
+                elif not (i < 0 and times[0] == self.last_base + self.base_step):
+                    self.reset()
+            # egyszer Python listává, a ciklus már sima float-okon fut
+            new = list(zip(*(cols[k][start:].tolist() for k in
+                             ("open_time", "open", "high", "low", "close", "volume"))))
+            for row in new[:-1]:
+                self._add(row)
+                self.last_base = row[0]
+
+            live = new[-1]
+            bucket = _bucket(live[0], self.step)
+            self._roll(bucket)
+            if self.cur is not None:
+                last = list(self.cur)
+                self._merge_into(last, live)
+            else:
+                last = self._new_bar(live, bucket)
+            return list(self.bars) + [last]
+
+
+_bars = {}
+_bars_lock = threading.Lock()
+
+
+def get_timeframe_bars(symbol: str, interval: str, limit: int,
+                       base_interval: str = BASE_INTERVAL) -> TimeframeBars:
+    key = (symbol, interval, base_interval)
+    with _bars_lock:
+        bars = _bars.get(key)
+        if bars is None or bars.limit != limit:
+            bars = TimeframeBars(interval, limit, base_interval)
+            _bars[key] = bars
+        return bars
+
+
+def bars_items():
+    """[((symbol, interval, base_interval), TimeframeBars)] pillanatkép (checkpointhoz)."""
+    with _bars_lock:
+        return list(_bars.items())
+
+
+def drop_bars(symbol: str):
+    """Szimbólum összes idősíkjának eldobása."""
+    with _bars_lock:
+        for key in [k for k in _bars if k[0] == symbol]:
+            del _bars[key]
@@ -1,58 +1,260 @@
 from binance.spot import Spot
+import numpy as np
 import pandas as pd
-import ta
 from config import API_KEY, API_SECRET
-from watchlist import load_watchlist
-from pathlib import Path
-from datetime import datetime
+from watchlist import load_watchlist, auto_trade_symbols, enabled_symbols, watchlist_manager
+from candle_cache import get_cache, drop_cache
+from candle_buffer import parse_kline, KLINE_COLUMNS
+from indicators import get_indicator_state, drop_state
+from timeframes import get_timeframe_bars, drop_bars, BASE_INTERVAL, BASE_LIMIT
+from rate_limit import WeightLimiter, RateLimitedClient
+from kline_stream import KlineStream, WebsocketTransport
+from recorder import Recorder, RecordingClient, RecordingTransport, Replay, RECORD_DIR
+from paper_trading import PaperTrader
+from order_execution import SignedClient, LiveExecutor
+from checkpoint import Checkpointer, restore as restore_checkpoint, CHECKPOINT_PATH
+from shards import ShardSupervisor, SHARDS, DISPATCH_SECONDS
+from signal_log import get_log_backend, signal_rows
+from serialize import time_labels
+import metrics
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import atexit
+import threading
+import time
 
 # ---- History beállítások ----
 HISTORY_INTERVAL = "5m"        # 5 perces gyertyák
 HISTORY_DAYS = 1               # hány napnyi adat
 HISTORY_LIMIT = 12 * 24 * HISTORY_DAYS  # 12 candle/óra * 24 óra = 288 / nap (<=1000)
 
-LOG_PATH = Path(__file__).with_name("signals_log.csv")
+# ---- Párhuzamos lekérés ----
+FETCH_WORKERS = 8              # egyszerre ennyi szimbólumot kérünk le (1 = szekvenciális)
+SYMBOL_TIMEOUT = 10            # mp, egy szimbólum jelzésének max ideje
 
-client = Spot(api_key=API_KEY, api_secret=API_SECRET)
+POLL_SECONDS = 10              # poll mód ciklusideje / log gyakoriság
 
+# ---- Több idősík (egy 1m alap streamből) ----
+MTF_TIMEFRAMES = ("1m", "5m", "15m", "1h")
+MTF_REQUIRE = None             # ennyi idősíknak kell egyeznie (None = mindnek)
+
+client = Spot(api_key=API_KEY, api_secret=API_SECRET, timeout=SYMBOL_TIMEOUT)
+weight_limiter = WeightLimiter()
+
+
+metrics.gauge("cryptobot_binance_weight_used", weight_limiter.used,
+              "Request weight az utolsó 60 mp-ben (kliens oldali számlálás)")
+metrics.gauge("cryptobot_binance_weight_budget", lambda: weight_limiter.budget,
+              "Saját request weight keret / perc")
+metrics.describe("cryptobot_stage_seconds", "Pipeline lépések ideje (stage, symbol)")
+metrics.describe("cryptobot_cache_requests_total",
+                 "Gyertya cache: hit (REST nélkül), incremental (csak új gyertyák), miss (teljes letöltés)")
+metrics.describe("cryptobot_signal_errors_total", "Hibás / időtúllépett szimbólumok a körökben")
+
+
+_recorder = None               # start_recording(): minden REST válasz / stream üzenet fájlba
+_replay = None                 # use_replay(): felvett adatok, szimulált idő
+_paper = None                  # use_paper(): auto_trade szimbólumok papír kereskedése
+_live = None                   # use_live(): auto_trade szimbólumok éles megbízásai
+
+
+def start_recording(path=None) -> Recorder:
+    global _recorder
+    if path is None:
+        path = RECORD_DIR / (time.strftime("%Y%m%d-%H%M%S") + ".cbrec")
+    _recorder = Recorder(path)
+    atexit.register(_recorder.close)
+    return _recorder
+
+
+def use_replay(replay: Replay):
+    """REST / stream helyett a felvétel (rate limit nélkül, szimulált idővel)."""
+    global _replay
+    _replay = replay
+
+
+def use_paper(trader: PaperTrader = None) -> PaperTrader:
+    """
+    A jelzéseket (auto_trade szimbólumok) a papír kereskedő sorába is
+    beküldjük; a teljesítés a saját szálán fut, a jelzés utat nem lassítja.
+    """
+    global _paper
+    if trader is None:
+        trader = PaperTrader(now=_replay.clock.utcnow if _replay is not None else None)
+    _paper = trader.start()
+    atexit.register(trader.stop)
+    return trader
+
+
+def use_checkpoint(path=CHECKPOINT_PATH) -> Checkpointer:
+    """
+    Meleg indítás: a mentett gyertya pufferek / indikátor állapotok visszatöltése
+    (az első körben csak a rés jön a tőzsdéről), utána időnkénti mentés.
+    """
+    t0 = time.perf_counter()
+    n = restore_checkpoint(path, load_watchlist()[0])
+    if n:
+        print(f"Checkpoint: {n} elem visszatöltve ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+    return Checkpointer(path).start()
 
-def get_data(symbol="BTCUSDC",
-             interval: str = HISTORY_INTERVAL,
-             limit: int = HISTORY_LIMIT):
-    klines = client.klines(symbol, interval, limit=limit)
-    df = pd.DataFrame(klines, columns=[
-        "open_time", "o", "h", "l", "c", "v", "close_time",
-        "qav", "trades", "taker_base", "taker_quote", "ignore"
-    ])
-    df["c"] = df["c"].astype(float)
-    return df
 
+def use_live(executor: LiveExecutor = None, test: bool = False) -> LiveExecutor:
+    """
+    Éles megbízások: poolos aláírt kliens, előre letöltött exchangeInfo
+    szűrők, megbízás sor. test=True: /api/v3/order/test (nem teljesül).
+    """
+    global _live
+    if executor is None:
+        executor = LiveExecutor(SignedClient(API_KEY, API_SECRET, limiter=weight_limiter),
+                                auto_trade_symbols(), test=test)
+    _live = executor.start()
+    atexit.register(executor.stop)
+    return executor
 
-def _clean_series(series: pd.Series):
-    """NaN -> None (JSON-ben null lesz, nem NaN)"""
-    return [
-        float(v) if pd.notna(v) else None
-        for v in series
-    ]
+
+def _set_trade_symbols(raw_cfg):
+    symbols = auto_trade_symbols(raw_cfg)
+    for engine in (_paper, _live):
+        if engine is not None:
+            engine.set_symbols(symbols)
+
+
+def _on_watchlist_change(added, removed, data):
+    """Watchlist újratöltés: a levett szimbólumok cache / indikátor / idősík állapota megy."""
+    if added or removed:
+        print(f"Watchlist változott: +{added or '-'}  -{removed or '-'}")
+    for sym in removed:
+        drop_cache(sym)
+        drop_state(sym)
+        drop_bars(sym)
+    _set_trade_symbols(data)
+
+
+watchlist_manager().subscribe(_on_watchlist_change)
+
+
+def _dispatch(results):
+    """
+    Kész jelzések a papír / éles végrehajtásnak, szimbólumonként azonnal
+    (nem várunk a kör többi szimbólumára); mindkettő csak sorba tesz.
+    """
+    for engine in (_live, _paper):
+        if engine is not None:
+            engine.submit(results)
+
+
+def _rest_client():
+    if _replay is not None:
+        return _replay
+    if _recorder is not None:
+        return RateLimitedClient(RecordingClient(client, _recorder), weight_limiter)
+    return RateLimitedClient(client, weight_limiter)
+
+
+def _transport_factory():
+    if _replay is not None:
+        return _replay.transport
+    if _recorder is not None:
+        return lambda url: RecordingTransport(WebsocketTransport(url), _recorder)
+    return WebsocketTransport
+
+
+def _sleep(seconds: float):
+    """Valós idő, replay módban szimulált idő szerint."""
+    if _replay is not None:
+        _replay.clock.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def _cached(symbol, interval, limit, refresh=True):
+    """Memória cache: csak az utolsó tárolt gyertyától kérünk újat.
+    refresh=False: stream módban a cache-t a websocket tölti, nem kell REST."""
+    cache = get_cache(symbol, interval, limit)
+    if not refresh and not cache.needs_seed:    # üres / bővített cache-t stream módban is letöltünk
+        metrics.inc("cryptobot_cache_requests_total", result="hit", symbol=symbol)
+        return cache
+    seeds = cache.seeds
+    result = "miss" if cache.needs_seed else "incremental"
+    try:
+        with metrics.timer("cryptobot_stage_seconds", stage="get_data", symbol=symbol):
+            cache.refresh(_rest_client())
+    finally:
+        # a túl nagy résnél a refresh is teljes újratöltés: az is miss
+        if cache.seeds != seeds:
+            result = "miss"
+        metrics.inc("cryptobot_cache_requests_total", result=result, symbol=symbol)
+    return cache
+
+
+def get_data(symbol="BTCUSDC",
+             interval: str = HISTORY_INTERVAL,
+             limit: int = HISTORY_LIMIT,
+             refresh: bool = True,
+             start_time: int = None,
+             end_time: int = None):
+    """
+    Gyertyák DataFrame-ként (open_time, o, h, l, c, v, close_time; típusos oszlopok).
+    A jelzés számolás nem ezt használja, hanem közvetlenül a cache tömbjeit.
+    """
+    if start_time is not None or end_time is not None:
+        # Időszak lekérés (pl. archívum letöltés): közvetlen REST, cache nélkül
+        kwargs = {"limit": limit}
+        if start_time is not None:
+            kwargs["startTime"] = int(start_time)
+        if end_time is not None:
+            kwargs["endTime"] = int(end_time)
+        klines = _rest_client().klines(symbol, interval, **kwargs)
+        rows = [parse_kline(k) for k in klines]
+        cols = {name: np.array([r[i] for r in rows], dtype=dtype)
+                for i, (name, dtype) in enumerate(KLINE_COLUMNS)}
+    else:
+        cols = _cached(symbol, interval, limit, refresh).snapshot()
+    return pd.DataFrame({
+        "open_time": cols["open_time"], "o": cols["open"], "h": cols["high"],
+        "l": cols["low"], "c": cols["close"], "v": cols["volume"],
+        "close_time": cols["close_time"],
+    })
 
 
 def get_signal(symbol="BTCUSDC",
                interval: str = HISTORY_INTERVAL,
-               limit: int = HISTORY_LIMIT):
-    df = get_data(symbol=symbol, interval=interval, limit=limit)
+               limit: int = HISTORY_LIMIT,
+               refresh: bool = True):
+    cache = _cached(symbol, interval, limit, refresh)
+
+    # Indikátorok: futó állapot (symbol, interval) páronként, csak az új
+    # lezárt gyertyákat dolgozzuk fel, a nyitott gyertyára ideiglenes érték.
+    # A cache és az indikátor puffer nézeteit (másolás nélkül) a lockok alatt olvassuk.
+    state = get_indicator_state(symbol, interval, limit)
+    with cache.lock, state.lock:
+        open_times = cache.view("open_time")
+        closes = cache.view("close")
+        with metrics.timer("cryptobot_stage_seconds", stage="indicators", symbol=symbol):
+            ema9_col, ema21_col, rsi_col = state.sync(open_times, closes)
 
-    # Indikátorok
-    df["ema9"] = df["c"].ewm(span=9).mean()
-    df["ema21"] = df["c"].ewm(span=21).mean()
-    df["rsi"] = ta.momentum.RSIIndicator(df["c"]).rsi()
+        price = float(closes[-1])
+        rsi = float(rsi_col[-1])
+        ema9 = float(ema9_col[-1])
+        ema21 = float(ema21_col[-1])
+        with metrics.timer("cryptobot_stage_seconds", stage="history", symbol=symbol):
+            history = _history(open_times, closes, ema9_col, ema21_col, rsi_col)
 
-    cur = df.iloc[-1]
+    rsi_signal, combined_signal = _classify(rsi, ema9, ema21)
+
+    return {
+        "symbol": symbol,
+        "price": price,
+        "rsi": rsi,
+        "ema9": ema9,
+        "ema21": ema21,
+        "signal": combined_signal,   # KOMBINÁLT jelzés (RSI+EMA)
+        "signal_rsi": rsi_signal,    # csak RSI jelzés
+        "history": history,
+    }
 
-    price = float(cur["c"])
-    rsi = float(cur["rsi"])
-    ema9 = float(cur["ema9"])
-    ema21 = float(cur["ema21"])
 
+def _classify(rsi, ema9, ema21):
+    """(rsi_signal, combined_signal); NaN RSI (kevés gyertya) -> WAIT"""
     # --- 1) RSI alap jelzés ---
     if rsi < 30:
         rsi_signal = "BUY"
@@ -70,71 +272,405 @@ def get_signal(symbol="BTCUSDC",
         combined_signal = "SELL"
     else:
         combined_signal = "WAIT"
+    return rsi_signal, combined_signal
 
-    # 📈 History (kb. 1 nap, NaN-ek kipucolva)
-    hist = df.copy()
-    hist_times = pd.to_datetime(hist["open_time"], unit="ms").dt.strftime("%H:%M")
 
-    history = {
-        "times": hist_times.tolist(),
-        "prices": _clean_series(hist["c"]),
-        "ema9": _clean_series(hist["ema9"]),
-        "ema21": _clean_series(hist["ema21"]),
-        "rsi": _clean_series(hist["rsi"]),
+def _history(open_times, closes, ema9, ema21, rsi):
+    """
+    📈 History (kb. 1 nap): típusos tömb másolatok (a pufferek nézetei a
+    lock után változhatnak). A NaN a JSON-ben null lesz (serialize.dumps).
+    """
+    open_times = np.array(open_times, dtype=np.int64)
+    return {
+        "open_times": open_times,   # ms, delta lekéréshez
+        "times": time_labels(open_times),
+        "prices": np.array(closes, dtype=np.float64),
+        "ema9": np.array(ema9, dtype=np.float64),
+        "ema21": np.array(ema21, dtype=np.float64),
+        "rsi": np.array(rsi, dtype=np.float64),
     }
 
+
+def _agree(signals, require):
+    """BUY/SELL, ha legalább `require` idősík egyezik, különben WAIT."""
+    buys = signals.count("BUY")
+    sells = signals.count("SELL")
+    if buys >= require and buys > sells:
+        return "BUY"
+    if sells >= require and sells > buys:
+        return "SELL"
+    return "WAIT"
+
+
+def get_mtf_signal(symbol="BTCUSDC",
+                   timeframes=MTF_TIMEFRAMES,
+                   primary: str = HISTORY_INTERVAL,
+                   require: int = None,
+                   limit: int = HISTORY_LIMIT,
+                   refresh: bool = True):
+    """
+    Több idősíkú jelzés egyetlen 1m alap gyertya sorból: a nagyobb
+    idősíkok gyertyáit inkrementálisan építjük (timeframes.TimeframeBars),
+    az indikátorok idősíkonként futnak. A `signal` / `signal_rsi` csak akkor
+    BUY/SELL, ha legalább `require` (alap: mind) idősík ugyanazt mondja.
+    A price / rsi / ema / history a `primary` idősíkról jön.
+    """
+    timeframes = list(timeframes)
+    if primary not in timeframes:
+        primary = timeframes[0]
+    if require is None:
+        require = MTF_REQUIRE
+    if require is None:
+        require = len(timeframes)
+
+    cache = _cached(symbol, BASE_INTERVAL, BASE_LIMIT, refresh)   # az egyetlen REST hívás
+
+    per_tf = {}
+    history = None
+    with cache.lock:
+        cols = cache.ring.columns()
+        all_bars = {tf: get_timeframe_bars(symbol, tf, limit).sync(cols) for tf in timeframes}
+
+    for tf, bars in all_bars.items():
+        open_times = [b[0] for b in bars]
+        closes = [b[4] for b in bars]
+        # külön állapot kulcs, hogy ne keveredjen a sima (REST) 5m get_signal állapotával
+        state = get_indicator_state(symbol, f"{tf}@{BASE_INTERVAL}", limit)
+        with state.lock:
+            with metrics.timer("cryptobot_stage_seconds", stage="indicators", symbol=f"{symbol}@{tf}"):
+                ema9_col, ema21_col, rsi_col = state.sync(open_times, closes)
+            rsi, ema9, ema21 = float(rsi_col[-1]), float(ema9_col[-1]), float(ema21_col[-1])
+            if tf == primary:
+                history = _history(open_times, closes, ema9_col, ema21_col, rsi_col)
+        rsi_signal, combined_signal = _classify(rsi, ema9, ema21)
+        per_tf[tf] = {
+            "price": closes[-1],
+            "rsi": rsi if rsi == rsi else None,    # NaN -> null
+            "ema9": ema9,
+            "ema21": ema21,
+            "signal": combined_signal,
+            "signal_rsi": rsi_signal,
+            "open_time": int(open_times[-1]),
+        }
+
+    main = per_tf[primary]
     return {
         "symbol": symbol,
-        "price": price,
-        "rsi": rsi,
-        "ema9": ema9,
-        "ema21": ema21,
-        "signal": combined_signal,   # KOMBINÁLT jelzés (RSI+EMA)
-        "signal_rsi": rsi_signal,    # csak RSI jelzés
+        "price": main["price"],
+        "rsi": main["rsi"],
+        "ema9": main["ema9"],
+        "ema21": main["ema21"],
+        "signal": _agree([v["signal"] for v in per_tf.values()], require),
+        "signal_rsi": _agree([v["signal_rsi"] for v in per_tf.values()], require),
+        "timeframes": per_tf,
         "history": history,
     }
 
 
+def _compute_signal(symbol, interval, limit, timeframes=None, refresh=True):
+    if timeframes:
+        return get_mtf_signal(symbol=symbol, timeframes=timeframes, limit=limit, refresh=refresh)
+    return get_signal(symbol=symbol, interval=interval, limit=limit, refresh=refresh)
+
+
 def _log_signals(results):
-    """Egyszerű log CSV-be: idő,symbol,price,rsi,ema9,ema21,signal_rsi,signal_combined"""
+    """Log: idő,symbol,price,rsi,ema9,ema21,signal_rsi,signal_combined (CSV vagy parquet backend,
+    háttérszálas íróval: itt csak sorba tesszük, lemezre nem várunk)"""
     try:
-        now = datetime.utcnow().isoformat()
-        header_needed = not LOG_PATH.exists()
-        with LOG_PATH.open("a", encoding="utf-8") as f:
-            if header_needed:
-                f.write("timestamp,symbol,price,rsi,ema9,ema21,signal_rsi,signal_combined\n")
-            for r in results:
-                f.write(
-                    f"{now},{r['symbol']},{r['price']},"
-                    f"{r['rsi']},{r['ema9']},{r['ema21']},"
-                    f"{r['signal_rsi']},{r['signal']}\n"
-                )
+        with metrics.timer("cryptobot_stage_seconds", stage="log", symbol="all"):
+            now = _replay.clock.utcnow() if _replay is not None else None
+            get_log_backend().append(signal_rows(results, now))
     except Exception as e:
         print("Logolási hiba:", e)
 
 
+_executors = {}         # max_workers -> közös szálkészlet (méretenként, használat közben nem cseréljük)
+_abandoned = {}         # max_workers -> időtúllépés miatt elengedett, de még futó feladatok
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Méretenként egy közös készlet: a screener (más max_workers) nem állítja le
+    a jelzés kör készletét. Az elengedett, még futó feladatok szálat foglalnak,
+    ezért beleszámítanak a limitbe: ha már minden szálat ilyen foglal, a
+    készletet lezárjuk (a beragadt szálak maguktól végeznek) és újat nyitunk.
+    """
+    with _executor_lock:
+        pool = _executors.get(max_workers)
+        if pool is None or len(_abandoned[max_workers]) >= max_workers:
+            if pool is not None:
+                print(f"Hiba: mind a {max_workers} jelzés szál beragadt, új szálkészlet")
+                pool.shutdown(wait=False)
+            pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="signal")
+            _executors[max_workers] = pool
+            _abandoned[max_workers] = set()
+        return pool
+
+
+def _abandon(max_workers: int, fut):
+    """Időtúllépett, már futó feladat: a szála foglalt marad, amíg be nem fejeződik."""
+    with _executor_lock:
+        abandoned = _abandoned[max_workers]
+        abandoned.add(fut)
+    fut.add_done_callback(abandoned.discard)
+
+
+def _collect_concurrent(symbols, interval, limit, max_workers, timeout, timeframes=None):
+    """
+    Szimbólumonként külön szálon számolunk, max `max_workers` egyszerre.
+    A timeout a szál tényleges indulásától számít, így a sorban álló
+    szimbólumok nem futnak ki az időből a lassúak miatt. Ha a készletet
+    beragadt feladatok töltik meg, a még el nem indultak új készletre kerülnek.
+    """
+    started = {}
+
+    def run(sym):
+        started[sym] = time.monotonic()
+        s = _compute_signal(sym, interval, limit, timeframes)
+        _dispatch([s])
+        return s
+
+    pool = _get_executor(max_workers)
+    pending = {pool.submit(run, sym): sym for sym in symbols}
+    by_symbol = {}
+
+    while pending:
+        done, _ = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+        for fut in done:
+            sym = pending.pop(fut)
+            try:
+                by_symbol[sym] = fut.result()
+            except Exception as e:
+                print(f"Hiba {sym} jelzésénél:", e)
+
+        now = time.monotonic()
+        timed_out = False
+        for fut, sym in list(pending.items()):
+            t0 = started.get(sym)
+            if t0 is not None and now - t0 > timeout:
+                pending.pop(fut)
+                if not fut.cancel():
+                    _abandon(max_workers, fut)
+                timed_out = True
+                print(f"Hiba {sym} jelzésénél: időtúllépés ({timeout} mp)")
+
+        if timed_out and pending:
+            fresh = _get_executor(max_workers)
+            if fresh is not pool:
+                pool = fresh
+                for fut, sym in list(pending.items()):
+                    if sym not in started and fut.cancel():
+                        pending.pop(fut)
+                        pending[pool.submit(run, sym)] = sym
+
+    # a watchlist sorrendjét megtartjuk
+    return [by_symbol[sym] for sym in symbols if sym in by_symbol]
+
+
 def get_all_signals(interval: str = HISTORY_INTERVAL,
-                    limit: int = HISTORY_LIMIT):
-    symbols, raw_cfg = load_watchlist()
-    results = []
-    for sym in symbols:
-        try:
-            s = get_signal(symbol=sym, interval=interval, limit=limit)
-            results.append(s)
-        except Exception as e:
-            print(f"Hiba {sym} jelzésénél:", e)
+                    limit: int = HISTORY_LIMIT,
+                    max_workers: int = FETCH_WORKERS,
+                    timeout: float = SYMBOL_TIMEOUT,
+                    timeframes=None,
+                    symbols=None,
+                    log: bool = True):
+    """
+    timeframes: pl. ("1m", "5m", "15m", "1h") -> több idősíkú jelzés (get_mtf_signal)
+    symbols: a watchlist helyett ezek (shard worker); log=False: nem írunk logot
+    """
+    if symbols is None:
+        symbols, raw_cfg = load_watchlist()
+        _set_trade_symbols(raw_cfg)
+    t0 = time.perf_counter()
+    if max_workers > 1 and len(symbols) > 1:
+        results = _collect_concurrent(symbols, interval, limit, max_workers, timeout, timeframes)
+    else:
+        results = []
+        for sym in symbols:
+            try:
+                s = _compute_signal(sym, interval, limit, timeframes)
+                _dispatch([s])
+                results.append(s)
+            except Exception as e:
+                print(f"Hiba {sym} jelzésénél:", e)
+
+    metrics.observe("cryptobot_stage_seconds", time.perf_counter() - t0, stage="signals", symbol="all")
+    metrics.inc("cryptobot_signal_errors_total", len(symbols) - len(results))
 
-    if results:
+    if results and log:
         _log_signals(results)
 
     return results
 
 
-if __name__ == "__main__":
-    import time
+def run_poll(interval: str = HISTORY_INTERVAL, limit: int = HISTORY_LIMIT, timeframes=None):
+    """Régi mód: 10 mp-enként REST lekérés az egész watchlistre."""
     while True:
         try:
-            print(get_all_signals())
+            print(get_all_signals(interval=interval, limit=limit, timeframes=timeframes))
         except Exception as e:
             print("Hiba:", e)
-        time.sleep(10)
\ No newline at end of file
+        if _replay is not None and _replay.finished:
+            print("A felvétel visszajátszása véget ért.")
+            return
+        _sleep(POLL_SECONDS)
+
+
+def run_stream(interval: str = HISTORY_INTERVAL, limit: int = HISTORY_LIMIT,
+               timeframes=None, **stream_kwargs):
+    """
+    Stream mód: kombinált kline websocket az összes engedélyezett szimbólumra.
+    Jelzést csak akkor számolunk, ha a szimbólum gyertyája változott;
+    a logba továbbra is POLL_SECONDS-enként írjuk a legutolsó állapotot.
+    timeframes megadásakor csak az 1m streamre iratkozunk fel, a nagyobb
+    idősíkok ebből épülnek.
+    """
+    symbols, raw_cfg = load_watchlist()
+    latest = {}
+    latest_lock = threading.Lock()
+    _set_trade_symbols(raw_cfg)
+
+    def on_update(sym, closed):
+        try:
+            s = _compute_signal(sym, interval, limit, timeframes, refresh=False)
+        except Exception as e:
+            print(f"Hiba {sym} jelzésénél:", e)
+            return
+        with latest_lock:
+            latest[sym] = s
+        _dispatch([s])
+
+    stream_kwargs.setdefault("transport_factory", _transport_factory())
+    if timeframes:
+        stream = KlineStream(symbols, BASE_INTERVAL, BASE_LIMIT, _rest_client(), on_update, **stream_kwargs)
+    else:
+        stream = KlineStream(symbols, interval, limit, _rest_client(), on_update, **stream_kwargs)
+
+    def on_watchlist(added, removed, data):
+        # feliratkozás / leiratkozás csak a változott szimbólumokra
+        stream.set_symbols(enabled_symbols(data))
+        with latest_lock:
+            for sym in removed:
+                latest.pop(sym, None)
+
+    watchlist_manager().subscribe(on_watchlist)
+    stream.start()
+    try:
+        while True:
+            if _replay is not None and _replay.finished:
+                print("A felvétel visszajátszása véget ért.")
+                return
+            _sleep(POLL_SECONDS)
+            with latest_lock:
+                results = [latest[sym] for sym in stream.symbols if sym in latest]
+            if results:
+                _log_signals(results)
+                print(results)
+    finally:
+        watchlist_manager().unsubscribe(on_watchlist)
+        stream.stop()
+
+
+def run_sharded(shards: int = SHARDS, interval: str = HISTORY_INTERVAL, limit: int = HISTORY_LIMIT,
+                timeframes=None, mode: str = "stream", checkpoint: bool = True):
+    """
+    Több folyamatos mód: a watchlist szimbólumai `shards` worker folyamat
+    között (mindegyik a saját stream / poll ciklusával), az eredmény az
+    osztott memóriás táblában (shards.SignalTable), amit a dashboard is olvas.
+    Ez a folyamat csak felügyel: végrehajtásnak továbbít és logol.
+    """
+    symbols, raw_cfg = load_watchlist()
+    _set_trade_symbols(raw_cfg)
+    sup = ShardSupervisor(symbols, shards, interval, limit, timeframes, mode, checkpoint=checkpoint).start()
+    print(f"{sup.n} shard, {len(symbols)} szimbólum, tábla: {sup.name}")
+    pending = []       # watchlist változás: a fő ciklusban alkalmazzuk (a supervisor nem szálbiztos)
+
+    def on_watchlist(added, removed, data):
+        pending.append(enabled_symbols(data))
+
+    watchlist_manager().subscribe(on_watchlist)
+    last_seen = {}
+    next_log = time.monotonic() + POLL_SECONDS
+    try:
+        while True:
+            while pending:
+                sup.set_symbols(pending.pop(0))
+            sup.check()
+            # csak a változott sorok mennek a végrehajtásnak (history nélkül olvasva)
+            fresh = [r for r in sup.table.read_all(history=False)
+                     if last_seen.get(r["symbol"]) != r["updated_ms"]]
+            for r in fresh:
+                last_seen[r["symbol"]] = r["updated_ms"]
+            if fresh:
+                _dispatch(fresh)
+            if time.monotonic() >= next_log:
+                next_log += POLL_SECONDS
+                results = sup.table.read_all(history=False)
+                if results:
+                    _log_signals(results)
+                    print(results)
+            time.sleep(DISPATCH_SECONDS)
+    finally:
+        watchlist_manager().unsubscribe(on_watchlist)
+        sup.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="RSI+EMA jelző bot.")
+    parser.add_argument("--mode", choices=["stream", "poll"], default="stream",
+                        help="stream: websocket kline stream (alap), poll: REST lekérés 10 mp-enként")
+    parser.add_argument("--timeframes", nargs="?", const=",".join(MTF_TIMEFRAMES),
+                        help="Több idősíkú jelzés egy 1m streamből, pl. 1m,5m,15m,1h "
+                             "(érték nélkül: az alap lista)")
+    parser.add_argument("--require", type=int, default=MTF_REQUIRE,
+                        help="Hány idősíknak kell egyeznie a BUY/SELL-hez (alap: mind)")
+    parser.add_argument("--record", nargs="?", const="", metavar="FILE",
+                        help="Minden REST válasz / stream üzenet rögzítése (alap: recordings/<idő>.cbrec)")
+    parser.add_argument("--replay", metavar="FILE", help="Felvétel visszajátszása élő API helyett")
+    parser.add_argument("--speed", type=float, default=100.0,
+                        help="Visszajátszás sebessége (x valós idő, 0 = amilyen gyorsan csak lehet)")
+    parser.add_argument("--paper", action="store_true",
+                        help="Papír kereskedés az auto_trade szimbólumokra (paper_state.json)")
+    parser.add_argument("--live", action="store_true",
+                        help="ÉLES megbízások az auto_trade szimbólumokra (Binance API)")
+    parser.add_argument("--order-test", action="store_true",
+                        help="--live mellett: csak /api/v3/order/test (nem teljesül)")
+    parser.add_argument("--no-checkpoint", action="store_true",
+                        help=f"Nincs állapot mentés / visszatöltés ({CHECKPOINT_PATH.name})")
+    parser.add_argument("--shards", type=int, nargs="?", const=SHARDS, metavar="N",
+                        help=f"Szimbólumok N worker folyamatra osztva, osztott memóriás jelzés táblával "
+                             f"(érték nélkül: {SHARDS}, a magok száma)")
+    args = parser.parse_args()
+
+    watchlist_manager().start()      # háttérben figyeli a watchlist.json-t, a ciklusok nem olvasnak fájlt
+    if args.shards and (args.replay or args.record is not None):
+        parser.error("--shards nem használható --record / --replay mellett")
+    if args.replay:
+        use_replay(Replay(args.replay, speed=args.speed or None))
+    elif args.record is not None:
+        rec = start_recording(args.record or None)
+        print("Felvétel:", rec.path)
+    if not (args.no_checkpoint or args.shards or args.replay or args.record is not None):
+        use_checkpoint()             # a shardok a saját fájljukat kezelik
+    if args.paper:
+        use_paper()
+    if args.live:
+        if args.replay:
+            parser.error("--live nem használható --replay mellett")
+        use_live(test=args.order_test)
+
+    if args.timeframes:
+        MTF_REQUIRE = args.require
+        timeframes = [tf.strip() for tf in args.timeframes.split(",") if tf.strip()]
+    else:
+        timeframes = None
+
+    if args.shards:
+        run_sharded(args.shards, timeframes=timeframes, mode=args.mode, checkpoint=not args.no_checkpoint)
+    elif args.mode == "stream":
+        run_stream(timeframes=timeframes)
+    else:
+        run_poll(timeframes=timeframes)
@@ -1,21 +1,143 @@
+import hashlib
 import json
+import os
+import threading
+import time
 from pathlib import Path
 
 WATCHLIST_PATH = Path(__file__).with_name("watchlist.json")
+RELOAD_SECONDS = 2             # ennyi mp-enként nézzük, változott-e a fájl (mtime / méret, utána hash)
+
+
+def enabled_symbols(data):
+    """Engedélyezett szimbólumok a nyers configból (watchlist sorrendben)."""
+    return [
+        item["symbol"]
+        for item in data.get("symbols", [])
+        if item.get("enabled", True)
+    ]
+
+
+class WatchlistManager:
+    """
+    A feldolgozott watchlist.json memóriában. Csak akkor olvassuk újra, ha
+    a fájl mtime-ja / mérete változott, és csak akkor dolgozzuk fel, ha a
+    tartalom hash-e is. Változáskor a feliratkozók (subscribe) megkapják a
+    hozzáadott és eltávolított szimbólumokat és az új configot.
+
+    start() után egy háttérszál figyel, így get() fájl művelet nélkül
+    válaszol; anélkül get() legfeljebb RELOAD_SECONDS-enként néz rá a fájlra.
+    """
+
+    def __init__(self, path: Path = WATCHLIST_PATH, reload_seconds: float = RELOAD_SECONDS):
+        self.path = Path(path)
+        self.reload_seconds = reload_seconds
+        self._data = None
+        self._symbols = []
+        self._stamp = None         # (mtime_ns, méret)
+        self._hash = None
+        self._checked = 0.0
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self) -> bool:
+        """Újratöltés, ha a fájl változott; True, ha új config lett."""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                st = os.stat(self.path)
+                stamp = (st.st_mtime_ns, st.st_size)
+                if stamp == self._stamp:
+                    return False
+                raw = self.path.read_bytes()
+                digest = hashlib.sha1(raw).hexdigest()
+                self._stamp = stamp
+                if digest == self._hash:
+                    return False
+                data = json.loads(raw)
+            except (OSError, ValueError) as e:
+                if self._data is None:
+                    raise
+                print("Hiba a watchlist újratöltésénél (a régi marad):", e)
+                return False
+
+            old = self._symbols
+            first = self._data is None
+            self._data, self._symbols, self._hash = data, enabled_symbols(data), digest
+            added = [s for s in self._symbols if s not in old]
+            removed = [s for s in old if s not in self._symbols]
+            listeners = list(self._listeners)
+
+        if not first:
+            for fn in listeners:
+                try:
+                    fn(added, removed, data)
+                except Exception as e:
+                    print("Hiba a watchlist változás kezelésénél:", e)
+        return True
+
+    def get(self):
+        """(enabled szimbólumok, nyers config) — a config közös, ne módosítsd."""
+        if self._data is None or (self._thread is None
+                                  and time.monotonic() - self._checked >= self.reload_seconds):
+            self.check()
+        with self._lock:
+            return list(self._symbols), self._data
+
+    def subscribe(self, fn):
+        """fn(added, removed, data) minden változáskor (a figyelő szálon)."""
+        with self._lock:
+            self._listeners.append(fn)
+
+    def unsubscribe(self, fn):
+        with self._lock:
+            if fn in self._listeners:
+                self._listeners.remove(fn)
+
+    def _run(self):
+        while not self._stop.wait(self.reload_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                print("Hiba a watchlist figyelésénél:", e)
+
+    def start(self):
+        self.get()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="watchlist", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+_manager = WatchlistManager()
+
+
+def watchlist_manager() -> WatchlistManager:
+    return _manager
+
 
 def load_watchlist():
     """
     Visszaad:
       - enabled symbol lista
-      - a teljes nyers config (ha később kell auto_trade, stb.)
+      - a teljes nyers config (auto_trade: auto_trade_symbols())
+    A fájlt csak változás után olvassuk újra (WatchlistManager).
     """
-    with open(WATCHLIST_PATH, "r") as f:
-        data = json.load(f)
+    return _manager.get()
 
-    symbols = [
+
+def auto_trade_symbols(data=None):
+    """Engedélyezett és auto_trade: true szimbólumok (data: load_watchlist() nyers config)."""
+    if data is None:
+        _, data = load_watchlist()
+    return [
         item["symbol"]
         for item in data.get("symbols", [])
-        if item.get("enabled", True)
+        if item.get("enabled", True) and item.get("auto_trade", False)
     ]
-
-    return symbols, data
\ No newline at end of file